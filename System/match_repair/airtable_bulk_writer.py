@@ -0,0 +1,106 @@
+"""
+airtable_bulk_writer.py
+
+Batched, rate-limit-aware writes to an Airtable table (used by csv2airtable4MatchData.py --push-all).
+
+- Updates are sent with Airtable's batch endpoint, at most 10 records per request.
+- The table comes from airtable_client.get_api(api_key, retries=0) (../visualization/airtable_client.py):
+  its session paces every
+  request, retries included, with the per-base token bucket, and leaves retrying to this module.
+- 429 (rate limited) and 5xx responses, and connection errors, are retried here with
+  exponential backoff (honoring a Retry-After header when present), so each batch reports its
+  attempts. Other errors (e.g. 422 invalid field values) fail the batch immediately; remaining
+  batches are still attempted.
+- Each batch produces a report dict, so callers can print and save per-batch results.
+
+Requirements:
+- pyairtable installed
+
+Usage:
+    from airtable_client import get_api
+    from airtable_bulk_writer import write_batches
+    table = get_api(API_KEY, retries=0).table(BASE_ID, TABLE_ID)
+    reports = write_batches(table, [{'id': 'rec...', 'fields': {'Fit Score': 3}}])
+"""
+import os
+import sys
+import time
+
+import requests
+
+# airtable_client.py is shared with the visualization pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'visualization'))
+from airtable_client import MAX_RETRIES, RETRYABLE_STATUS, retry_delay
+
+AIRTABLE_BATCH_SIZE = 10
+
+
+def _status_of(error):
+    response = getattr(error, 'response', None)
+    return response.status_code if response is not None else None
+
+
+def call_with_retries(func, max_retries=MAX_RETRIES, stats=None):
+    """
+    Calls `func()` (one Airtable request on a paced session), retrying 429/5xx/connection errors.
+    Args:
+        stats (dict): Optional; 'attempts' and 'retried' (statuses that were retried) are recorded
+                      in it, also when the call finally fails
+    Returns:
+        The result of `func()`
+    Raises:
+        The last error when it is not retryable or retries are exhausted.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault('retried', [])
+    for attempt in range(1, max_retries + 2):
+        stats['attempts'] = attempt
+        try:
+            return func()
+        except (requests.HTTPError, requests.ConnectionError, requests.Timeout) as e:
+            status = _status_of(e)
+            retryable = status in RETRYABLE_STATUS or (status is None and not isinstance(e, requests.HTTPError))
+            if not retryable or attempt > max_retries:
+                raise
+            stats['retried'].append(status or type(e).__name__)
+            time.sleep(retry_delay(getattr(e, 'response', None), attempt))
+
+
+def write_batches(table, updates, batch_size=AIRTABLE_BATCH_SIZE, max_retries=MAX_RETRIES, on_batch=None):
+    """
+    Writes record updates in batches of `batch_size` (one request per batch).
+    Args:
+        table (pyairtable.Table): Target table, from airtable_client.get_api(api_key, retries=0)
+                                  (paced by its session; retries are counted here)
+        updates (list): [{'id': record_id, 'fields': {...}}, ...]
+        batch_size (int): Records per request (Airtable allows at most 10)
+        max_retries (int): Retries per batch for retryable failures
+        on_batch (callable): Optional callback receiving each batch report as it completes
+    Returns:
+        list: One report per batch: {'batch', 'record_ids', 'status': 'ok'|'failed',
+              'attempts', 'retried': [status...], 'seconds', 'error'}
+    """
+    batch_size = min(batch_size, AIRTABLE_BATCH_SIZE)
+    reports = []
+    for start in range(0, len(updates), batch_size):
+        batch = updates[start:start + batch_size]
+        report = {
+            'batch': start // batch_size + 1,
+            'record_ids': [u['id'] for u in batch],
+            'status': 'ok',
+            'attempts': 0,
+            'retried': [],
+            'seconds': 0.0,
+            'error': None,
+        }
+        t0 = time.perf_counter()
+        try:
+            call_with_retries(lambda: table.batch_update(batch), max_retries, stats=report)
+        except Exception as e:
+            report['status'] = 'failed'
+            report['error'] = f"{_status_of(e) or type(e).__name__}: {e}"
+        report['seconds'] = time.perf_counter() - t0
+        reports.append(report)
+        if on_batch:
+            on_batch(report)
+    return reports
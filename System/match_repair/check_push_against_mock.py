@@ -0,0 +1,89 @@
+"""
+check_push_against_mock.py
+
+Runnable check of the --push-all path (push_all_batched in csv2airtable4MatchData.py) against
+mock_airtable_server.py, which enforces Airtable's 5 requests/second limit and its 10 records
+per batch limit.
+
+For each scenario a fresh mock is seeded from extracted_from_html.json and every matched record
+is pushed. The check asserts that:
+- the mock answered no request with 429 (the writer stays under the rate limit),
+- no batch carried more than 10 records,
+- every batch succeeded and every update was applied, also when the mock fails a share of the
+  requests with 503 (error_rate > 0), i.e. the writer recovers through its retries.
+
+Requirements:
+- pyairtable and python-dotenv installed (no Airtable credentials needed)
+
+Usage:
+    python check_push_against_mock.py
+    python check_push_against_mock.py --error-rate 0.3 --seed 2
+
+Output:
+    One [PASS]/[FAIL] line per scenario; exit status 1 if any scenario fails.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(SCRIPT_DIR)
+from mock_airtable_server import MAX_BATCH, MockAirtable
+
+TABLE_ID = 'tblvolX79j3xJWMT7'
+EXTRACTED_PATH = os.path.join(SCRIPT_DIR, 'extracted_from_html.json')
+
+
+def run_scenario(error_rate, seed):
+    """
+    Pushes every matched extracted record to a fresh mock.
+    Returns:
+        list: Failed checks (empty when the scenario passes)
+    """
+    mock = MockAirtable(error_rate=error_rate, seed=seed)
+    mock.seed_from_extracted(EXTRACTED_PATH, TABLE_ID)
+    os.environ['AIRTABLE_ENDPOINT_URL'] = mock.start()
+    try:
+        import csv2airtable4MatchData as push
+        extracted = push.load_extracted_json(EXTRACTED_PATH)
+        expected = len(push.build_push_updates(extracted, push.fetch_airtable('mock-key', 'appMock', TABLE_ID, for_push=True)))
+        with contextlib.redirect_stdout(io.StringIO()):
+            reports = push.push_all_batched('mock-key', 'appMock', TABLE_ID, extracted)
+    finally:
+        mock.stop()
+    stats = mock.stats
+    retries = sum(len(r['retried']) for r in reports)
+    failures = []
+    if stats['429']:
+        failures.append(f"{stats['429']} requests answered with 429")
+    if stats['max_batch'] > MAX_BATCH:
+        failures.append(f"a batch carried {stats['max_batch']} records (limit {MAX_BATCH})")
+    failed_batches = [r['batch'] for r in reports if r['status'] != 'ok']
+    if failed_batches:
+        failures.append(f"batches {failed_batches} failed")
+    if stats['records_updated'] != expected:
+        failures.append(f"{stats['records_updated']} of {expected} updates applied")
+    if error_rate and not stats['5xx']:
+        failures.append("no faults were injected; raise --error-rate or change --seed")
+    label = f"error_rate={error_rate}"
+    print(f"[{'FAIL' if failures else 'PASS'}] {label}: {len(reports)} batches, {stats['records_updated']} records, "
+          f"largest batch {stats['max_batch']}, {stats['requests']} requests, {stats['429']} x 429, "
+          f"{stats['5xx']} x 5xx injected, {retries} batch retries")
+    for failure in failures:
+        print(f"       - {failure}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the batched, rate-limited push against the mock Airtable server.')
+    parser.add_argument('--error-rate', type=float, default=0.2, help='Fault rate of the recovery scenario (default 0.2)')
+    parser.add_argument('--seed', type=int, default=1, help='Seed of the mock (record IDs and injected faults)')
+    args = parser.parse_args()
+    failures = run_scenario(0.0, args.seed) + run_scenario(args.error_rate, args.seed)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,21 +12,36 @@ FEATURES:
 - Loads match evaluation data from extracted_from_html.json, which contains:
     - funder_name, proposition_name, fit_score, urgency_score, notes
     - Airtable funder and proposition IDs (parsed from embedded URLs)
-- Fetches all relevant Airtable Match Evaluation records, including IDs and numeric score fields.
+- Fetches all relevant Airtable Match Evaluation records in one field-projected pass, including IDs
+  and numeric score fields. Only the push modes (--push-test, --push-all) also request the large
+  Evaluation Report, to parse a fallback Strength Score from it, so pushes never re-fetch
+  individual records; audit and --update-preview skip it.
 - For each (funder_id, proposition_id) pair:
     - Compares extracted (authoritative) scores and Airtable scores.
     - Outputs clear, tab-aligned, two-line audit entries for easy human review.
     - Detects and reports missing records, mismatches, and potential updates.
     - Handles missing/None values gracefully.
+- The audit runs on match_audit.py: an indexed join on (funder_id, proposition_id) that classifies
+  every pair as match/mismatch/duplicate/missing in one pass; --audit-report writes the results
+  as JSONL (or CSV, by extension) next to the human-readable output.
 - Supports a --limit argument to restrict output for testing/preview.
 - Supports --update-preview mode:
     - Shows a dry-run preview of what would be updated in Airtable, without making changes.
     - Prints a summary of records that would be updated.
+- Supports --push-all mode (live updates):
+    - Builds every update payload first, then writes them with batched updates (10 records
+      per request) through airtable_bulk_writer.py. Every request, page fetches and retries
+      included, is paced by ../visualization/airtable_client.py's per-base token bucket under Airtable's
+      5 requests/second limit, and 429/5xx responses are retried with backoff.
+    - Reports the outcome of every batch (--push-report saves them as JSON).
+    - Honors AIRTABLE_ENDPOINT_URL, so it can be run against mock_airtable_server.py.
 - All logic is explicit, with robust error handling and logging.
 - No legacy CSV dependencies in the main workflow (CSV loader retained for reference only).
 
 INTENDED USAGE:
     python csv2airtable4MatchData.py [--update-preview] [--limit N]
+    python csv2airtable4MatchData.py --audit-report audit_report.jsonl [--workers 4]
+    python csv2airtable4MatchData.py --push-all [--push-report push_report.json]
 
 ARCHITECTURE & DATA FLOW:
 - extracted_from_html.json → [parsed & matched by IDs] → Airtable records → audit/preview output
@@ -50,7 +65,13 @@ import argparse
 from collections import defaultdict
 from dotenv import load_dotenv
 from pathlib import Path
-from pyairtable import Api
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# airtable_client.py is shared with the visualization pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'visualization'))
+from airtable_client import get_api, get_table
+from airtable_bulk_writer import AIRTABLE_BATCH_SIZE, write_batches
+from match_audit import (AIRTABLE_RECORD_URL_RE, audit_records, clean_score, format_result,
+                         load_extracted_records, print_summary, write_report)
 
 # --- CONFIG ---
 load_dotenv()
@@ -61,22 +82,18 @@ CSV_PATH = os.getenv('OPPORTUNITY_MATRIX_PATH') or (
     Path('/Users/admin/Library/CloudStorage/Dropbox-EcoRestorationAllianceLLC/Jon Schull/CascadeProjects/ERA Grant Mongers Resources Great Docs/outputs/opportunity_matrix.csv')
 )
 
-def clean_score(val):
-    if val is None:
-        return None
-    s = str(val).strip().lower()
-    if s in ('', 'na', 'null', 'none'):
-        return None
-    try:
-        return float(s)
-    except Exception:
-        return None
-
 def tabbed(*args):
     return '\t'.join(str(a) for a in args)
 
 import json
 import re
+import time
+
+# "### Strength Analysis ... **Score:** N/5" in a markdown Evaluation Report
+STRENGTH_RE = re.compile(r"### Strength Analysis.*?\*\*Score:\*\*\s*([0-9.]+)/5", re.DOTALL)
+FETCH_FIELDS = ['Funders', 'Propositions', 'Fit Score', 'Strength Score', 'Urgency Score']
+# The push paths also derive Strength Score from the (large) Evaluation Report; --push-test shows the Name.
+PUSH_FIELDS = FETCH_FIELDS + ['Name', 'Evaluation Report']
 
 def load_csv(csv_path):
     records = []
@@ -97,12 +114,12 @@ def parse_airtable_id_from_url(url):
     Extracts the Airtable record ID from a given Airtable URL.
     Returns the record ID string or None if not found.
     """
-    m = re.search(r'/([a-zA-Z0-9]{17})\?blocks=hide', url)
+    m = AIRTABLE_RECORD_URL_RE.search(url)
     if m:
-        return m.group(1)
+        return m.group(2)
     return None
 
-def load_extracted_json(json_path):
+def load_extracted_json(json_path, workers=1):
     """
     Loads and parses extracted_from_html.json, extracting:
       - funder_name
@@ -114,42 +131,26 @@ def load_extracted_json(json_path):
       - proposition_id (from Airtable URL in text_notes)
     Returns a list of dicts, one per match.
     """
-    records = []
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    for row in data:
-        funder_name = row.get('funder_name', '').strip()
-        proposition_name = row.get('proposition_name', '').strip()
-        fit_score = clean_score(row.get('fit_score'))
-        urgency_score = clean_score(row.get('urgency_score'))
-        notes = row.get('text_notes', '')
-        # Extract IDs from Airtable URLs in notes
-        funder_id = None
-        prop_id = None
-        urls = re.findall(r'https://airtable.com/[^\s\'"]+', notes)
-        for url in urls:
-            rec_id = parse_airtable_id_from_url(url)
-            if not rec_id:
-                continue
-            if '/tblyu00PsUrnWZdnN/' in url:  # Funders table
-                funder_id = rec_id
-            elif '/tblo9ANCn8pSVfWeJ/' in url:  # Propositions table
-                prop_id = rec_id
-        records.append({
-            'funder_name': funder_name,
-            'proposition_name': proposition_name,
-            'fit_score': fit_score,
-            'urgency_score': urgency_score,
-            'notes': notes,
-            'funder_id': funder_id,
-            'proposition_id': prop_id
-        })
-    return records
+    return load_extracted_records(json_path, workers=workers)
 
-def fetch_airtable(api_key, base_id, table_id):
-    api = Api(api_key)
-    table = api.table(base_id, table_id)
-    records = table.all(fields=['Funders', 'Propositions', 'Fit Score', 'Strength Score', 'Urgency Score'])
+def parse_strength_score(eval_report):
+    """Returns the Strength Analysis score from an Evaluation Report as a float, or None."""
+    match = STRENGTH_RE.search(eval_report or '')
+    return clean_score(match.group(1)) if match else None
+
+def fetch_airtable(api_key, base_id, table_id, for_push=False):
+    """
+    Fetches all Match Evaluations in one pass, projected to FETCH_FIELDS (PUSH_FIELDS with
+    for_push). Every page request is paced and retried by the shared session (see
+    ../visualization/airtable_client.py).
+    Returns:
+        dict: {(funder_id, proposition_id): [{'record_id', 'fit_score', 'strength_score',
+               'urgency_score'}, ...]}
+               With for_push, each record also has 'name' and 'report_strength_score', parsed
+               from the Evaluation Report, whose text is not kept.
+    """
+    table = get_table(api_key, base_id, table_id)
+    records = table.all(fields=PUSH_FIELDS if for_push else FETCH_FIELDS)
     atbl = defaultdict(list)
     for rec in records:
         fields = rec.get('fields', {})
@@ -157,16 +158,20 @@ def fetch_airtable(api_key, base_id, table_id):
         props = fields.get('Propositions', [])
         if funders and props:
             key = (funders[0], props[0])
-            atbl[key].append({
+            entry = {
                 'record_id': rec['id'],
                 'fit_score': clean_score(fields.get('Fit Score')),
                 'strength_score': clean_score(fields.get('Strength Score')),
                 'urgency_score': clean_score(fields.get('Urgency Score')),
-            })
+            }
+            if for_push:
+                entry['name'] = fields.get('Name')
+                entry['report_strength_score'] = parse_strength_score(fields.get('Evaluation Report'))
+            atbl[key].append(entry)
     return atbl
 
 
-def push_match_evaluation_update(api_key, base_id, table_id, record_id, fields_to_update):
+def push_match_evaluation_update(api_key, base_id, table_id, atbl, fields_to_update):
     """
     Update a single Match Evaluation record in Airtable.
 
@@ -174,26 +179,22 @@ def push_match_evaluation_update(api_key, base_id, table_id, record_id, fields_t
         api_key (str): Airtable API key
         base_id (str): Airtable base ID
         table_id (str): Airtable table ID
-        record_id (str): Airtable record ID to update
+        atbl (dict): The record as returned by fetch_airtable(..., for_push=True)
         fields_to_update (dict): Dict of {Airtable field name: new value}
     Returns:
         dict: Airtable API response
     Side effects:
-        - Fetches and prints the record's Name and Strength Score fields for validation
+        - Prints the record's Name and current Strength Score (from the fetch) for validation
         - Sends an HTTP PATCH request to Airtable
         - Prints the payload and response
     Requirements:
         - pyairtable must be installed
-        - Valid credentials and record_id
+        - Valid credentials
     """
-    from pyairtable import Api
-    api = Api(api_key)
-    table = api.table(base_id, table_id)
-    # Fetch record for validation
-    record = table.get(record_id)
-    fields = record.get('fields', {})
-    record_name = fields.get('Name', '(No Name Field)')
-    strength_score = fields.get('Strength Score', None)
+    table = get_table(api_key, base_id, table_id)
+    record_id = atbl['record_id']
+    record_name = atbl.get('name') or '(No Name Field)'
+    strength_score = atbl.get('strength_score')
     print("[INFO] Pushing update to Airtable:")
     print(f"  Record ID: {record_id}")
     print(f"  Record Name: {record_name}")
@@ -205,6 +206,79 @@ def push_match_evaluation_update(api_key, base_id, table_id, record_id, fields_t
     print(response)
     return response
 
+def build_push_payload(rec, atbl):
+    """
+    Builds the Airtable fields to update for one extracted record and its Airtable match.
+    The Strength Score falls back to the one parsed from the Evaluation Report by
+    fetch_airtable(..., for_push=True).
+    """
+    payload = {}
+    if rec.get('fit_score') is not None:
+        payload['Fit Score'] = rec['fit_score']
+    if rec.get('urgency_score') is not None:
+        payload['Urgency Score'] = rec['urgency_score']
+    strength = rec.get('strength_score')
+    if strength is None:
+        strength = atbl.get('report_strength_score')
+    if strength is not None:
+        payload['Strength Score'] = strength
+    return payload
+
+def build_push_updates(extracted_records, atbl_records):
+    """
+    Builds the update payload for every extracted record with a matching Airtable record.
+
+    Args:
+        extracted_records (list): Records from load_extracted_json()
+        atbl_records (dict): Airtable records as returned by fetch_airtable(..., for_push=True)
+    Returns:
+        list: [{'id': record_id, 'fields': {Airtable field name: new value}}, ...]
+    """
+    updates = []
+    for rec in extracted_records:
+        atbl_list = atbl_records.get((rec.get('funder_id'), rec.get('proposition_id')), [])
+        if not atbl_list:
+            continue
+        payload = build_push_payload(rec, atbl_list[0])
+        if payload:
+            updates.append({'id': atbl_list[0]['record_id'], 'fields': payload})
+    return updates
+
+def print_batch_report(report, n_batches):
+    """Prints one line per written batch."""
+    retried = f" (retried: {', '.join(str(s) for s in report['retried'])})" if report['retried'] else ''
+    line = (f"[BATCH {report['batch']}/{n_batches}] {report['status']}: {len(report['record_ids'])} records "
+            f"in {report['seconds']:.2f}s, {report['attempts']} attempt(s){retried}")
+    if report['error']:
+        line += f" - {report['error']}"
+    print(line)
+
+def push_all_batched(api_key, base_id, table_id, extracted_records, report_path=None):
+    """
+    Pushes every matched extracted record to Airtable with batched, rate-limited updates.
+    Returns:
+        list: Per-batch reports (see airtable_bulk_writer.write_batches)
+    """
+    # Writes go through an Api without session retries, so the bulk writer retries (and reports)
+    # them itself. Both Apis share the per-base token bucket, which paces every request.
+    table = get_api(api_key, retries=0).table(base_id, table_id)
+    atbl_records = fetch_airtable(api_key, base_id, table_id, for_push=True)
+    updates = build_push_updates(extracted_records, atbl_records)
+    n_batches = -(-len(updates) // AIRTABLE_BATCH_SIZE)
+    print(f"[INFO] Pushing {len(updates)} record updates in {n_batches} batches")
+    start = time.perf_counter()
+    reports = write_batches(table, updates, on_batch=lambda r: print_batch_report(r, n_batches))
+    seconds = time.perf_counter() - start
+    n_ok = sum(len(r['record_ids']) for r in reports if r['status'] == 'ok')
+    n_retries = sum(len(r['retried']) for r in reports)
+    print(f"\nSUMMARY: {n_ok} records pushed out of {len(updates)} attempted, "
+          f"{sum(r['status'] == 'failed' for r in reports)} failed batches, {n_retries} retries, {seconds:.2f}s.")
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+        print(f"[INFO] Batch report written to {report_path}")
+    return reports
+
 # TEST invocation: push a real update if --push-test is given
 if __name__ == "__main__":
     import argparse
@@ -213,8 +287,9 @@ if __name__ == "__main__":
     parser.add_argument('--limit', type=int, default=None)
     parser.add_argument('--push-test', action='store_true', help="Actually push a test update to Airtable using the first extracted record with a match.")
     parser.add_argument('--push-all', action='store_true', help="Push updates for all extracted records with a matching Airtable record.")
+    parser.add_argument('--push-report', type=str, default=None, help="With --push-all: save the per-batch results as JSON to this path.")
     parser.add_argument('--csv', type=str, default=None)
-    args = parser.parse_args()
+    args, _ = parser.parse_known_args()  # audit options are parsed below
 
     # ... (rest of main logic as before) ...
 
@@ -227,8 +302,7 @@ if __name__ == "__main__":
         MATCH_EVALUATIONS_TABLE_ID = os.getenv('MATCH_EVALUATIONS_TABLE_ID')
         extracted_json_path = Path(__file__).parent / "extracted_from_html.json"
         extracted_records = load_extracted_json(extracted_json_path)
-        atbl_records = fetch_airtable(AIRTABLE_API_KEY, AIRTABLE_BASE_ID, MATCH_EVALUATIONS_TABLE_ID)
-        import re
+        atbl_records = fetch_airtable(AIRTABLE_API_KEY, AIRTABLE_BASE_ID, MATCH_EVALUATIONS_TABLE_ID, for_push=True)
         for rec in extracted_records:
             funder_id = rec.get('funder_id')
             prop_id = rec.get('proposition_id')
@@ -236,34 +310,15 @@ if __name__ == "__main__":
             atbl_list = atbl_records.get(key, [])
             if atbl_list:
                 atbl = atbl_list[0]
-                record_id = atbl['record_id']
-                payload = {}
-                if rec.get('fit_score') is not None:
-                    payload['Fit Score'] = rec['fit_score']
-                if rec.get('urgency_score') is not None:
-                    payload['Urgency Score'] = rec['urgency_score']
-                strength = rec.get('strength_score')
-                if strength is not None:
-                    payload['Strength Score'] = strength
-                else:
-                    from pyairtable import Api
-                    api = Api(AIRTABLE_API_KEY)
-                    table = api.table(AIRTABLE_BASE_ID, MATCH_EVALUATIONS_TABLE_ID)
-                    record = table.get(record_id)
-                    eval_report = record.get('fields', {}).get('Evaluation Report', '')
-                    match = re.search(r"### Strength Analysis.*?\*\*Score:\*\*\s*([0-9.]+)/5", eval_report, re.DOTALL)
-                    if match:
-                        try:
-                            payload['Strength Score'] = float(match.group(1))
-                            print(f"[INFO] Extracted Strength Score from Evaluation Report: {payload['Strength Score']}")
-                        except Exception as e:
-                            print(f"[WARN] Failed to parse extracted Strength Score: {e}")
+                payload = build_push_payload(rec, atbl)
+                if rec.get('strength_score') is None and 'Strength Score' in payload:
+                    print(f"[INFO] Extracted Strength Score from Evaluation Report: {payload['Strength Score']}")
                 print("\n=== TEST PUSH TO AIRTABLE ===")
                 push_match_evaluation_update(
                     AIRTABLE_API_KEY,
                     AIRTABLE_BASE_ID,
                     MATCH_EVALUATIONS_TABLE_ID,
-                    record_id=record_id,
+                    atbl=atbl,
                     fields_to_update=payload
                 )
                 break
@@ -278,113 +333,33 @@ if __name__ == "__main__":
         MATCH_EVALUATIONS_TABLE_ID = os.getenv('MATCH_EVALUATIONS_TABLE_ID')
         extracted_json_path = Path(__file__).parent / "extracted_from_html.json"
         extracted_records = load_extracted_json(extracted_json_path)
-        atbl_records = fetch_airtable(AIRTABLE_API_KEY, AIRTABLE_BASE_ID, MATCH_EVALUATIONS_TABLE_ID)
-        import re
-        n_pushed = 0
-        n_total = 0
-        for rec in extracted_records:
-            funder_id = rec.get('funder_id')
-            prop_id = rec.get('proposition_id')
-            key = (funder_id, prop_id)
-            atbl_list = atbl_records.get(key, [])
-            if not atbl_list:
-                continue
-            atbl = atbl_list[0]
-            record_id = atbl['record_id']
-            payload = {}
-            if rec.get('fit_score') is not None:
-                payload['Fit Score'] = rec['fit_score']
-            if rec.get('urgency_score') is not None:
-                payload['Urgency Score'] = rec['urgency_score']
-            strength = rec.get('strength_score')
-            if strength is not None:
-                payload['Strength Score'] = strength
-            else:
-                from pyairtable import Api
-                api = Api(AIRTABLE_API_KEY)
-                table = api.table(AIRTABLE_BASE_ID, MATCH_EVALUATIONS_TABLE_ID)
-                record = table.get(record_id)
-                eval_report = record.get('fields', {}).get('Evaluation Report', '')
-                match = re.search(r"### Strength Analysis.*?\*\*Score:\*\*\s*([0-9.]+)/5", eval_report, re.DOTALL)
-                if match:
-                    try:
-                        payload['Strength Score'] = float(match.group(1))
-                        print(f"[INFO] Extracted Strength Score from Evaluation Report: {payload['Strength Score']}")
-                    except Exception as e:
-                        print(f"[WARN] Failed to parse extracted Strength Score: {e}")
-            print(f"\n=== PUSHING RECORD {n_total+1} ===")
-            try:
-                push_match_evaluation_update(
-                    AIRTABLE_API_KEY,
-                    AIRTABLE_BASE_ID,
-                    MATCH_EVALUATIONS_TABLE_ID,
-                    record_id=record_id,
-                    fields_to_update=payload
-                )
-                n_pushed += 1
-            except Exception as e:
-                print(f"[ERROR] Failed to push record {record_id}: {e}")
-            n_total += 1
-        print(f"\nSUMMARY: {n_pushed} records pushed out of {n_total} attempted.")
-
-def audit(csv_records, atbl_records, limit=None):
-    csv_map = {}
-    for r in csv_records:
-        key = (r['funder_id'], r['proposition_id'])
-        csv_map[key] = r
-    checked = set()
-    n_csv = n_atbl = n_match = n_missing_atbl = n_missing_csv = n_dupes = 0
-    nonnum = 0
-    for i, (key, csv_row) in enumerate(csv_map.items()):
-        if limit and i >= limit:
-            break
-        atbl_list = atbl_records.get(key, [])
-        n_csv += 1
-        fit, strength, urgency = csv_row['fit_score'], csv_row['strength_score'], csv_row['urgency_score']
-        csv_line = tabbed("CSV:", f"Fit={fit}", f"Strength={strength}", f"Urgency={urgency}", f"({key[0]}, {key[1]})")
-        if atbl_list:
-            if len(atbl_list) > 1:
-                n_dupes += 1
-                print(csv_line)
-                print(tabbed("ATBL:", f"DUPLICATES: {[rec['record_id'] for rec in atbl_list]}"))
-            else:
-                atbl = atbl_list[0]
-                n_match += 1
-                fit2, strength2, urgency2 = atbl['fit_score'], atbl['strength_score'], atbl['urgency_score']
-                if any(x is None for x in [fit, strength, urgency]):
-                    nonnum += 1
-                print(csv_line)
-                print(tabbed("ATBL:", f"Fit={fit2}", f"Strength={strength2}", f"Urgency={urgency2}", f"({atbl['record_id']})", "[Match found]"))
-            checked.add(key)
-        else:
-            n_missing_atbl += 1
-            print(csv_line)
-            print(tabbed("ATBL:", "No Airtable match"))
+        reports = push_all_batched(AIRTABLE_API_KEY, AIRTABLE_BASE_ID, MATCH_EVALUATIONS_TABLE_ID,
+                                   extracted_records, report_path=args.push_report)
+        sys.exit(0 if all(r['status'] == 'ok' for r in reports) else 1)
+
+def audit(csv_records, atbl_records, limit=None, report_path=None):
+    """
+    Audits legacy CSV rows against Airtable records (see match_audit.audit_records).
+    Prints two tab-aligned lines per pair and a summary; optionally writes a JSONL/CSV report.
+    """
+    results = audit_records(csv_records, atbl_records, limit=limit)
+    for result in results:
+        print(format_result(result, source_label='CSV:'))
         print()
-    # Now check for Airtable records with no CSV match
-    for key, atbl_list in atbl_records.items():
-        if key in checked:
-            continue
-        n_atbl += 1
-        for atbl in atbl_list:
-            print(tabbed("CSV:", "No CSV match"))
-            print(tabbed("ATBL:", f"Fit={atbl['fit_score']}", f"Strength={atbl['strength_score']}", f"Urgency={atbl['urgency_score']}", f"({atbl['record_id']})", f"({key[0]}, {key[1]})"))
-            print()
-    print("Summary:")
-    print(f"Total CSV rows: {n_csv}")
-    print(f"Total Airtable records checked (no CSV match): {n_atbl}")
-    print(f"Matches: {n_match}")
-    print(f"Missing in Airtable: {n_missing_atbl}")
-    print(f"Missing in CSV: {n_atbl}")
-    print(f"Duplicates: {n_dupes}")
-    print(f"Non-numeric/empty values: {nonnum}")
+    print_summary(results, len(csv_records))
+    if report_path:
+        write_report(results, report_path)
+        print(f"[INFO] Audit report written to {report_path}")
+    return results
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Audit (and optionally preview updates to) Airtable Match Evaluations from CSV.')
     parser.add_argument('--csv', type=str, help='Path to opportunity_matrix.csv')
     parser.add_argument('--limit', type=int, help='Process only N records (for testing)')
     parser.add_argument('--update-preview', action='store_true', help='Preview updates (dry-run, no changes made)')
-    args = parser.parse_args()
+    parser.add_argument('--audit-report', type=str, help='Also write the audit results to this path (.jsonl or .csv)')
+    parser.add_argument('--workers', type=int, default=1, help='Processes used to parse extracted notes (large files)')
+    args, _ = parser.parse_known_args()
 
     if not (AIRTABLE_API_KEY and AIRTABLE_BASE_ID and MATCH_EVALUATIONS_TABLE_ID):
         print("Missing Airtable environment variables. Check your .env file.")
@@ -398,7 +373,7 @@ if __name__ == "__main__":
     else:
         print(f"[INFO] Using extracted_from_html.json: {extracted_json_path}")
 
-    extracted_records = load_extracted_json(extracted_json_path)
+    extracted_records = load_extracted_json(extracted_json_path, workers=args.workers)
     atbl_records = fetch_airtable(AIRTABLE_API_KEY, AIRTABLE_BASE_ID, MATCH_EVALUATIONS_TABLE_ID)
 
     def audit_extracted(extracted_records, atbl_records, limit=None):
@@ -410,34 +385,12 @@ if __name__ == "__main__":
             limit: Optional int, limit number of records processed.
         Prints tab-aligned audit lines for each record.
         """
-        n_match = n_missing_atbl = n_dupes = n_nonnum = n_total = 0
-        for i, rec in enumerate(extracted_records):
-            if limit and i >= limit:
-                break
-            funder_id = rec.get('funder_id')
-            prop_id = rec.get('proposition_id')
-            key = (funder_id, prop_id)
-            fit = rec.get('fit_score')
-            urgency = rec.get('urgency_score')
-            funder_name = rec.get('funder_name', '?')
-            prop_name = rec.get('proposition_name', '?')
-            atbl_list = atbl_records.get(key, [])
-            if not atbl_list:
-                print(tabbed(f"CSV:", f"Fit={fit}", f"Urgency={urgency}", f"No Airtable match", f"({funder_name}, {prop_name})"))
-                n_missing_atbl += 1
-                continue
-            for atbl in atbl_list:
-                n_total += 1
-                atbl_fit = atbl.get('fit_score')
-                atbl_urgency = atbl.get('urgency_score')
-                print(tabbed(f"EXTRACTED:", f"Fit={fit}", f"Urgency={urgency}", f"({funder_name}, {prop_name})"))
-                print(tabbed(f"ATBL:", f"Fit={atbl_fit}", f"Urgency={atbl_urgency}", f"({atbl['record_id']})"))
-                print()
-                n_match += 1
-        print("Summary:")
-        print(f"Total extracted rows: {len(extracted_records)}")
-        print(f"Total Airtable matches: {n_match}")
-        print(f"Missing in Airtable: {n_missing_atbl}")
+        results = audit_records(extracted_records, atbl_records, limit=limit)
+        for result in results:
+            print(format_result(result))
+            print()
+        print_summary(results, len(extracted_records))
+        return results
 
     def update_preview_extracted(extracted_records, atbl_records, limit=None):
         """
@@ -490,6 +443,9 @@ if __name__ == "__main__":
         print("\n=== UPDATE PREVIEW MODE (NO CHANGES WILL BE MADE) ===\n")
         update_preview_extracted(extracted_records, atbl_records, limit=args.limit)
     else:
-        audit_extracted(extracted_records, atbl_records, limit=args.limit)
+        results = audit_extracted(extracted_records, atbl_records, limit=args.limit)
+        if args.audit_report:
+            write_report(results, args.audit_report)
+            print(f"[INFO] Audit report written to {args.audit_report}")
 
     
\ No newline at end of file
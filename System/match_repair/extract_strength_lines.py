@@ -10,6 +10,13 @@ Outputs a markdown table with:
 - Proposition ID
 - Context line(s) containing 'strength' (case-insensitive)
 
+Records are streamed page by page (at most 100 per request), projected to the four fields used
+below and filtered server-side to reports that mention 'strength', and rows are printed as soon
+as each page is scanned. Memory stays flat regardless of table size, and the first rows appear
+after one page fetch. The next page is requested while the current one is scanned, so the
+scan overlaps the network wait. Requests go through ../visualization/airtable_client.py
+(paced under Airtable's rate limit, with retries).
+
 This script is intended for rapid human review and cleanup of strength-related data.
 
 Requirements:
@@ -21,8 +28,43 @@ Usage:
 """
 import os
 import re
-from pyairtable import Api
+import sys
+from collections import deque
 from dotenv import load_dotenv
+# airtable_client.py is shared with the visualization pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'visualization'))
+from airtable_client import get_table, iter_pages
+
+STRENGTH_RE = re.compile('strength', re.IGNORECASE)
+FIELDS = ['Name', 'Funders', 'Propositions', 'Evaluation Report']
+# Server-side pushdown: skip reports that cannot produce a row.
+STRENGTH_FORMULA = "FIND('strength', LOWER({Evaluation Report}))"
+PAGE_SIZE = 100
+
+def iter_strength_context(text, window=1):
+    """
+    Yields one snippet per line matching 'strength' (case-insensitive), with `window` lines of
+    context on each side. Lines are scanned once, keeping only a `window`-line buffer behind and
+    the snippets still waiting for their trailing context.
+    """
+    if not STRENGTH_RE.search(text):
+        return
+    before = deque(maxlen=window)
+    pending = []  # [lines, trailing lines still needed]
+    for line in text.splitlines():
+        for snippet in pending:
+            snippet[0].append(line)
+            snippet[1] -= 1
+        while pending and pending[0][1] == 0:
+            yield '\n'.join(pending.pop(0)[0]).strip()
+        if STRENGTH_RE.search(line):
+            pending.append([list(before) + [line], window])
+        before.append(line)
+        if window == 0:
+            while pending:
+                yield '\n'.join(pending.pop(0)[0]).strip()
+    for lines, _ in pending:
+        yield '\n'.join(lines).strip()
 
 def extract_strength_context(text, window=1):
     """
@@ -33,40 +75,36 @@ def extract_strength_context(text, window=1):
     Returns:
         List[str]: List of context snippets (one per match).
     """
-    lines = text.splitlines()
-    matches = []
-    for i, line in enumerate(lines):
-        if 'strength' in line.lower():
-            start = max(0, i - window)
-            end = min(len(lines), i + window + 1)
-            snippet = '\n'.join(lines[start:end]).strip()
-            matches.append(snippet)
-    return matches
+    return list(iter_strength_context(text, window))
+
+def print_strength_rows(rec):
+    """Prints one markdown row per 'strength' context snippet in a record's Evaluation Report."""
+    fields = rec.get('fields', {})
+    record_id = rec.get('id', '')
+    name = fields.get('Name', '')
+    funders = fields.get('Funders', [''])
+    props = fields.get('Propositions', [''])
+    eval_report = fields.get('Evaluation Report', '')
+    if not eval_report:
+        return
+    for snippet in iter_strength_context(eval_report, window=1):
+        # Escape pipe for markdown
+        snippet_md = snippet.replace('|', '\|').replace('\n', '<br>')
+        print(f'| {record_id} | {name} | {funders[0]} | {props[0]} | {snippet_md} |')
 
 def main():
     load_dotenv()
     AIRTABLE_API_KEY = os.getenv('AIRTABLE_API_KEY')
     AIRTABLE_BASE_ID = os.getenv('AIRTABLE_BASE_ID')
     MATCH_EVALUATIONS_TABLE_ID = os.getenv('MATCH_EVALUATIONS_TABLE_ID')
-    api = Api(AIRTABLE_API_KEY)
-    table = api.table(AIRTABLE_BASE_ID, MATCH_EVALUATIONS_TABLE_ID)
-    records = table.all()
+    table = get_table(AIRTABLE_API_KEY, AIRTABLE_BASE_ID, MATCH_EVALUATIONS_TABLE_ID)
     print('| Record ID | Name | Funder ID | Proposition ID | Strength Context |')
     print('|-----------|------|-----------|---------------|-----------------|')
-    for rec in records:
-        fields = rec.get('fields', {})
-        record_id = rec.get('id', '')
-        name = fields.get('Name', '')
-        funders = fields.get('Funders', [''])
-        props = fields.get('Propositions', [''])
-        eval_report = fields.get('Evaluation Report', '')
-        if not eval_report:
-            continue
-        contexts = extract_strength_context(eval_report, window=1)
-        for snippet in contexts:
-            # Escape pipe for markdown
-            snippet_md = snippet.replace('|', '\|').replace('\n', '<br>')
-            print(f'| {record_id} | {name} | {funders[0]} | {props[0]} | {snippet_md} |')
+    sys.stdout.flush()
+    for page in iter_pages(table, fields=FIELDS, formula=STRENGTH_FORMULA, page_size=PAGE_SIZE):
+        for rec in page:
+            print_strength_rows(rec)
+        sys.stdout.flush()
 
 if __name__ == '__main__':
     main()
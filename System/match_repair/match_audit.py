@@ -0,0 +1,219 @@
+"""
+match_audit.py
+
+Audit engine comparing extracted match data (extracted_from_html.json, or the legacy CSV) with
+Airtable Match Evaluations. Used by csv2airtable4MatchData.py.
+
+- Funder and proposition record IDs are recovered from each note with one precompiled pattern
+  (one scan per note). Large extraction files can be parsed by a process pool (--workers).
+- Airtable records are indexed by (funder_id, proposition_id) (see fetch_airtable), so the join
+  is one dictionary lookup per extracted row.
+- Every pair is classified in the same pass:
+    match      one Airtable record, all compared scores equal
+    mismatch   one Airtable record, at least one compared score differs
+    duplicate  more than one Airtable record for the pair
+    missing    pair absent from Airtable (missing_from='airtable'), from the extraction
+               (missing_from='extracted'), or the note lacks a funder/proposition ID
+  Only scores present in the extracted row are compared, i.e. exactly what a push would write.
+- Results are plain dicts, written as JSONL or CSV for machines and as tab-aligned lines for people.
+
+Requirements:
+- Python 3.x (standard library only)
+
+Usage:
+    from match_audit import load_extracted_records, audit_records, write_report
+    results = audit_records(load_extracted_records('extracted_from_html.json'), atbl_records)
+    write_report(results, 'audit_report.jsonl')   # or .csv
+
+Output:
+    One result per pair: {'status', 'missing_from', 'funder_id', 'proposition_id', 'funder_name',
+    'proposition_name', 'record_ids', 'differences', 'extracted', 'airtable'}
+"""
+import csv
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+FUNDERS_TABLE = 'tblyu00PsUrnWZdnN'
+PROPOSITIONS_TABLE = 'tblo9ANCn8pSVfWeJ'
+# https://airtable.com/<base>/<table>/[<view>/]<record>?blocks=hide -> (table, record)
+AIRTABLE_RECORD_URL_RE = re.compile(
+    r"https://airtable\.com/[^\s'\"]*?/(tbl[a-zA-Z0-9]{14})/(?:[^\s'\"/]+/)*?([a-zA-Z0-9]{17})\?blocks=hide"
+)
+SCORE_FIELDS = ('fit_score', 'strength_score', 'urgency_score')
+STATUSES = ('match', 'mismatch', 'duplicate', 'missing')
+CSV_COLUMNS = ('status', 'missing_from', 'funder_id', 'proposition_id', 'funder_name', 'proposition_name',
+               'record_ids', 'differences') + tuple(f'extracted_{f}' for f in SCORE_FIELDS) + \
+              tuple(f'airtable_{f}' for f in SCORE_FIELDS)
+PARALLEL_CHUNK = 5000
+
+
+def clean_score(val):
+    if val is None:
+        return None
+    s = str(val).strip().lower()
+    if s in ('', 'na', 'null', 'none'):
+        return None
+    try:
+        return float(s)
+    except Exception:
+        return None
+
+
+def extract_ids(notes):
+    """
+    Returns (funder_id, proposition_id) from the Airtable record URLs in a note.
+    As before, the last URL for each table wins; missing IDs are None.
+    """
+    ids = dict(AIRTABLE_RECORD_URL_RE.findall(notes or ''))
+    return ids.get(FUNDERS_TABLE), ids.get(PROPOSITIONS_TABLE)
+
+
+def extract_record(row):
+    """Converts one extracted_from_html.json row into an audit record."""
+    notes = row.get('text_notes', '')
+    funder_id, prop_id = extract_ids(notes)
+    return {
+        'funder_name': row.get('funder_name', '').strip(),
+        'proposition_name': row.get('proposition_name', '').strip(),
+        'fit_score': clean_score(row.get('fit_score')),
+        'urgency_score': clean_score(row.get('urgency_score')),
+        'notes': notes,
+        'funder_id': funder_id,
+        'proposition_id': prop_id,
+    }
+
+
+def _extract_chunk(rows):
+    return [extract_record(row) for row in rows]
+
+
+def load_extracted_records(json_path, workers=1):
+    """
+    Loads extracted_from_html.json and recovers the Airtable IDs of every row.
+    Args:
+        json_path (str): Path to the extraction file
+        workers (int): Processes used to parse notes; 1 parses in-process (fastest below ~100k rows)
+    Returns:
+        list: Audit records, in file order
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        rows = json.load(f)
+    if workers <= 1 or len(rows) <= PARALLEL_CHUNK:
+        return _extract_chunk(rows)
+    chunks = [rows[i:i + PARALLEL_CHUNK] for i in range(0, len(rows), PARALLEL_CHUNK)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [rec for chunk in pool.map(_extract_chunk, chunks) for rec in chunk]
+
+
+def _result(status, key, rec, atbl_list, differences=(), missing_from=None):
+    rec = rec or {}
+    return {
+        'status': status,
+        'missing_from': missing_from,
+        'funder_id': key[0],
+        'proposition_id': key[1],
+        'funder_name': rec.get('funder_name'),
+        'proposition_name': rec.get('proposition_name'),
+        'record_ids': [a['record_id'] for a in atbl_list],
+        'differences': list(differences),
+        'extracted': {f: rec.get(f) for f in SCORE_FIELDS} if rec else None,
+        'airtable': [{f: a.get(f) for f in SCORE_FIELDS} for a in atbl_list],
+    }
+
+
+def audit_records(records, atbl_records, limit=None):
+    """
+    Joins extracted records with Airtable records on (funder_id, proposition_id) and classifies each pair.
+    Args:
+        records (list): Audit records (load_extracted_records() or load_csv() rows)
+        atbl_records (dict): {(funder_id, proposition_id): [airtable record, ...]} from fetch_airtable()
+        limit (int): Optional; audit only the first N records (Airtable-only pairs are then not reported)
+    Returns:
+        list: Result dicts (see module docstring): extracted rows in order, then Airtable-only pairs
+    """
+    results = []
+    seen = set()
+    for rec in records[:limit] if limit else records:
+        key = (rec.get('funder_id'), rec.get('proposition_id'))
+        seen.add(key)
+        if not (key[0] and key[1]):
+            results.append(_result('missing', key, rec, [], missing_from='ids'))
+            continue
+        atbl_list = atbl_records.get(key)
+        if not atbl_list:
+            results.append(_result('missing', key, rec, [], missing_from='airtable'))
+        elif len(atbl_list) > 1:
+            results.append(_result('duplicate', key, rec, atbl_list))
+        else:
+            atbl = atbl_list[0]
+            differences = [f for f in SCORE_FIELDS if rec.get(f) is not None and rec[f] != atbl.get(f)]
+            results.append(_result('mismatch' if differences else 'match', key, rec, atbl_list, differences))
+    if not limit:
+        for key, atbl_list in atbl_records.items():
+            if key not in seen:
+                results.append(_result('missing', key, None, atbl_list, missing_from='extracted'))
+    return results
+
+
+def summarize(results):
+    """Returns a Counter of result statuses (with 'missing' split by side, e.g. 'missing:airtable')."""
+    counts = Counter()
+    for r in results:
+        counts[r['status']] += 1
+        if r['missing_from']:
+            counts[f"missing:{r['missing_from']}"] += 1
+    return counts
+
+
+def format_result(result, source_label='EXTRACTED:'):
+    """Returns the two tab-aligned review lines for one result."""
+    ext = result['extracted'] or {}
+    names = f"({result['funder_name'] or result['funder_id']}, {result['proposition_name'] or result['proposition_id']})"
+    if result['extracted'] is None:
+        first = '\t'.join((source_label, 'No extracted match'))
+    else:
+        first = '\t'.join((source_label, *(f"{f.split('_')[0].title()}={ext[f]}" for f in SCORE_FIELDS), names))
+    if result['status'] == 'duplicate':
+        second = '\t'.join(('ATBL:', f"DUPLICATES: {result['record_ids']}"))
+    elif not result['record_ids']:
+        second = '\t'.join(('ATBL:', 'No Airtable match' if result['missing_from'] == 'airtable' else 'No Airtable IDs in notes'))
+    else:
+        atbl = result['airtable'][0]
+        tag = f"[Mismatch: {', '.join(result['differences'])}]" if result['differences'] else '[Match found]'
+        second = '\t'.join(('ATBL:', *(f"{f.split('_')[0].title()}={atbl[f]}" for f in SCORE_FIELDS),
+                            f"({result['record_ids'][0]})", tag))
+    return f'{first}\n{second}'
+
+
+def print_summary(results, n_records):
+    counts = summarize(results)
+    print("Summary:")
+    print(f"Total extracted rows: {n_records}")
+    for status in STATUSES:
+        print(f"{status.title()}: {counts[status]}")
+    for side in ('airtable', 'extracted', 'ids'):
+        if counts[f'missing:{side}']:
+            print(f"  missing from {side}: {counts[f'missing:{side}']}")
+
+
+def write_report(results, path):
+    """Writes results as JSONL, or as CSV when `path` ends in .csv."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if os.path.splitext(path)[1].lower() != '.csv':
+            for r in results:
+                f.write(json.dumps(r, ensure_ascii=False))
+                f.write('\n')
+            return
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        for r in results:
+            ext = r['extracted'] or {}
+            atbl = r['airtable'][0] if len(r['airtable']) == 1 else {}
+            writer.writerow([r['status'], r['missing_from'] or '', r['funder_id'] or '', r['proposition_id'] or '',
+                             r['funder_name'] or '', r['proposition_name'] or '', ' '.join(r['record_ids']),
+                             ' '.join(r['differences'])] +
+                            ['' if ext.get(f) is None else ext[f] for f in SCORE_FIELDS] +
+                            ['' if atbl.get(f) is None else atbl[f] for f in SCORE_FIELDS])
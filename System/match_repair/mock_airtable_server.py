@@ -0,0 +1,256 @@
+"""
+mock_airtable_server.py
+
+Local mock of the Airtable REST API for exercising csv2airtable4MatchData.py without touching
+the real base. It enforces Airtable's rate limit, so the batched writer can be tested honestly.
+
+Supports:
+- GET   /v0/{base}/{table}            list records (pageSize, offset, fields[])
+- GET   /v0/{base}/{table}/{record}   get one record
+- PATCH /v0/{base}/{table}            batch update (at most 10 records, else 422)
+- PATCH /v0/{base}/{table}/{record}   single-record update
+- Rate limit: more than `rate_limit` requests within any 1-second window (per base) gets 429.
+- Optional fault injection: `error_rate` of requests fail with 503.
+- Requests without an 'Authorization: Bearer <token>' header get 401 AUTHENTICATION_REQUIRED
+  (any token is accepted), so a client that loses its token fails here as it would against
+  Airtable.
+
+Requests, 429s, 5xx, per-request record counts and the largest batch received ('max_batch')
+are kept in `stats`.
+
+Usage (in-process):
+    from mock_airtable_server import MockAirtable
+    mock = MockAirtable()
+    mock.seed_from_extracted('extracted_from_html.json', table_id)
+    url = mock.start()           # then Api(key, endpoint_url=url) or AIRTABLE_ENDPOINT_URL=url
+    ...
+    mock.stop()
+
+Usage (standalone):
+    python mock_airtable_server.py --port 8766 --table tblvolX79j3xJWMT7
+    AIRTABLE_ENDPOINT_URL=http://127.0.0.1:8766 python csv2airtable4MatchData.py --push-all
+"""
+import argparse
+import collections
+import json
+import random
+import re
+import string
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+RATE_LIMIT = 5           # requests per second per base, as in Airtable
+MAX_BATCH = 10           # records per create/update request, as in Airtable
+PAGE_SIZE = 100
+FUNDERS_TABLE = 'tblyu00PsUrnWZdnN'
+PROPOSITIONS_TABLE = 'tblo9ANCn8pSVfWeJ'
+ID_RE = re.compile(r'/(tbl[a-zA-Z0-9]{14})/(?:viw[a-zA-Z0-9]{14}/)?(rec[a-zA-Z0-9]{14})')
+STRENGTH_NOTE_RE = re.compile(r'Strength=(\d)')
+# Airtable's reply to a request without a bearer token.
+AUTHENTICATION_REQUIRED = (401, {'error': {'type': 'AUTHENTICATION_REQUIRED', 'message': 'Authentication required'}})
+
+
+class MockAirtable:
+    """
+    In-memory Airtable base with rate limiting.
+
+    Args:
+        rate_limit (int): Requests allowed per base in any 1-second window
+        error_rate (float): Fraction of requests answered with 503 (fault injection)
+        seed (int): Seed for record IDs and fault injection
+    """
+
+    def __init__(self, rate_limit=RATE_LIMIT, error_rate=0.0, seed=0):
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.tables = collections.defaultdict(dict)
+        self.recent = collections.defaultdict(collections.deque)  # base -> request times
+        self.stats = collections.Counter()
+        self.lock = threading.Lock()
+        self._server = None
+
+    def new_record_id(self):
+        return 'rec' + ''.join(self.rng.choice(string.ascii_letters + string.digits) for _ in range(14))
+
+    def add_record(self, table_id, fields):
+        rid = self.new_record_id()
+        self.tables[table_id][rid] = {
+            'id': rid,
+            'createdTime': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'fields': dict(fields),
+        }
+        return rid
+
+    def seed_from_extracted(self, json_path, table_id):
+        """
+        Creates one Match Evaluation per extracted record that links a funder and a proposition.
+        Each gets a markdown Evaluation Report with a "### Strength Analysis" score, like the real reports.
+        """
+        with open(json_path, 'r', encoding='utf-8') as f:
+            rows = json.load(f)
+        count = 0
+        for row in rows:
+            ids = dict(ID_RE.findall(row.get('text_notes', '')))
+            if FUNDERS_TABLE in ids and PROPOSITIONS_TABLE in ids:
+                strength = STRENGTH_NOTE_RE.search(row.get('text_notes', ''))
+                report = (f"# Evaluation Report\n\n### Fit Analysis\n**Score:** {row.get('fit_score')}/5\n\n"
+                          f"### Strength Analysis\n**Score:** {strength.group(1) if strength else 3}/5\n")
+                self.add_record(table_id, {
+                    'Name': f"{row.get('funder_name', '')} / {row.get('proposition_name', '')}",
+                    'Funders': [ids[FUNDERS_TABLE]],
+                    'Propositions': [ids[PROPOSITIONS_TABLE]],
+                    'Fit Score': 3,
+                    'Urgency Score': 3,
+                    'Evaluation Report': report,
+                })
+                count += 1
+        return count
+
+    # --- Request handling ---
+    def admit(self, base_id):
+        """Applies rate limiting and fault injection; returns an error (status, body) or None."""
+        with self.lock:
+            self.stats['requests'] += 1
+            now = time.monotonic()
+            window = self.recent[base_id]
+            while window and window[0] <= now - 1.0:
+                window.popleft()
+            if len(window) >= self.rate_limit:
+                self.stats['429'] += 1
+                return 429, {'errors': [{'error': 'RATE_LIMIT_REACHED',
+                                         'message': 'Rate limit exceeded. Please try again later'}]}
+            window.append(now)
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.stats['5xx'] += 1
+                return 503, {'error': {'type': 'SERVICE_UNAVAILABLE'}}
+        return None
+
+    def list_records(self, table_id, options):
+        records = list(self.tables[table_id].values())
+        start = int(str(options.get('offset') or 'itr0')[3:])
+        page_size = min(int(options.get('pageSize') or PAGE_SIZE), PAGE_SIZE)
+        fields = options.get('fields')
+        body = {'records': [
+            {**rec, 'fields': {k: v for k, v in rec['fields'].items() if not fields or k in fields}}
+            for rec in records[start:start + page_size]
+        ]}
+        if start + page_size < len(records):
+            body['offset'] = f'itr{start + page_size}'
+        return 200, body
+
+    def update_records(self, table_id, updates):
+        with self.lock:
+            self.stats['max_batch'] = max(self.stats['max_batch'], len(updates))
+        if len(updates) > MAX_BATCH:
+            return 422, {'error': {'type': 'INVALID_RECORDS',
+                                   'message': f'Too many records ({len(updates)}); at most {MAX_BATCH} per request'}}
+        table = self.tables[table_id]
+        missing = [u.get('id') for u in updates if u.get('id') not in table]
+        if missing:
+            return 404, {'error': {'type': 'MODEL_ID_NOT_FOUND', 'message': f'Records not found: {missing}'}}
+        with self.lock:
+            self.stats['records_updated'] += len(updates)
+            self.stats['batch_requests'] += 1
+        for u in updates:
+            table[u['id']]['fields'].update(u.get('fields', {}))
+        return 200, {'records': [table[u['id']] for u in updates]}
+
+    # --- HTTP serving ---
+    def start(self, host='127.0.0.1', port=0):
+        """Starts serving in a background thread; returns the endpoint URL."""
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body, headers=None):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _route(self):
+                url = urlparse(self.path)
+                parts = [p for p in url.path.split('/') if p]  # ['v0', base, table, (record)]
+                if len(parts) < 3 or parts[0] != 'v0':
+                    self._reply(404, {'error': 'NOT_FOUND'})
+                    return None
+                if not self.headers.get('Authorization', '').startswith('Bearer '):
+                    self._reply(*AUTHENTICATION_REQUIRED)
+                    return None
+                error = mock.admit(parts[1])
+                if error:
+                    self._reply(*error)
+                    return None
+                return url, parts
+
+            def do_GET(self):
+                routed = self._route()
+                if not routed:
+                    return
+                url, parts = routed
+                table = mock.tables[parts[2]]
+                if len(parts) == 4:
+                    rec = table.get(parts[3])
+                    self._reply(200, rec) if rec else self._reply(404, {'error': 'NOT_FOUND'})
+                    return
+                query = parse_qs(url.query)
+                options = {k: v[0] for k, v in query.items() if k != 'fields[]'}
+                if 'fields[]' in query:
+                    options['fields'] = query['fields[]']
+                self._reply(*mock.list_records(parts[2], options))
+
+            def do_PATCH(self):
+                routed = self._route()
+                if not routed:
+                    return
+                _, parts = routed
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+                if len(parts) == 4:
+                    status, result = mock.update_records(parts[2], [{'id': parts[3], 'fields': body.get('fields', {})}])
+                    self._reply(status, result['records'][0] if status == 200 else result)
+                    return
+                self._reply(*mock.update_records(parts[2], body.get('records', [])))
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f'http://{host}:{self._server.server_address[1]}'
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a rate-limited mock Airtable base locally.')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--table', default='tblvolX79j3xJWMT7', help='Match Evaluations table ID to seed')
+    parser.add_argument('--seed-from', default='extracted_from_html.json', help='Extracted records used to seed the table')
+    parser.add_argument('--rate-limit', type=int, default=RATE_LIMIT)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    args = parser.parse_args()
+    mock = MockAirtable(rate_limit=args.rate_limit, error_rate=args.error_rate)
+    count = mock.seed_from_extracted(args.seed_from, args.table)
+    url = mock.start(port=args.port)
+    print(f"[INFO] Mock Airtable serving {count} Match Evaluations at {url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"[INFO] Stats: {dict(mock.stats)}")
+        mock.stop()
+
+
+if __name__ == '__main__':
+    main()
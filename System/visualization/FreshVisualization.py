@@ -4,7 +4,8 @@ FreshVisualization.py
 Orchestrates the complete Airtable-to-Visualization pipeline in a single command, following the 'one right way' principle:
 
 1. Regenerates the Airtable ID-to-name mapping (airtable_mapping.json) to ensure synchrony with the latest Airtable data.
-2. Fetches match evaluation data from Airtable and writes minimal, canonical JSON for downstream use.
+2. Fetches match evaluation data from Airtable and writes minimal, canonical JSON for downstream use
+   (reusing the Match Evaluations already fetched in step 1 via airtable_snapshot.json).
 3. Transforms the raw data into the visualization schema, computing all derived fields.
 4. Generates the interactive HTML visualization from the transformed data.
 
@@ -15,6 +16,42 @@ This script ensures:
 
 Usage:
     python FreshVisualization.py
+    python FreshVisualization.py --profile                           # plus a cProfile .pstats file per stage
+    python FreshVisualization.py --in-process                        # run all stages in this interpreter
+    python FreshVisualization.py --in-process --emit-intermediates   # ...and still write the intermediate JSON
+    python FreshVisualization.py --check-deletions                   # also detect deleted Airtable records
+
+In-process mode:
+- Calls the mapping, fetch, transform and generate stages as functions and hands their results
+  to the next stage in memory: one interpreter, one import of pyairtable/dotenv, one read of .env.
+- airtable_mapping.json (the canonical mapping) and the HTML are always written; the intermediate
+  files (airtable_snapshot.json, match_data_sample.json, visualization_data.json) only with
+  --emit-intermediates.
+- Prints per-stage wall-clock time and peak memory (Python heap, via tracemalloc).
+
+Stage cache (both modes, disable with --no-cache; see stage_cache.py):
+- Before touching Airtable, a freshness check asks each table for one record modified since the
+  last fetch. If there is none, the cached airtable_mapping.json and match data are reused and
+  the mapping/fetch stages are skipped.
+- Airtable does not timestamp deletions, so that check cannot see a deleted record. With
+  --check-deletions it also lists each table's record IDs (one short field per record) and
+  compares the counts with the last fetch's. That costs a full, rate-paced listing (about one
+  request per 100 records), so it is off by default; use it, or --no-cache, after deleting
+  records.
+- The transform and generate stages are keyed by a hash of their inputs (match data, mapping,
+  template, checkboxer.js, teams_panel_data.json and the stage scripts). Matching outputs are
+  restored from .pipeline_cache/ instead of being recomputed; a reused HTML keeps its original
+  generation stamp.
+- The cache is bounded by --cache-max-mb and evicts least-recently-used entries.
+
+Tracing and profiling (both modes; see pipeline_trace.py):
+- Stage output is relayed line by line as the stage runs.
+- Every stage records timing spans (HTTP requests, fetch, parse, transform, serialize, write)
+  with record counts and bytes. They are printed per stage at the end and saved as a Chrome
+  trace, pipeline_trace.json (--trace to change the path), viewable in chrome://tracing,
+  about:tracing or https://ui.perfetto.dev.
+- --profile also writes a cProfile file per stage to profiles/<stage>.pstats
+  (inspect with: python -m pstats profiles/fetch_match_data.pstats).
 
 Dependencies:
 - Python 3.x
@@ -38,15 +75,35 @@ import subprocess
 import sys
 import os
 import argparse
+import cProfile
+import json
+import shutil
+import time
+import tracemalloc
 import webbrowser
+from datetime import datetime, timezone
+from stage_cache import StageCache, MAX_CACHE_BYTES
+import pipeline_trace
+from pipeline_trace import span
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
-def run_step(description, command, cwd):
+def profile_path(profile_dir, name):
+    """Path of the pstats file for stage `name`, or None when profiling is off."""
+    if profile_dir is None:
+        return None
+    os.makedirs(profile_dir, exist_ok=True)
+    return os.path.join(profile_dir, f'{name}.pstats')
+
+def run_step(description, command, cwd, profile_dir=None):
     """
     Runs a shell command as a pipeline step, printing progress and error diagnostics.
+    The step's output (stdout and stderr) is relayed line by line while it runs.
     Args:
         description (str): Human-readable step description
         command (list): Command to run as subprocess (e.g., ["python", "script.py"])
         cwd (str): Directory in which to run the command
+        profile_dir (str): If set, run the script under cProfile, writing <script>.pstats there
     Returns:
         int: Exit code of the subprocess
     Side effects:
@@ -55,56 +112,373 @@ def run_step(description, command, cwd):
         subprocess, sys
     """
     print(f"[FreshVisualization] Starting: {description}")
+    script = os.path.splitext(os.path.basename(command[1]))[0]
+    pstats_path = profile_path(profile_dir, script)
+    if pstats_path:
+        command = [command[0], '-m', 'cProfile', '-o', pstats_path] + command[1:]
     try:
-        result = subprocess.run(command, cwd=cwd, capture_output=True, text=True)
-        print(result.stdout)
-        if result.returncode != 0:
-            print(result.stderr, file=sys.stderr)
+        with span(description, 'stage', script=script):
+            # Unbuffered, so the child's lines arrive as they are printed rather than when it exits.
+            env = dict(os.environ, PYTHONUNBUFFERED='1')
+            with subprocess.Popen(command, cwd=cwd, env=env, stdout=subprocess.PIPE,
+                                  stderr=subprocess.STDOUT, text=True) as proc:
+                for line in proc.stdout:
+                    print(line, end='', flush=True)
+        if proc.returncode != 0:
             print(f"[FreshVisualization] ERROR: Step failed: {description}", file=sys.stderr)
-            sys.exit(result.returncode)
+            sys.exit(proc.returncode)
+        if pstats_path:
+            print(f"[FreshVisualization] Profile: {os.path.relpath(pstats_path, os.getcwd())}")
         print(f"[FreshVisualization] Completed: {description}\n")
-        return result.returncode
+        return proc.returncode
     except Exception as e:
         print(f"[FreshVisualization] EXCEPTION in {description}: {e}", file=sys.stderr)
         sys.exit(1)
 
-def main():
-    parser = argparse.ArgumentParser(description="Orchestrate Airtable-to-Visualization pipeline.")
-    parser.add_argument('--no-browser', action='store_true', help='Do not open the HTML output in a browser')
-    args = parser.parse_args()
+def run_stage(description, stats, func, *args, profile_dir=None, **kwargs):
+    """
+    Runs a pipeline stage in-process, recording wall-clock time and peak Python heap usage.
+    Args:
+        description (str): Human-readable step description
+        stats (list): Receives one {'stage', 'seconds', 'peak_mb'} dict per stage
+        func (callable): Stage function; its return value is passed through
+        profile_dir (str): If set, profile the stage with cProfile, writing <func name>.pstats there
+    Returns:
+        Any: The stage function's return value
+    Side effects:
+        Prints progress and error diagnostics; exits on failure
+    """
+    print(f"[FreshVisualization] Starting: {description}")
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    pstats_path = profile_path(profile_dir, func.__name__)
+    profiler = cProfile.Profile() if pstats_path else None
+    start = time.perf_counter()
+    try:
+        with span(description, 'stage', function=func.__name__):
+            if profiler:
+                result = profiler.runcall(func, *args, **kwargs)
+            else:
+                result = func(*args, **kwargs)
+    except Exception as e:
+        print(f"[FreshVisualization] EXCEPTION in {description}: {e}", file=sys.stderr)
+        sys.exit(1)
+    seconds = time.perf_counter() - start
+    if profiler:
+        profiler.dump_stats(pstats_path)
+        print(f"[FreshVisualization] Profile: {os.path.relpath(pstats_path, os.getcwd())}")
+    peak_mb = (tracemalloc.get_traced_memory()[1] - baseline) / 1e6
+    stats.append({'stage': description, 'seconds': seconds, 'peak_mb': peak_mb})
+    print(f"[FreshVisualization] Completed: {description} ({seconds:.2f}s, peak {peak_mb:.1f} MB)\n")
+    return result
 
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    # Step 0: Regenerate mapping
-    run_step(
-        "Regenerate Airtable ID-to-name mapping (airtable_mapping.json)",
-        [sys.executable, "create_mapping_dict.py"],
-        cwd=script_dir
-    )
-    # Step 1: Fetch data
-    run_step(
-        "Fetch Airtable match data",
-        [sys.executable, "fetch_match_data.py"],
-        cwd=script_dir
-    )
+def artifact_path(name):
+    return os.path.join(SCRIPT_DIR, name)
+
+# --- Stage cache wiring (see stage_cache.py) ---
+# Files produced by the two Airtable-facing stages (mapping + fetch), cached together.
+AIRTABLE_ARTIFACTS = {
+    'airtable_mapping.json': artifact_path('airtable_mapping.json'),
+    'match_data_sample.json': artifact_path('match_data_sample.json'),
+}
+VISUALIZATION_DATA = artifact_path('visualization_data.json')
+OUTPUT_HTML = os.path.join(SCRIPT_DIR, 'outputs', 'opportunity_visualization.html')
+# Everything besides the visualization data that the generated HTML depends on.
+GENERATE_INPUTS = [
+    artifact_path('airtable_mapping.json'),
+    artifact_path(os.path.join('templates', 'visualization_template.html')),
+    artifact_path('checkboxer.js'),
+    artifact_path('teams_panel_data.json'),
+    artifact_path('generate_visualization.py'),
+    artifact_path('generate_teams_panel_html_from_json.py'),
+]
+TRANSFORM_INPUTS = [artifact_path('transform_to_visualization_schema.py')]
+TRACE_PATH = artifact_path('pipeline_trace.json')
+PROFILE_DIR = artifact_path('profiles')
+
+def airtable_unchanged(cache, check_deletions=False):
+    """
+    Freshness check: True if none of the pipeline's Airtable tables changed since the last cached
+    fetch, and that fetch's artifacts are still in the cache.
+    Args:
+        cache (StageCache): Stage cache holding the last fetch's state and artifacts
+        check_deletions (bool): Also list every table's record IDs to catch deleted records
+    """
+    state = cache.load_state()
+    if not (state.get('airtable_synced_at') and cache.get(state.get('airtable_key', ''))):
+        return False
+    if check_deletions and not state.get('airtable_counts'):
+        return False
+    import create_mapping_dict
+    from airtable_snapshot import records_deleted, tables_changed_since
+    from fetch_match_data import SYNC_OVERLAP
+    table_ids = {config['id'] for config in create_mapping_dict.TABLES.values()}
+    if os.getenv('MATCH_EVALUATIONS_TABLE_ID'):
+        table_ids.add(os.getenv('MATCH_EVALUATIONS_TABLE_ID'))
+    since = datetime.fromisoformat(state['airtable_synced_at']) - SYNC_OVERLAP
+    print("[FreshVisualization] Checking Airtable for changes since the last fetch...")
+    with span('check Airtable freshness', 'fetch', tables=len(table_ids)) as s:
+        changed = tables_changed_since(create_mapping_dict.API_KEY, create_mapping_dict.BASE_ID, table_ids, since)
+        s.set(changed=changed)
+    if changed or not check_deletions:
+        return not changed
+    name_fields = {config['id']: config['name_field'] for config in create_mapping_dict.TABLES.values()}
+    with span('check Airtable deletions', 'fetch', tables=len(state['airtable_counts'])) as s:
+        deleted = records_deleted(create_mapping_dict.API_KEY, create_mapping_dict.BASE_ID,
+                                  state['airtable_counts'], name_fields)
+        s.set(deleted=deleted)
+    if deleted:
+        print("[FreshVisualization] Records were deleted in Airtable since the last fetch")
+    return not deleted
+
+def record_airtable_artifacts(cache, synced_at, counts, match_data_bytes=None):
+    """
+    Caches the mapping and match data produced by a fetch that started at `synced_at`, with the
+    fetched tables' record counts ({table_id: count}) for the deletion check.
+    """
+    match_data = match_data_bytes if match_data_bytes is not None else AIRTABLE_ARTIFACTS['match_data_sample.json']
+    outputs = {'airtable_mapping.json': AIRTABLE_ARTIFACTS['airtable_mapping.json'], 'match_data_sample.json': match_data}
+    key = cache.key('airtable', list(outputs.values()))
+    cache.put(key, outputs)
+    cache.save_state({**cache.load_state(), 'airtable_synced_at': synced_at.isoformat(), 'airtable_key': key,
+                      'airtable_counts': counts})
+
+def cached_step(cache, stage, inputs, outputs, run):
+    """
+    Runs `run()` unless the cache holds outputs for identical inputs, in which case they are restored.
+    Args:
+        cache (StageCache|None): Cache, or None to always run
+        stage (str): Stage name (cache key prefix)
+        inputs (list): Input file paths and/or bytes
+        outputs (dict): {output_name: path} written by `run()`
+        run (callable): Executes the stage
+    """
+    if cache is None:
+        run()
+        return
+    key = cache.key(stage, inputs)
+    with span(f'{stage} (cache lookup)', 'stage'):
+        hit = cache.restore(key, outputs)
+    if hit:
+        print(f"[FreshVisualization] Cache hit: {stage} inputs unchanged, reused {', '.join(outputs)}\n")
+        return
+    run()
+    cache.put(key, outputs)
+
+def dumps_like_file(data):
+    """Serializes records exactly as fetch/transform write them, so in-memory and on-disk cache keys agree."""
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+def run_pipeline_in_process(emit_intermediates=False, cache=None, profile_dir=None, check_deletions=False):
+    """
+    Runs the mapping, fetch, transform and generate stages as functions in this interpreter,
+    passing data between them in memory.
+    Args:
+        emit_intermediates (bool): Also write airtable_snapshot.json, match_data_sample.json
+                                   and visualization_data.json
+        cache (StageCache|None): Reuse stage outputs when their inputs are unchanged
+        profile_dir (str|None): Write one cProfile .pstats file per stage there
+        check_deletions (bool): Make the cache's freshness check also detect deleted records
+    Returns:
+        list: Per-stage stats ({'stage', 'seconds', 'peak_mb'})
+    """
+    # Imported here so the subprocess mode never pays for these imports.
+    import create_mapping_dict
+    from airtable_snapshot import fetch_snapshot, save_snapshot, snapshot_counts, snapshot_records
+    from fetch_match_data import MATCH_FIELDS, get_match_table, build_match_data, write_match_data
+    from transform_to_visualization_schema import transform_records, write_visualization_data
+    from generate_visualization import generate
+
+    stats = []
+    tracemalloc.start()
+    try:
+        def mapping_stage():
+            tables = {name: config['id'] for name, config in create_mapping_dict.TABLES.items()}
+            snapshot = fetch_snapshot(create_mapping_dict.API_KEY, create_mapping_dict.BASE_ID, tables,
+                                      fields=create_mapping_dict.snapshot_fields())
+            mapping = create_mapping_dict.create_mapping_dictionary(snapshot)
+            create_mapping_dict.save_mapping_to_file(mapping, create_mapping_dict.output_path)
+            if emit_intermediates:
+                save_snapshot(snapshot)
+            return snapshot, mapping
+
+        def fetch_stage(snapshot, mapping):
+            records = snapshot_records(snapshot, os.getenv('MATCH_EVALUATIONS_TABLE_ID'), MATCH_FIELDS)
+            if records is None:
+                with span('fetch match evaluations', 'fetch') as s:
+                    records = get_match_table().all(fields=MATCH_FIELDS)
+                    s.set(records=len(records))
+            match_data = build_match_data(records, mapping)
+            print(f"[INFO] Built {len(match_data)} match records")
+            if emit_intermediates:
+                write_match_data(match_data)
+            return match_data
+
+        def cached_airtable_stage():
+            cached = cache.get(cache.load_state()['airtable_key'])
+            shutil.copyfile(cached['airtable_mapping.json'], AIRTABLE_ARTIFACTS['airtable_mapping.json'])
+            if emit_intermediates:
+                shutil.copyfile(cached['match_data_sample.json'], AIRTABLE_ARTIFACTS['match_data_sample.json'])
+            with open(cached['match_data_sample.json'], 'r', encoding='utf-8') as f:
+                match_data = json.load(f)
+            mapping = create_mapping_dict.load_mapping_from_file(AIRTABLE_ARTIFACTS['airtable_mapping.json'])
+            print(f"[FreshVisualization] Cache hit: Airtable unchanged, reused mapping and {len(match_data)} match records\n")
+            return mapping, match_data
+
+        def transform_stage(match_data):
+            if cache is None:
+                with span('transform records', 'transform', records=len(match_data)):
+                    visualization_data = transform_records(match_data)
+            else:
+                key = cache.key('transform', [dumps_like_file(match_data)] + TRANSFORM_INPUTS)
+                cached = cache.get(key)
+                if cached:
+                    with open(cached['visualization_data.json'], 'r', encoding='utf-8') as f:
+                        visualization_data = json.load(f)
+                    print("[FreshVisualization] Cache hit: transform inputs unchanged")
+                else:
+                    with span('transform records', 'transform', records=len(match_data)):
+                        visualization_data = transform_records(match_data)
+                    cache.put(key, {'visualization_data.json': dumps_like_file(visualization_data)})
+            if emit_intermediates:
+                write_visualization_data(visualization_data)
+            return visualization_data
+
+        def generate_stage(visualization_data, mapping, mapping_version):
+            run = lambda: generate(json_data=visualization_data, mapping=mapping, mapping_version=mapping_version)
+            inputs = [dumps_like_file(visualization_data)] + GENERATE_INPUTS if cache else []
+            cached_step(cache, 'generate', inputs, {'opportunity_visualization.html': OUTPUT_HTML}, run)
+
+        if cache is not None and airtable_unchanged(cache, check_deletions):
+            mapping, match_data = run_stage("Reuse cached Airtable mapping and match data", stats, cached_airtable_stage,
+                                            profile_dir=profile_dir)
+            mapping_version = cache.load_state()['airtable_synced_at']
+        else:
+            synced_at = datetime.now(timezone.utc)
+            snapshot, mapping = run_stage("Regenerate Airtable ID-to-name mapping (airtable_mapping.json)", stats, mapping_stage,
+                                          profile_dir=profile_dir)
+            match_data = run_stage("Fetch Airtable match data", stats, fetch_stage, snapshot, mapping, profile_dir=profile_dir)
+            mapping_version = snapshot['fetched_at']
+            if cache is not None:
+                record_airtable_artifacts(cache, synced_at, snapshot_counts(snapshot), dumps_like_file(match_data))
+        visualization_data = run_stage("Transform to visualization schema", stats, transform_stage, match_data,
+                                       profile_dir=profile_dir)
+        run_stage("Generate HTML visualization", stats, generate_stage, visualization_data, mapping, mapping_version,
+                  profile_dir=profile_dir)
+    finally:
+        tracemalloc.stop()
+    return stats
+
+def print_stage_report(stats):
+    """Prints a per-stage timing and peak-memory table."""
+    print("[FreshVisualization] Stage timings:")
+    for s in stats:
+        print(f"  {s['seconds']:8.2f}s  {s['peak_mb']:8.1f} MB  {s['stage']}")
+    print(f"  {sum(s['seconds'] for s in stats):8.2f}s  total")
+
+def run_subprocess_pipeline(script_dir, cache=None, profile_dir=None, check_deletions=False):
+    """
+    Runs each stage as its own Python subprocess, exchanging data through JSON files.
+    With a cache, the Airtable stages are skipped when Airtable is unchanged and the
+    transform/generate stages when their input files hash to a cached entry.
+    With profile_dir, each stage script runs under cProfile (<script>.pstats).
+    With check_deletions, the freshness check also detects deleted records.
+    """
+    if cache is not None and airtable_unchanged(cache, check_deletions):
+        cache.restore(cache.load_state()['airtable_key'], AIRTABLE_ARTIFACTS)
+        print("[FreshVisualization] Cache hit: Airtable unchanged, reused airtable_mapping.json and match_data_sample.json\n")
+    else:
+        synced_at = datetime.now(timezone.utc)
+        # Step 0: Regenerate mapping
+        run_step(
+            "Regenerate Airtable ID-to-name mapping (airtable_mapping.json)",
+            [sys.executable, "create_mapping_dict.py"],
+            cwd=script_dir, profile_dir=profile_dir
+        )
+        # Step 1: Fetch data
+        run_step(
+            "Fetch Airtable match data",
+            [sys.executable, "fetch_match_data.py", "--from-snapshot"],
+            cwd=script_dir, profile_dir=profile_dir
+        )
+        if cache is not None:
+            from airtable_snapshot import load_snapshot, snapshot_counts
+            record_airtable_artifacts(cache, synced_at, snapshot_counts(load_snapshot()))
     # Step 2: Transform data
-    run_step(
-        "Transform to visualization schema",
-        [sys.executable, "transform_to_visualization_schema.py"],
-        cwd=script_dir
+    cached_step(
+        cache, 'transform',
+        [AIRTABLE_ARTIFACTS['match_data_sample.json']] + TRANSFORM_INPUTS,
+        {'visualization_data.json': VISUALIZATION_DATA},
+        lambda: run_step(
+            "Transform to visualization schema",
+            [sys.executable, "transform_to_visualization_schema.py"],
+            cwd=script_dir, profile_dir=profile_dir
+        )
     )
     # Step 3: Generate visualization
-    run_step(
-        "Generate HTML visualization",
-        [sys.executable, "generate_visualization.py"],
-        cwd=script_dir
+    cached_step(
+        cache, 'generate',
+        [VISUALIZATION_DATA] + GENERATE_INPUTS,
+        {'opportunity_visualization.html': OUTPUT_HTML},
+        lambda: run_step(
+            "Generate HTML visualization",
+            [sys.executable, "generate_visualization.py"],
+            cwd=script_dir, profile_dir=profile_dir
+        )
     )
+
+def start_trace(trace_path):
+    """Turns on span recording for this process and every stage subprocess; returns the events file."""
+    events_path = f'{os.path.splitext(trace_path)[0]}.events.jsonl'
+    if os.path.exists(events_path):
+        os.remove(events_path)
+    pipeline_trace.enable(events_path)
+    return events_path
+
+def finish_trace(events_path, trace_path):
+    """Merges the events of all stages into one Chrome trace and prints the per-stage spans."""
+    pipeline_trace.flush()
+    events = pipeline_trace.write_chrome_trace(events_path, trace_path)
+    os.remove(events_path)
+    pipeline_trace.print_summary(events, prefix='[FreshVisualization]')
+    print(f"[FreshVisualization] Trace: {os.path.relpath(trace_path, os.getcwd())} (open in chrome://tracing or ui.perfetto.dev)")
+
+def finish(script_dir, no_browser):
+    """Reports the output location and optionally opens it in the default browser."""
     # Output HTML path (must match generate_visualization.py logic)
     output_html = os.path.join(script_dir, 'outputs', 'opportunity_visualization.html')
     rel_output_html = os.path.relpath(output_html, os.getcwd())
     print(f"[FreshVisualization] Pipeline complete. HTML output: {rel_output_html}")
-    if not args.no_browser:
+    if not no_browser:
         print("[FreshVisualization] Opening HTML output in your default browser...")
         webbrowser.open(f'file://{output_html}')
 
+def main():
+    parser = argparse.ArgumentParser(description="Orchestrate Airtable-to-Visualization pipeline.")
+    parser.add_argument('--no-browser', action='store_true', help='Do not open the HTML output in a browser')
+    parser.add_argument('--in-process', action='store_true', help='Run all stages as functions in this interpreter, passing data in memory')
+    parser.add_argument('--emit-intermediates', action='store_true', help='With --in-process: also write the intermediate JSON files')
+    parser.add_argument('--no-cache', action='store_true', help='Recompute every stage, ignoring the stage cache')
+    parser.add_argument('--check-deletions', action='store_true',
+                        help='Make the cache check also list record IDs to detect deleted Airtable records (one request per 100 records)')
+    parser.add_argument('--cache-max-mb', type=int, default=MAX_CACHE_BYTES // (1024 * 1024), help='Size bound of the stage cache')
+    parser.add_argument('--trace', default=TRACE_PATH, help='Chrome trace JSON of the run (chrome://tracing, Perfetto)')
+    parser.add_argument('--profile', action='store_true', help=f'Also write a cProfile .pstats file per stage to {PROFILE_DIR}')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    script_dir = SCRIPT_DIR
+    cache = None if args.no_cache else StageCache(max_bytes=args.cache_max_mb * 1024 * 1024)
+    profile_dir = PROFILE_DIR if args.profile else None
+    events_path = start_trace(args.trace)
+    with span('FreshVisualization', 'stage', mode='in-process' if args.in_process else 'subprocess'):
+        if args.in_process:
+            print_stage_report(run_pipeline_in_process(args.emit_intermediates, cache, profile_dir, args.check_deletions))
+        else:
+            run_subprocess_pipeline(script_dir, cache, profile_dir, args.check_deletions)
+    print(f"[FreshVisualization] Total wall-clock time: {time.perf_counter() - start:.2f}s")
+    finish_trace(events_path, args.trace)
+    finish(script_dir, args.no_browser)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,251 @@
+"""
+airtable_client.py
+
+Shared Airtable access layer for every script in this directory that reads Airtable
+(create_mapping_dict.py, query_or_create_mapping_dict.py, fetch_match_data.py,
+extract_teams_panel_data.py and discover_airtable_schema.py), and for the ../match_repair
+scripts (csv2airtable4MatchData.py, airtable_bulk_writer.py, extract_strength_lines.py), which
+add this directory to sys.path to import it.
+
+- get_api(api_key) returns one pyairtable Api per API key, endpoint and retry setting for the
+  whole process.
+  Its session keeps a pool of up to POOL_SIZE keep-alive connections (urllib3's pool is
+  thread-safe), so concurrent table fetches reuse connections instead of opening one session,
+  and one TLS handshake, per table.
+- Every request first takes a token from a per-base token bucket shared by all tables and
+  threads in the process, pacing requests under Airtable's limit of 5 per second per base.
+  Without it, concurrent table fetches can exceed the limit and be rate limited (429, then a
+  30 second penalty). AIRTABLE_RATE_LIMIT overrides the rate; 0 disables pacing (e.g. against a
+  local fake server).
+- 429 and 5xx responses and connection errors are retried inside the session's send(), with
+  exponential backoff (Retry-After wins when present). Each attempt takes its own token, so
+  retries are paced like any other request. urllib3's built-in retries are off, because
+  they would resend without going through the limiter. get_api(api_key, retries=0) turns
+  this off for callers that retry and report failures themselves (airtable_bulk_writer.py).
+- iter_pages/iter_records fetch the next page in a background thread while the caller is still
+  processing the current one (prefetch), so per-page work overlaps the network wait.
+- fetch_all/fetch_first/fetch_schema are asyncio counterparts that run the blocking calls in
+  worker threads (asyncio.to_thread) on the same pooled session; gather_limited runs several
+  of them at once with a concurrency bound.
+- Set AIRTABLE_ENDPOINT_URL to point at a local fake Airtable server (see benchmarks/).
+
+Requirements:
+- pyairtable installed (requests comes with it)
+
+Usage:
+    from airtable_client import get_table, iter_records, fetch_all, gather_limited
+    table = get_table(API_KEY, BASE_ID, TABLE_ID)
+    for rec in iter_records(table, fields=['Name']):        # next page fetched while this one is processed
+        ...
+    funders, teams = asyncio.run(gather_limited([fetch_all(t1), fetch_all(t2)], limit=4))
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import random
+
+from pyairtable import Api
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+from pipeline_trace import trace_session
+
+# Airtable allows 5 requests per second per base; pace a little under it so network jitter
+# never pushes 6 requests into one second.
+DEFAULT_RATE = 4.5
+POOL_SIZE = 8
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5  # seconds; doubles on each retry
+BACKOFF_MAX = 30.0
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+_apis = {}
+_limiters = {}
+_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. `acquire()` blocks until a token is available.
+
+    Args:
+        rate (float): Tokens added per second (the sustained request rate)
+        capacity (int): Maximum burst size. The default of 1 spaces requests evenly, which
+                        keeps every 1-second window within `rate` requests.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Takes one token, sleeping until one is available; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def request_rate():
+    """Requests per second per base: AIRTABLE_RATE_LIMIT if set (0 = unlimited), else DEFAULT_RATE."""
+    value = os.getenv('AIRTABLE_RATE_LIMIT')
+    return float(value) if value else DEFAULT_RATE
+
+
+def base_limiter(base_id):
+    """The process-wide TokenBucket of a base, or None when pacing is disabled."""
+    rate = request_rate()
+    if rate <= 0:
+        return None
+    with _lock:
+        if base_id not in _limiters:
+            _limiters[base_id] = TokenBucket(rate)
+        return _limiters[base_id]
+
+
+def _base_of(url):
+    # /v0/<base>/<table>, /v0/meta/bases/<base>/tables
+    parts = urlsplit(url).path.strip('/').split('/')
+    if parts[1:3] == ['meta', 'bases'] and len(parts) > 3:
+        return parts[3]
+    return parts[1] if len(parts) > 1 else ''
+
+
+def retry_delay(response, attempt):
+    """Backoff before retry number `attempt` (1-based); a Retry-After header wins when present."""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            return min(BACKOFF_MAX, float(retry_after))
+        except ValueError:
+            pass
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** (attempt - 1)))
+    return delay * (0.5 + random.random() / 2)
+
+
+class PooledSession(Session):
+    """
+    requests Session with a larger connection pool, per-base request pacing and paced retries.
+
+    Args:
+        retries (int): Retries for 429/5xx responses and connection errors (0 = none, e.g. when
+                       the caller retries and reports them itself)
+        pool_size (int): Keep-alive connections kept per host
+    """
+
+    def __init__(self, retries=MAX_RETRIES, pool_size=POOL_SIZE):
+        super().__init__()
+        self.retries = retries
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def send(self, request, **kwargs):
+        limiter = base_limiter(_base_of(request.url))
+        for attempt in range(1, self.retries + 2):
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                response = super().send(request, **kwargs)
+            except (ConnectionError, Timeout):
+                if attempt > self.retries:
+                    raise
+                time.sleep(retry_delay(None, attempt))
+                continue
+            if response.status_code not in RETRYABLE_STATUS or attempt > self.retries:
+                return response
+            delay = retry_delay(response, attempt)
+            response.close()
+            time.sleep(delay)
+
+
+def get_api(api_key, retries=MAX_RETRIES):
+    """
+    The process-wide pyairtable Api for `api_key`, on a PooledSession with `retries` retries.
+    Honors AIRTABLE_ENDPOINT_URL (e.g. a local fake Airtable server) when set.
+    """
+    endpoint_url = os.getenv('AIRTABLE_ENDPOINT_URL')
+    key = (api_key, endpoint_url, retries)
+    with _lock:
+        if key not in _apis:
+            api = Api(api_key, endpoint_url=endpoint_url) if endpoint_url else Api(api_key)
+            api.session = PooledSession(retries)
+            api.api_key = api_key  # the Authorization header lives on the session
+            _apis[key] = api
+        api = _apis[key]
+    trace_session(api.session)
+    return api
+
+
+def get_table(api_key, base_id, table_id):
+    """pyairtable Table on the shared Api."""
+    return get_api(api_key).table(base_id, table_id)
+
+
+def prefetch(iterable):
+    """
+    Yields the items of `iterable`, producing the next item in a background thread while the
+    caller works on the current one. Exceptions raised by the iterable are re-raised here.
+    """
+    items = iter(iterable)
+    done = object()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='airtable-prefetch') as pool:
+        future = pool.submit(next, items, done)
+        while True:
+            item = future.result()
+            if item is done:
+                return
+            future = pool.submit(next, items, done)
+            yield item
+
+
+def iter_pages(table, **options):
+    """Yields a table's pages (lists of up to 100 records), fetching the next page while the caller works."""
+    return prefetch(table.iterate(**options))
+
+
+def iter_records(table, **options):
+    """Yields a table's records page by page, with the next page prefetched (see iter_pages)."""
+    for page in iter_pages(table, **options):
+        yield from page
+
+
+async def fetch_all(table, **options):
+    """Async table.all(**options), run in a worker thread on the shared session."""
+    return await asyncio.to_thread(table.all, **options)
+
+
+async def fetch_first(table, **options):
+    """Async table.first(**options)."""
+    return await asyncio.to_thread(table.first, **options)
+
+
+async def fetch_schema(api_key, base_id):
+    """Async base schema (tables and fields) from the Airtable metadata API."""
+    return await asyncio.to_thread(get_api(api_key).base(base_id).schema)
+
+
+async def gather_limited(coroutines, limit=4, return_exceptions=False):
+    """asyncio.gather with at most `limit` coroutines in flight; results keep the input order."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(bounded(c) for c in coroutines), return_exceptions=return_exceptions)
@@ -11,27 +11,18 @@ Utility functions for mapping Airtable record IDs to human-readable names using
 - Provides robust lookup and error logging if mapping is missing.
 - Designed for SD4D/AI handoff: clear docstrings, explicit error handling.
 """
-import json
 import os
 import logging
+from mapping_store import MappingStore
 
 MAPPING_PATH = os.path.join(os.path.dirname(__file__), 'airtable_mapping.json')  # Local for kit portability
 
 def load_airtable_mapping(mapping_path=MAPPING_PATH):
     """
-    Load the Airtable ID-to-name mapping from JSON, converting string keys to tuple keys.
-    Returns: dict with tuple keys (table, field, value) or ('*', 'id', record_id)
+    Load the Airtable ID-to-name mapping (see mapping_store.py; indexed or legacy format).
+    Returns: MappingStore with tuple keys (table, field, value) or ('*', 'id', record_id)
     """
-    with open(mapping_path, 'r', encoding='utf-8') as f:
-        raw = json.load(f)
-    mapping = {}
-    for k, v in raw.items():
-        if '|' in k:
-            parts = k.split('|', 2)
-            mapping[tuple(parts)] = v
-        else:
-            mapping[k] = v
-    return mapping
+    return MappingStore.load(mapping_path)
 
 def id_to_name(record_id, mapping, entity_type):
     """
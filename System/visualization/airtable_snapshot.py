@@ -0,0 +1,180 @@
+"""
+airtable_snapshot.py
+
+Single-fetch, concurrent snapshot of the Airtable tables used by the pipeline.
+
+- Each table is downloaded exactly once (all pages), with the tables fetched concurrently
+  (asyncio, at most max_workers at a time) over the shared pooled and rate-limited session
+  of airtable_client.py.
+- Callers pass the fields they consume per table, and only those are requested (the long
+  columns nobody reads never leave Airtable). The snapshot records which fields each table
+  holds, and snapshot_records() only hands records to a reader whose fields are covered.
+- The raw records are saved to airtable_snapshot.json so later pipeline stages (e.g.
+  fetch_match_data.py --from-snapshot) can reuse them instead of refetching.
+
+Requirements:
+- pyairtable installed
+
+Usage:
+    from airtable_snapshot import fetch_snapshot, save_snapshot, load_snapshot
+    snapshot = fetch_snapshot(API_KEY, BASE_ID, {'Funders': 'tbl...', 'Propositions': 'tbl...'},
+                              fields={'Funders': ["FUNDER'S NAME"], 'Propositions': ['Name']})
+    save_snapshot(snapshot)
+    records = load_snapshot()['tables']['Funders']['records']
+
+Output:
+    airtable_snapshot.json (in same directory)
+"""
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+from airtable_client import fetch_all, fetch_first, gather_limited, get_api, get_table
+from pipeline_trace import span
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'airtable_snapshot.json')
+MAX_WORKERS = 4
+
+
+def make_api(api_key):
+    """The shared pyairtable Api (see airtable_client.get_api); honors AIRTABLE_ENDPOINT_URL when set."""
+    return get_api(api_key)
+
+
+async def _fetch_table(api_key, base_id, table_id, fields=None):
+    start = time.perf_counter()
+    with span(f'fetch {table_id}', 'fetch', table=table_id, fields=len(fields) if fields else 'all') as s:
+        records = await fetch_all(get_table(api_key, base_id, table_id), fields=fields)
+        s.set(records=len(records))
+    return records, time.perf_counter() - start
+
+
+def fetch_snapshot(api_key, base_id, tables, max_workers=MAX_WORKERS, fields=None):
+    """
+    Fetches every table once, concurrently.
+    Args:
+        api_key (str): Airtable API key
+        base_id (str): Airtable base ID
+        tables (dict): {table_name: table_id}
+        max_workers (int): Upper bound on concurrent table downloads
+        fields (dict): Optional {table_name: [field names]} to request; tables not listed
+                       are fetched with all fields
+    Returns:
+        dict: {'fetched_at': iso8601, 'base_id': str,
+               'tables': {table_name: {'id': table_id, 'fields': [...] or None (all), 'records': [...]}}}
+        Tables that failed to download are reported and left out.
+    """
+    snapshot = {
+        'fetched_at': datetime.now(timezone.utc).isoformat(),
+        'base_id': base_id,
+        'tables': {},
+    }
+    fields = fields or {}
+    fetches = [_fetch_table(api_key, base_id, table_id, fields.get(name)) for name, table_id in tables.items()]
+    with span('fetch snapshot', 'fetch', tables=len(tables)) as s:
+        results = asyncio.run(gather_limited(fetches, limit=max(1, max_workers), return_exceptions=True))
+        for name, result in zip(tables, results):
+            if isinstance(result, Exception):
+                print(f"  - Error fetching {name}: {result}")
+                continue
+            records, seconds = result
+            print(f"  - Fetched {name}: {len(records)} records in {seconds:.2f}s")
+            snapshot['tables'][name] = {'id': tables[name], 'fields': fields.get(name), 'records': records}
+        s.set(records=sum(len(t['records']) for t in snapshot['tables'].values()))
+    return snapshot
+
+
+def modified_since_formula(since):
+    """Airtable filter formula selecting records modified after the ISO-8601 timestamp `since`."""
+    return f"IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('{since}'))"
+
+
+async def _table_changed(api_key, base_id, table_id, since):
+    formula = modified_since_formula(since.strftime('%Y-%m-%dT%H:%M:%S.000Z'))
+    return await fetch_first(get_table(api_key, base_id, table_id), formula=formula) is not None
+
+
+def tables_changed_since(api_key, base_id, table_ids, since, max_workers=MAX_WORKERS):
+    """
+    Cheap freshness check: asks each table (concurrently) for at most one record modified after `since`.
+    Note that Airtable does not expose deletions, so deleted records do not count as changes
+    (see records_deleted).
+    Args:
+        api_key (str): Airtable API key
+        base_id (str): Airtable base ID
+        table_ids (iterable): Table IDs to check
+        since (datetime): Timezone-aware cutoff
+    Returns:
+        bool: True if any table has a newer record, or if any check fails
+    """
+    checks = [_table_changed(api_key, base_id, tid, since) for tid in table_ids]
+    try:
+        return any(asyncio.run(gather_limited(checks, limit=max(1, max_workers))))
+    except Exception as e:
+        print(f"  - Freshness check failed ({e}); assuming Airtable changed")
+        return True
+
+
+def snapshot_counts(snapshot):
+    """{table_id: record count} of a snapshot, the baseline for records_deleted()."""
+    return {entry['id']: len(entry['records']) for entry in snapshot['tables'].values()}
+
+
+async def _record_count(api_key, base_id, table_id, field):
+    return len(await fetch_all(get_table(api_key, base_id, table_id), fields=[field]))
+
+
+def records_deleted(api_key, base_id, counts, fields, max_workers=MAX_WORKERS):
+    """
+    Deletion check to pair with tables_changed_since: lists each table's record IDs (projected
+    onto one short field) and compares the number of records with `counts`. When no record was
+    created or modified since the counts were taken, the set of IDs can only have shrunk, so an
+    equal count means no record was deleted.
+    Args:
+        api_key (str): Airtable API key
+        base_id (str): Airtable base ID
+        counts (dict): {table_id: record count} from snapshot_counts()
+        fields (dict): {table_id: field name} to request (an empty fields[] would return every field)
+    Returns:
+        bool: True if any table has fewer (or more) records than counted, or if any listing fails
+    """
+    table_ids = list(counts)
+    listings = [_record_count(api_key, base_id, tid, fields[tid]) for tid in table_ids]
+    try:
+        live = asyncio.run(gather_limited(listings, limit=max(1, max_workers)))
+    except Exception as e:
+        print(f"  - Deletion check failed ({e}); assuming Airtable changed")
+        return True
+    return any(n != counts[tid] for tid, n in zip(table_ids, live))
+
+
+def save_snapshot(snapshot, path=SNAPSHOT_PATH):
+    """Writes the snapshot as compact JSON."""
+    with span('serialize and write snapshot', 'write', path=os.path.basename(path)) as s:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        s.set(bytes=os.path.getsize(path))
+
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    """Loads a saved snapshot, or returns None if there is none."""
+    if not os.path.exists(path):
+        return None
+    with span('load snapshot', 'parse', path=os.path.basename(path), bytes=os.path.getsize(path)):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
+def snapshot_records(snapshot, table_id, fields=None):
+    """
+    Returns the snapshotted records for `table_id`, or None if the snapshot does not cover that
+    table or was fetched without some of `fields`.
+    """
+    for entry in (snapshot or {}).get('tables', {}).values():
+        if entry.get('id') == table_id:
+            fetched = entry.get('fields')
+            if fields and fetched is not None and not set(fields) <= set(fetched):
+                return None
+            return entry['records']
+    return None
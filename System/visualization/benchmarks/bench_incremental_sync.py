@@ -0,0 +1,68 @@
+"""
+bench_incremental_sync.py
+
+Benchmarks cold vs. warm incremental syncs of fetch_match_data.py against a local fake Airtable.
+
+1. Seeds a FakeAirtable Match Evaluations table with N synthetic records.
+2. Cold run: empty store, every record is pulled.
+3. Touches M records, then warm run: only records modified since the cold run are pulled.
+4. Prints wall-clock time, HTTP request count and bytes transferred for each run.
+
+Usage:
+    python benchmarks/bench_incremental_sync.py --records 10000 --changed 50 --latency 0.05
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from pyairtable import Api
+from fake_airtable_server import FakeAirtable
+from fetch_match_data import sync_store
+from match_store import MatchStore
+
+BASE_ID = 'appFakeBenchmark0'
+TABLE_ID = 'tblvolX79j3xJWMT7'
+
+
+def timed_sync(fake, table, store):
+    fake.reset_stats()
+    start = time.perf_counter()
+    stats = sync_store(table, store)
+    stats['seconds'] = time.perf_counter() - start
+    stats.update(fake.stats)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold vs. warm incremental Airtable syncs.')
+    parser.add_argument('--records', type=int, default=10000)
+    parser.add_argument('--changed', type=int, default=50, help='Records modified between the cold and warm runs')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated per-request latency in seconds')
+    args = parser.parse_args()
+
+    fake = FakeAirtable(latency=args.latency)
+    fake.seed_match_evaluations(TABLE_ID, args.records)
+    url = fake.start()
+    table = Api('fake-key', endpoint_url=url).table(BASE_ID, TABLE_ID)
+    try:
+        with tempfile.TemporaryDirectory() as tmp, MatchStore(os.path.join(tmp, 'store.sqlite')) as store:
+            cold = timed_sync(fake, table, store)
+            fake.touch(TABLE_ID, args.changed)
+            warm = timed_sync(fake, table, store)
+    finally:
+        fake.stop()
+
+    print(f"[BENCH] {args.records} records, {args.changed} changed, latency {args.latency * 1000:.0f} ms/request")
+    for label, stats in (('cold', cold), ('warm', warm)):
+        print(f"[BENCH] {label}: {stats['seconds']:.3f}s, {stats['requests']} requests, "
+              f"{stats['bytes_sent'] / 1e6:.2f} MB, {stats['changed']} records pulled, {stats['total']} in store")
+    if warm['seconds']:
+        print(f"[BENCH] warm/cold speedup: {cold['seconds'] / warm['seconds']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
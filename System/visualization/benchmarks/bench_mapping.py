@@ -0,0 +1,87 @@
+"""
+bench_mapping.py
+
+Benchmark of airtable_mapping.json load and lookup times: the legacy flat "Table|Field|Value"
+format (re-split on every load, as the three old loaders did) vs. the indexed MappingStore format.
+
+1. Generates a synthetic mapping of N records (a name entry and a '*'/'id' reverse entry each,
+   spread over Funders, Propositions and MatchEvaluations).
+2. Writes it in both formats and times: json.load + key parsing (legacy), MappingStore.load
+   (indexed), then N forward (name -> ID) and N reverse (ID -> name) lookups.
+
+Requirements:
+- Python 3.x (standard library only)
+
+Usage:
+    python benchmarks/bench_mapping.py                    # 10k, 100k and 300k records
+    python benchmarks/bench_mapping.py --sizes 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mapping_store import MappingStore
+
+TABLE_FIELDS = (('Funders', "FUNDER'S NAME"), ('Propositions', 'Name'), ('MatchEvaluations', 'Name'))
+
+
+def synthetic_mapping(n):
+    """Builds a MappingStore of n records, shaped like create_mapping_dict's output."""
+    store = MappingStore()
+    for i in range(n):
+        table, field = TABLE_FIELDS[i % len(TABLE_FIELDS)]
+        record_id = f'rec{i:014d}'
+        name = f'{table} record {i}'
+        store.add(table, field, name, record_id)
+        store.add('*', 'id', record_id, name)
+    return store
+
+
+def timed(func, repeat=3):
+    """Returns (best seconds over `repeat` runs, last result)."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def load_legacy(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return {tuple(k.split('|', 2)): v for k, v in json.load(f).items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark legacy vs. indexed airtable_mapping.json loading.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 300000])
+    args = parser.parse_args()
+
+    out_dir = tempfile.mkdtemp(prefix='bench_mapping_')
+    for n in args.sizes:
+        store = synthetic_mapping(n)
+        legacy_path = os.path.join(out_dir, f'legacy_{n}.json')
+        indexed_path = os.path.join(out_dir, f'indexed_{n}.json')
+        with open(legacy_path, 'w', encoding='utf-8') as f:
+            json.dump({'|'.join(k): v for k, v in store.items()}, f, indent=2)
+        store.save(indexed_path)
+
+        legacy_s, legacy = timed(lambda: load_legacy(legacy_path))
+        indexed_s, indexed = timed(lambda: MappingStore.load(indexed_path))
+        assert dict(indexed.items()) == legacy
+        keys = [(TABLE_FIELDS[i % 3][0], TABLE_FIELDS[i % 3][1], f'{TABLE_FIELDS[i % 3][0]} record {i}') for i in range(n)]
+        ids = [f'rec{i:014d}' for i in range(n)]
+        forward_s, _ = timed(lambda: [indexed.lookup_id(*k) for k in keys])
+        reverse_s, _ = timed(lambda: [indexed.name_of(rid) for rid in ids])
+        print(f"[BENCH] {n} records: legacy load {legacy_s * 1000:.0f} ms "
+              f"({os.path.getsize(legacy_path) / 1e6:.1f} MB), indexed load {indexed_s * 1000:.0f} ms "
+              f"({os.path.getsize(indexed_path) / 1e6:.1f} MB); "
+              f"lookups {forward_s / n * 1e9:.0f} ns forward, {reverse_s / n * 1e9:.0f} ns reverse")
+
+
+if __name__ == '__main__':
+    main()
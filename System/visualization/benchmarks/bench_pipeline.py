@@ -0,0 +1,237 @@
+"""
+bench_pipeline.py
+
+End-to-end benchmark of the visualization pipeline against a synthetic Airtable base.
+
+1. For each size N (default 1k, 10k and 100k Match Evaluations), seeds a FakeAirtable with
+   Funders, Propositions and Teams scaled to N (see base_shape) and Evaluation Reports of
+   realistic length (fake_airtable_server.REPORT_CHARS), and serves it locally.
+2. Copies the pipeline scripts into a scratch directory (so the checked-in outputs are never
+   touched) and runs each stage there as its own process, exactly as from the command line,
+   with AIRTABLE_ENDPOINT_URL pointing at the fake server (request pacing off unless --rate-limit):
+       create_mapping_dict -> fetch_match_data -> transform_to_visualization_schema -> generate_visualization
+3. Records per stage: wall-clock seconds, the process's peak RSS, HTTP requests and bytes
+   served, and the size of the stage's output file.
+4. Appends the run (with git commit, timestamp and host) to a JSON history file and prints
+   each stage next to the previous run in the history, so runs can be compared across commits.
+
+Requirements:
+- Python 3.x, with the pipeline's own dependencies (pyairtable, python-dotenv, numpy)
+- Linux or macOS (peak RSS is read with os.wait4)
+
+Usage:
+    python benchmarks/bench_pipeline.py                        # 1k, 10k and 100k matches
+    python benchmarks/bench_pipeline.py --sizes 1000 --latency 0.05 --label "before paging change"
+    python benchmarks/bench_pipeline.py --stages fetch_match_data transform_to_visualization_schema
+    python benchmarks/bench_pipeline.py --sizes 1000 --latency 0.2 --rate-limit 4.5   # real Airtable pacing
+
+Output:
+    benchmarks/results/pipeline_history.json: [{'timestamp', 'commit', 'label', 'host', 'latency', 'rate_limit',
+    'results': {'<N>': {'<stage>': {'seconds', 'max_rss_mb', 'requests', 'bytes_served',
+    'output_bytes', 'returncode'}}}}, ...]
+
+    The checked-in history holds a single reference baseline: commit 10a8650 on a 1-CPU Linux
+    container, no latency, no pacing. Its absolute numbers describe that machine only; compare
+    against it for the shape of the scaling (per-stage ratios, requests, bytes), not for seconds.
+    To compare your own runs, write them to a separate file with --history so the reference
+    stays a single, known entry.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from fake_airtable_server import FakeAirtable, TABLE_IDS
+
+VISUALIZATION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', 'pipeline_history.json')
+BASE_ID = 'appFakeBenchmark0'
+# Inputs the stages read besides the scripts themselves.
+PIPELINE_FILES = ('checkboxer.js', 'teams_panel_data.json')
+PIPELINE_DIRS = ('templates',)
+# (stage, script arguments, output file measured after the stage)
+STAGES = (
+    ('create_mapping_dict', [], 'airtable_mapping.json'),
+    ('fetch_match_data', [], 'match_data_sample.json'),
+    ('transform_to_visualization_schema', [], 'visualization_data.json'),
+    ('generate_visualization', [], os.path.join('outputs', 'opportunity_visualization.html')),
+)
+
+
+def base_shape(n_matches):
+    """
+    Table sizes for a base with n_matches Match Evaluations. At 1k this is the real base's shape
+    (65 funders, 8 propositions); larger bases grow both, so funder/proposition pairs stay sparse.
+    Returns:
+        dict: Keyword arguments for FakeAirtable.seed_base
+    """
+    n_propositions = max(8, n_matches // 400)
+    return {
+        'n_funders': max(65, min(2000, n_matches // n_propositions)),
+        'n_propositions': n_propositions,
+        'n_teams': max(6, n_propositions // 3),
+    }
+
+
+def make_workdir():
+    """Copies the pipeline scripts and inputs into a scratch directory; returns its path."""
+    workdir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    for name in os.listdir(VISUALIZATION_DIR):
+        if name.endswith('.py') or name in PIPELINE_FILES:
+            shutil.copy2(os.path.join(VISUALIZATION_DIR, name), workdir)
+    for name in PIPELINE_DIRS:
+        shutil.copytree(os.path.join(VISUALIZATION_DIR, name), os.path.join(workdir, name))
+    return workdir
+
+
+def stage_env(workdir, endpoint_url, rate_limit=0.0):
+    """
+    Environment for the stages: fake credentials, the fake endpoint, and a .env the scripts insist on.
+    rate_limit is the per-base request pacing of airtable_client.py (0 = none).
+    """
+    settings = {
+        'AIRTABLE_API_KEY': 'fake-key',
+        'AIRTABLE_BASE_ID': BASE_ID,
+        'MATCH_EVALUATIONS_TABLE_ID': TABLE_IDS['MatchEvaluations'],
+        'AIRTABLE_ENDPOINT_URL': endpoint_url,
+        'AIRTABLE_RATE_LIMIT': str(rate_limit),
+    }
+    with open(os.path.join(workdir, '.env'), 'w', encoding='utf-8') as f:
+        f.writelines(f'{key}={value}\n' for key, value in settings.items())
+    return dict(os.environ, **settings)
+
+
+def run_stage(script, args, workdir, env):
+    """
+    Runs one pipeline script to completion in `workdir`, logging its output to <script>.log.
+    Returns:
+        dict: {'seconds', 'max_rss_mb', 'returncode'}
+    """
+    with open(os.path.join(workdir, f'{script}.log'), 'w', encoding='utf-8') as log:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, f'{script}.py', *args], cwd=workdir, env=env,
+                                stdout=log, stderr=subprocess.STDOUT)
+        # wait4 gives this child's own resource usage (RUSAGE_CHILDREN would accumulate).
+        _, status, usage = os.wait4(proc.pid, 0)
+        seconds = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    rss_bytes = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+    return {'seconds': round(seconds, 3), 'max_rss_mb': round(rss_bytes / 1e6, 1), 'returncode': proc.returncode}
+
+
+def bench_size(n_matches, stages, latency=0.0, keep=False, rate_limit=0.0):
+    """Seeds and serves a base of n_matches, runs the stages in order; returns {stage: measurements}."""
+    fake = FakeAirtable(latency=latency)
+    t0 = time.perf_counter()
+    fake.seed_base(n_matches, **base_shape(n_matches))
+    print(f"[INFO] {n_matches} matches: seeded fake base in {time.perf_counter() - t0:.1f}s {base_shape(n_matches)}")
+    url = fake.start()
+    workdir = make_workdir()
+    env = stage_env(workdir, url, rate_limit)
+    results = {}
+    try:
+        for stage, args, output in STAGES:
+            if stage not in stages:
+                continue
+            fake.reset_stats()
+            result = run_stage(stage, args, workdir, env)
+            output_path = os.path.join(workdir, output)
+            result.update(requests=fake.stats['requests'], bytes_served=fake.stats['bytes_sent'],
+                          output_bytes=os.path.getsize(output_path) if os.path.exists(output_path) else None)
+            results[stage] = result
+            if result['returncode'] != 0:
+                print(f"[WARN] {stage} exited with {result['returncode']}; see {os.path.join(workdir, stage + '.log')}")
+                keep = True
+                break
+    finally:
+        fake.stop()
+        if keep:
+            print(f"[INFO] Work directory kept: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=VISUALIZATION_DIR,
+                                       stderr=subprocess.DEVNULL).decode('utf-8').strip()
+    except Exception:
+        return 'unknown'
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_history(history, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+
+
+def previous_result(history, size, stage):
+    """The most recent earlier measurement of (size, stage) in the history, with its run, or (None, None)."""
+    for run in reversed(history):
+        result = run['results'].get(str(size), {}).get(stage)
+        if result and result['returncode'] == 0:
+            return run, result
+    return None, None
+
+
+def print_results(run, history):
+    for size, stages in run['results'].items():
+        for stage, r in stages.items():
+            line = (f"[BENCH] {size:>7} {stage:<34} {r['seconds']:>8.2f}s {r['max_rss_mb']:>8.1f} MB RSS "
+                    f"{r['requests']:>6} req {r['bytes_served'] / 1e6:>8.2f} MB served")
+            prev_run, prev = previous_result(history, size, stage)
+            if prev and prev['seconds']:
+                line += f"  ({(r['seconds'] / prev['seconds'] - 1) * 100:+.0f}% vs {prev_run['commit']} {prev_run['timestamp'][:10]})"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every pipeline stage against a synthetic Airtable base.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='Match Evaluation counts')
+    parser.add_argument('--stages', nargs='+', choices=[s[0] for s in STAGES], default=[s[0] for s in STAGES],
+                        help='Stages to run (in pipeline order; later stages need the earlier outputs)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated per-request latency in seconds')
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help='Requests/second per base the stages pace themselves to (default 0: unpaced; Airtable allows 5)')
+    parser.add_argument('--history', default=HISTORY_PATH, help='JSON history file the run is appended to')
+    parser.add_argument('--label', default='', help='Free-form note stored with the run')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch directories (outputs and stage logs)')
+    args = parser.parse_args()
+
+    run = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': git_commit(),
+        'label': args.label,
+        'host': {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'latency': args.latency,
+        'rate_limit': args.rate_limit,
+        'results': {},
+    }
+    for n in args.sizes:
+        run['results'][str(n)] = bench_size(n, args.stages, args.latency, args.keep, args.rate_limit)
+
+    history = load_history(args.history)
+    print_results(run, history)
+    history.append(run)
+    save_history(history, args.history)
+    print(f"[INFO] Appended run to {os.path.relpath(args.history, os.getcwd())} ({len(history)} runs)")
+
+
+if __name__ == '__main__':
+    main()
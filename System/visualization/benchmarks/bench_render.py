@@ -0,0 +1,165 @@
+"""
+bench_render.py
+
+Browser benchmark of the visualization at large point counts (SVG scatter vs. WebGL scattergl).
+
+1. Generates synthetic visualization records (N points over many funders/propositions).
+2. Renders one page per (size, renderer) with generate_visualization.render_html, plus a small
+   benchmark script that measures, inside the page:
+   - render: page start -> first plot drawn
+   - filter_one: unchecking one funder -> plot redrawn
+   - filter_all_off / filter_all_on: "All Funders" toggled off / on -> plot redrawn
+   and writes the results as JSON into <pre id="bench-results">.
+3. If a Chrome/Chromium binary is found, loads each page headless (--dump-dom) and prints
+   the results; otherwise prints the page paths so they can be opened in any browser.
+
+Requirements:
+- numpy (via transform_to_visualization_schema)
+- A .env next to the pipeline scripts (generate_visualization imports create_mapping_dict, which checks for it);
+  no Airtable calls are made
+- Network access for the Plotly CDN script
+- Optional: Chrome/Chromium for headless runs (or pass --browser)
+
+Usage:
+    python benchmarks/bench_render.py                       # 10k and 100k points, svg and webgl
+    python benchmarks/bench_render.py --sizes 10000 --renderers webgl --out-dir /tmp/bench
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generate_visualization import load_checkboxer, load_template, make_stamp, render_html
+from transform_to_visualization_schema import transform_records
+
+BROWSERS = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+RESULTS_RE = re.compile(r'<pre id="bench-results">(.*?)</pre>', re.S)
+
+# Runs after the page's own scripts; measures with plotly_afterplot as the "drawn" signal.
+BENCH_SCRIPT = """
+<pre id="bench-results"></pre>
+<script>
+(function() {
+    const plot = document.getElementById('plotly-div');
+    const results = { points: null, trace_type: null };
+    function nextDraw(action) {
+        return new Promise(resolve => {
+            const start = performance.now();
+            plot.once('plotly_afterplot', () => resolve(performance.now() - start));
+            action();
+        });
+    }
+    function setAllFunders(checked) {
+        const all = document.getElementById('toggleAllFunders');
+        all.checked = checked;
+        all.dispatchEvent(new Event('change'));
+    }
+    async function run() {
+        results.render_ms = performance.now() - window.BENCH_START;
+        results.points = plot.data[0].x.length;
+        results.trace_type = plot.data[0].type || 'scatter';
+        const funder = document.querySelector('.funder-checkbox');
+        results.filter_one_ms = await nextDraw(() => { funder.checked = false; funder.dispatchEvent(new Event('change')); });
+        results.filter_all_off_ms = await nextDraw(() => setAllFunders(false));
+        results.filter_all_on_ms = await nextDraw(() => setAllFunders(true));
+        document.getElementById('bench-results').textContent = JSON.stringify(results);
+    }
+    const waitForLegends = setInterval(() => {
+        if (document.getElementById('toggleAllFunders') && plot.data) {
+            clearInterval(waitForLegends);
+            // Let the initial filter pass settle before measuring.
+            setTimeout(() => run().catch(e => {
+                document.getElementById('bench-results').textContent = JSON.stringify({ error: String(e) });
+            }), 500);
+        }
+    }, 50);
+})();
+</script>
+"""
+
+
+def synthetic_records(n, n_funders=400, n_propositions=12, seed=0):
+    """Builds n visualization records spread over n_funders x n_propositions."""
+    rows = [
+        {
+            'record_id': f'recBench{i:09d}',
+            'funder_name': f'Funder {i % n_funders}',
+            'proposition_name': f'Proposition {(i * 7 + seed) % n_propositions}',
+            'fit_score': 1 + (i * 31 + seed) % 5,
+            'urgency_score': 1 + (i * 17 + seed) % 5,
+            'text_notes': f'Synthetic evaluation {i}',
+        }
+        for i in range(n)
+    ]
+    return transform_records(rows, seed=seed)
+
+
+def build_page(records, renderer):
+    html = render_html(load_template(), records, None, make_stamp('benchmark'),
+                       checkboxer_script=load_checkboxer(), renderer=renderer)
+    html = html.replace('<head>', '<head>\n    <script>window.BENCH_START = performance.now();</script>', 1)
+    return html.replace('</body>', BENCH_SCRIPT + '</body>', 1)
+
+
+def find_browser(explicit=None):
+    if explicit:
+        return explicit
+    for name in BROWSERS:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def run_headless(browser, page_path, timeout):
+    """Loads a page in headless Chrome and returns the parsed #bench-results, or None."""
+    cmd = [browser, '--headless=new', '--disable-gpu-sandbox', '--enable-unsafe-swiftshader',
+           f'--timeout={timeout * 1000}', '--dump-dom', f'file://{page_path}']
+    try:
+        dom = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout + 30).stdout
+    except subprocess.TimeoutExpired:
+        return None
+    m = RESULTS_RE.search(dom)
+    return json.loads(m.group(1)) if m and m.group(1).strip() else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark visualization render and filter times at large point counts.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--renderers', nargs='+', choices=('svg', 'webgl'), default=['svg', 'webgl'])
+    parser.add_argument('--out-dir', help='Where to write the benchmark pages (default: a temporary directory)')
+    parser.add_argument('--browser', help='Chrome/Chromium binary for headless runs')
+    parser.add_argument('--timeout', type=int, default=60, help='Seconds to let each page run headless')
+    args = parser.parse_args()
+
+    out_dir = os.path.abspath(args.out_dir or tempfile.mkdtemp(prefix='bench_render_'))
+    os.makedirs(out_dir, exist_ok=True)
+    browser = find_browser(args.browser)
+    if not browser:
+        print("[WARN] No Chrome/Chromium found; writing pages only. Open them and read #bench-results.")
+
+    for size in args.sizes:
+        records = synthetic_records(size)
+        for renderer in args.renderers:
+            page_path = os.path.join(out_dir, f'bench_{size}_{renderer}.html')
+            with open(page_path, 'w', encoding='utf-8') as f:
+                f.write(build_page(records, renderer))
+            if not browser:
+                print(f"[BENCH] {size} points, {renderer}: {page_path}")
+                continue
+            results = run_headless(browser, page_path, args.timeout)
+            if not results or 'error' in results:
+                print(f"[BENCH] {size} points, {renderer}: no results ({(results or {}).get('error', 'timed out')})")
+                continue
+            print(f"[BENCH] {size} points, {results['trace_type']}: render {results['render_ms']:.0f} ms, "
+                  f"filter one {results['filter_one_ms']:.0f} ms, all off {results['filter_all_off_ms']:.0f} ms, "
+                  f"all on {results['filter_all_on_ms']:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
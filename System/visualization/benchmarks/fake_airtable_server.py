@@ -0,0 +1,302 @@
+"""
+fake_airtable_server.py
+
+Local, in-memory stand-in for the Airtable REST API, used to benchmark the pipeline
+without touching the real base or its rate limits.
+
+Supports the subset of the API the pipeline uses:
+- GET  /v0/{base}/{table}               list records (pageSize, offset, maxRecords, fields[], filterByFormula)
+- POST /v0/{base}/{table}/listRecords   same, with options in the JSON body
+- filterByFormula: only IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('<iso>')) and
+  {Field}!='' / {Field}='' are understood; anything else is rejected with 422
+  INVALID_FILTER_BY_FORMULA, like a typo would be in Airtable.
+- fields[] naming a field the table does not have is rejected with 422 UNKNOWN_FIELD_NAME, as
+  Airtable does, so a misspelled projection fails here instead of against the real base.
+- Requests without an 'Authorization: Bearer <token>' header are rejected with 401
+  AUTHENTICATION_REQUIRED (any token is accepted), so a client that loses its token fails here.
+
+Synthetic Evaluation Reports follow the structure of the real ones (fit, urgency and strength
+sections with scores, then a summary), with lengths drawn from the range seen in the base
+(REPORT_CHARS: about 1,000-2,100 characters, typically ~1,500).
+
+Every record carries a server-side last-modified time, so incremental syncs can be exercised
+with `touch()`. Request and byte counts are kept in `stats` for reporting, and an optional
+per-request `latency` simulates the network round trip.
+
+Usage (in-process, from a benchmark):
+    from fake_airtable_server import FakeAirtable
+    fake = FakeAirtable()
+    fake.seed_base(1000)        # Funders, Propositions, Teams, Match Evaluations
+    url = fake.start()          # e.g. http://127.0.0.1:54321
+    ...                         # Api(key, endpoint_url=url)
+    fake.stop()
+
+Usage (standalone):
+    python benchmarks/fake_airtable_server.py --port 8765 --records 1000
+    AIRTABLE_ENDPOINT_URL=http://127.0.0.1:8765 python fetch_match_data.py --incremental
+"""
+import argparse
+import json
+import random
+import re
+import string
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+MAX_PAGE_SIZE = 100
+# Table IDs hardcoded in create_mapping_dict.py / extract_teams_panel_data.py
+TABLE_IDS = {
+    'Funders': 'tblyu00PsUrnWZdnN',
+    'Propositions': 'tblo9ANCn8pSVfWeJ',
+    'MatchEvaluations': 'tblvolX79j3xJWMT7',
+    'Teams': 'tbloSod3H2GToBB14',
+}
+# (shortest, longest, most common) Evaluation Report length, as in match_data_sample.json.
+REPORT_CHARS = (1000, 2100, 1450)
+REPORT_FILLER = ('Alignment with funder priorities, geography and stage was reviewed against the proposition. '
+                 'Past grants, eligibility and application windows were checked. ')
+MODIFIED_AFTER_RE = re.compile(
+    r"^\s*IS_AFTER\(\s*LAST_MODIFIED_TIME\(\)\s*,\s*(?:DATETIME_PARSE\()?\s*'([^']+)'\s*\)?\s*\)\s*$"
+)
+FIELD_EMPTY_RE = re.compile(r"^\s*\{([^}]+)\}\s*(!?=)\s*''\s*$")
+# Airtable's reply to a request without a bearer token.
+AUTHENTICATION_REQUIRED = (401, {'error': {'type': 'AUTHENTICATION_REQUIRED', 'message': 'Authentication required'}})
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def synthetic_report(i, fit, urgency, strength, length):
+    """Builds an Evaluation Report shaped like the real ones, padded or cut to about `length` characters."""
+    sections = [
+        f'# AI Analysis Report\n\n## Proposition: Proposition for match {i}\n## Funder: Funder for match {i}\n\n---\n',
+        f'### 1. Fit Analysis (Score: {fit}/5)\n\n**Rationale:**\n',
+        f'\n---\n\n### 2. Urgency Analysis (Score: {urgency}/5)\n\n**Rationale:**\n',
+        f'\n---\n\n### 3. Strength Analysis (Score: {strength}/5)\n\n**Rationale:**\n',
+        '\n---\n\n### 4. Overall Summary & Next Steps\n\n**Summary:**\n',
+    ]
+    fixed = sum(len(part) for part in sections)
+    per_section = max(0, length - fixed) // len(sections)
+    filler = REPORT_FILLER * (per_section // len(REPORT_FILLER) + 1)
+    return ''.join(part + filler[:per_section] for part in sections)
+
+
+class FakeAirtable:
+    """
+    In-memory Airtable base served over HTTP.
+
+    Args:
+        latency (float): Seconds to sleep before answering each request (simulated network)
+        seed (int): Seed for record IDs and synthetic content, so runs are reproducible
+    """
+
+    def __init__(self, latency=0.0, seed=0):
+        self.latency = latency
+        self.tables = {}
+        self.field_names = {}  # table ID -> every field name seen in its records (its schema)
+        self.rng = random.Random(seed)
+        self.stats = {'requests': 0, 'bytes_sent': 0}
+        self._lock = threading.Lock()
+        self._server = None
+
+    # --- Data management ---
+    def new_record_id(self):
+        return 'rec' + ''.join(self.rng.choice(string.ascii_letters + string.digits) for _ in range(14))
+
+    def add_records(self, table_id, fields_list, age=timedelta(days=1)):
+        """Adds records to a table, last modified `age` ago (outside any sync overlap); returns their IDs."""
+        table = self.tables.setdefault(table_id, {})
+        field_names = self.field_names.setdefault(table_id, set())
+        now = datetime.now(timezone.utc) - age
+        ids = []
+        for fields in fields_list:
+            rid = self.new_record_id()
+            table[rid] = {
+                'id': rid,
+                'createdTime': now.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                'fields': dict(fields),
+                '_modified': now,
+            }
+            field_names.update(fields)
+            ids.append(rid)
+        return ids
+
+    def touch(self, table_id, count, field='Fit Score'):
+        """Modifies `count` random records (bumping their last-modified time); returns their IDs."""
+        table = self.tables[table_id]
+        ids = self.rng.sample(list(table), min(count, len(table)))
+        now = datetime.now(timezone.utc)
+        for rid in ids:
+            rec = table[rid]
+            rec['fields'][field] = self.rng.randint(1, 5)
+            rec['_modified'] = now
+        return ids
+
+    def seed_match_evaluations(self, table_id, count, funder_ids=None, proposition_ids=None, report_chars=None):
+        """
+        Fills a Match Evaluations table with synthetic records of realistic shape.
+        Args:
+            report_chars (int): Fixed Evaluation Report length; None draws each length from REPORT_CHARS
+        """
+        funders = funder_ids or [self.new_record_id() for _ in range(65)]
+        props = proposition_ids or [self.new_record_id() for _ in range(8)]
+        fields_list = []
+        for i in range(count):
+            fit, urgency, strength = (self.rng.randint(1, 5) for _ in range(3))
+            length = report_chars or int(self.rng.triangular(*REPORT_CHARS))
+            fields_list.append({
+                'Name': f'Match {i}',
+                'Funders': [self.rng.choice(funders)],
+                'Propositions': [self.rng.choice(props)],
+                'Fit Score': fit,
+                'Urgency Score': urgency,
+                'Strength Score': strength,
+                'Evaluation Report': synthetic_report(i, fit, urgency, strength, length),
+            })
+        return self.add_records(table_id, fields_list)
+
+    def seed_base(self, n_matches, n_funders=65, n_propositions=8, n_teams=6, report_chars=None):
+        """Fills Funders, Propositions, Teams and Match Evaluations (using the pipeline's table IDs)."""
+        funders = self.add_records(TABLE_IDS['Funders'], [
+            {"FUNDER'S NAME": f'Funder {i}', 'WEBSITE': f'https://funder{i}.example.org'}
+            for i in range(n_funders)
+        ])
+        props = self.add_records(TABLE_IDS['Propositions'], [
+            {'Name': f'Proposition {i}'} for i in range(n_propositions)
+        ])
+        self.add_records(TABLE_IDS['Teams'], [
+            {'Team Name': f'Team {i}', 'Nickname': f'T{i}',
+             'Propositions': self.rng.sample(props, min(2, len(props)))}
+            for i in range(n_teams)
+        ])
+        self.seed_match_evaluations(TABLE_IDS['MatchEvaluations'], n_matches, funders, props, report_chars)
+
+    # --- Query evaluation ---
+    def list_records(self, table_id, options):
+        """Returns the JSON response body for a list-records call."""
+        if table_id not in self.tables:
+            return 404, {'error': 'NOT_FOUND'}
+        records = list(self.tables[table_id].values())
+        fields = options.get('fields')
+        unknown = [name for name in fields or () if name not in self.field_names.get(table_id, ())]
+        if unknown:
+            return 422, {'error': {'type': 'UNKNOWN_FIELD_NAME', 'message': f'Unknown field name: "{unknown[0]}"'}}
+        formula = options.get('filterByFormula')
+        if formula:
+            m = MODIFIED_AFTER_RE.match(formula)
+            empty = FIELD_EMPTY_RE.match(formula)
+            if m:
+                since = _parse_time(m.group(1))
+                records = [rec for rec in records if rec['_modified'] > since]
+            elif empty:
+                name, op = empty.groups()
+                records = [rec for rec in records if bool(rec['fields'].get(name)) == (op == '!=')]
+            else:
+                return 422, {'error': {'type': 'INVALID_FILTER_BY_FORMULA', 'message': formula}}
+        max_records = options.get('maxRecords')
+        if max_records:
+            records = records[:int(max_records)]
+        start = int(str(options.get('offset') or 'itr0')[3:])
+        page_size = min(int(options.get('pageSize') or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+        page = records[start:start + page_size]
+        body = {'records': [
+            {
+                'id': rec['id'],
+                'createdTime': rec['createdTime'],
+                'fields': {k: v for k, v in rec['fields'].items() if not fields or k in fields},
+            }
+            for rec in page
+        ]}
+        if start + page_size < len(records):
+            body['offset'] = f'itr{start + page_size}'
+        return 200, body
+
+    # --- HTTP serving ---
+    def start(self, host='127.0.0.1', port=0):
+        """Starts serving in a background thread; returns the endpoint URL."""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body):
+                payload = json.dumps(body).encode('utf-8')
+                with fake._lock:
+                    fake.stats['requests'] += 1
+                    fake.stats['bytes_sent'] += len(payload)
+                if fake.latency:
+                    time.sleep(fake.latency)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _table_id(self, path):
+                parts = [p for p in path.split('/') if p]
+                # ['v0', base_id, table_id, ('listRecords')?]
+                return parts[2] if len(parts) >= 3 and parts[0] == 'v0' else None
+
+            def _authorized(self):
+                if self.headers.get('Authorization', '').startswith('Bearer '):
+                    return True
+                self._reply(*AUTHENTICATION_REQUIRED)
+                return False
+
+            def do_GET(self):
+                if not self._authorized():
+                    return
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                options = {k: v[0] for k, v in query.items() if k != 'fields[]'}
+                if 'fields[]' in query:
+                    options['fields'] = query['fields[]']
+                self._reply(*fake.list_records(self._table_id(url.path), options))
+
+            def do_POST(self):
+                if not self._authorized():
+                    return
+                url = urlparse(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                options = json.loads(self.rfile.read(length) or b'{}')
+                self._reply(*fake.list_records(self._table_id(url.path), options))
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f'http://{host}:{self._server.server_address[1]}'
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {'requests': 0, 'bytes_sent': 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a synthetic Airtable base locally.')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--records', type=int, default=1000, help='Number of synthetic Match Evaluations')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated per-request latency in seconds')
+    args = parser.parse_args()
+    fake = FakeAirtable(latency=args.latency)
+    fake.seed_base(args.records)
+    url = fake.start(port=args.port)
+    print(f"[INFO] Fake Airtable serving {args.records} Match Evaluations at {url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,14 @@
 Create a comprehensive mapping dictionary of all Airtable records.
 
 The dictionary uses tuples of (Table, FieldName, Value) as keys and the record ID as the value.
-This allows for efficient lookups in any direction.
+This allows for efficient lookups in any direction. The mapping is a MappingStore
+(see mapping_store.py): per-table indexes behind the same tuple-keyed interface, saved
+in a compact indexed format that loads without re-parsing keys.
+
+Each table in TABLES is fetched exactly once, and the tables are fetched concurrently
+(see airtable_snapshot.py), with only the fields in snapshot_fields(). The raw records are
+saved to airtable_snapshot.json so that fetch_match_data.py --from-snapshot can reuse the
+Match Evaluations without refetching.
 
 Requirements:
 - A .env file in the same directory with these variables:
@@ -11,6 +18,9 @@ Requirements:
 
 Example output:
     Creating Airtable mapping dictionary...
+      - Fetched Funders: 65 records in 0.84s
+      - Fetched Propositions: 8 records in 0.31s
+      - Fetched MatchEvaluations: 10 records in 0.42s
     Processing table: Funders
       - Processed 65 records
     Processing table: Propositions
@@ -27,11 +37,12 @@ Example output:
     ID for proposition 'Panama Restoration Lab': rec62E9tEGDRbE90c
 """
 import os
-import json
-from pyairtable import Api
 from dotenv import load_dotenv
 from typing import Dict, Tuple, Any
-import pathlib
+from airtable_snapshot import fetch_snapshot, save_snapshot
+from mapping_store import FUNDER_EVALUATIONS, MappingStore, relation_fields
+from fetch_match_data import MATCH_FIELDS
+from pipeline_trace import span
 
 # The .env file must be in the same directory as this script
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -80,27 +91,44 @@ TABLES = {
     }
 }
 
-def create_mapping_dictionary() -> Dict[Tuple[str, str, str], str]:
+def snapshot_fields() -> Dict[str, list]:
+    """
+    The fields to fetch per table: the indexed fields and the linked-record fields the relation
+    indexes read, plus for MatchEvaluations the fields fetch_match_data.py --from-snapshot reads.
+    """
+    fields = {name: config['fields_to_index'] + relation_fields(name) for name, config in TABLES.items()}
+    fields['MatchEvaluations'] += MATCH_FIELDS
+    return {name: list(dict.fromkeys(names)) for name, names in fields.items()}
+
+def create_mapping_dictionary(snapshot: Dict[str, Any] = None) -> MappingStore:
     """
     Create a mapping dictionary for all records in specified tables.
     
+    Args:
+        snapshot: Table snapshot from airtable_snapshot.fetch_snapshot(). When omitted,
+                  every table in TABLES is fetched once, concurrently.
+    
     Returns:
-        Dict[Tuple[str, str, str], str]: A dictionary with (Table, FieldName, Value) as keys
-                                         and record IDs as values.
+        MappingStore: A mapping with (Table, FieldName, Value) as keys and record IDs as values.
     """
-    mapping = {}
-    api = Api(API_KEY)
+    mapping = MappingStore()
+    if snapshot is None:
+        snapshot = fetch_snapshot(API_KEY, BASE_ID, {name: config['id'] for name, config in TABLES.items()},
+                                  fields=snapshot_fields())
     
     for table_name, config in TABLES.items():
-        table_id = config['id']
-        name_field = config['name_field']
         fields_to_index = config['fields_to_index']
         
         print(f"Processing table: {table_name}")
-        table = api.table(BASE_ID, table_id)
-        
-        try:
-            for record in table.all():
+        if table_name not in snapshot['tables']:
+            print(f"  - Error processing {table_name}: not in snapshot")
+            continue
+        records = snapshot['tables'][table_name]['records']
+        with span(f'index {table_name}', 'transform', records=len(records)):
+            # One-to-many indexes from linked-record fields (e.g. Funders -> MatchEvaluations)
+            mapping.index_relations(table_name, records)
+            
+            for record in records:
                 record_id = record['id']
                 fields = record.get('fields', {})
                 
@@ -113,16 +141,12 @@ def create_mapping_dictionary() -> Dict[Tuple[str, str, str], str]:
                         
                         for v in values:
                             if v:  # Only add non-empty values
-                                key = (table_name, field, str(v).strip())
-                                mapping[key] = record_id
+                                mapping.add(table_name, field, str(v).strip(), record_id)
                                 
                                 # Also add a reverse mapping for the record ID
-                                mapping[('*', 'id', record_id)] = v
-            
-            print(f"  - Processed {len(table.all())} records")
-            
-        except Exception as e:
-            print(f"  - Error processing {table_name}: {str(e)}")
+                                mapping.add('*', 'id', record_id, v)
+        
+        print(f"  - Processed {len(records)} records")
     
     return mapping
 
@@ -135,29 +159,21 @@ def save_mapping_to_file(mapping: Dict[Tuple[str, str, str], str],
         mapping: The mapping dictionary to save.
         filename: The name of the output JSON file.
     """
-    # Convert tuple keys to strings for JSON serialization
-    serializable = {f"{k[0]}|{k[1]}|{k[2]}": v for k, v in mapping.items()}
-    
-    with open(filename, 'w') as f:
-        json.dump(serializable, f, indent=2)
+    MappingStore.from_mapping(mapping).save(filename)
     
     print(f"\nMapping saved to {filename}")
 
-def load_mapping_from_file(filename: str = 'airtable_mapping.json') -> Dict[Tuple[str, str, str], str]:
+def load_mapping_from_file(filename: str = 'airtable_mapping.json') -> MappingStore:
     """
-    Load a mapping dictionary from a JSON file.
+    Load a mapping dictionary from a JSON file (indexed or legacy "Table|Field|Value" format).
     
     Args:
         filename: The name of the input JSON file.
         
     Returns:
-        Dict[Tuple[str, str, str], str]: The loaded mapping dictionary.
+        MappingStore: The loaded mapping, keyed by (Table, FieldName, Value) tuples.
     """
-    with open(filename, 'r') as f:
-        serializable = json.load(f)
-    
-    # Convert string keys back to tuples
-    return {tuple(k.split('|', 2)): v for k, v in serializable.items()}
+    return MappingStore.load(filename)
 
 def lookup_id(mapping: Dict[Tuple[str, str, str], str], 
              table: str, field: str, value: str) -> str:
@@ -178,7 +194,11 @@ def lookup_id(mapping: Dict[Tuple[str, str, str], str],
 if __name__ == "__main__":
     # Create and save the mapping
     print("Creating Airtable mapping dictionary...")
-    mapping = create_mapping_dictionary()
+    snapshot = fetch_snapshot(API_KEY, BASE_ID, {name: config['id'] for name, config in TABLES.items()},
+                              fields=snapshot_fields())
+    mapping = create_mapping_dictionary(snapshot)
+    # Share the raw records with later stages (fetch_match_data.py --from-snapshot)
+    save_snapshot(snapshot)
     
     # Save to file
     output_file = 'airtable_mapping.json'
@@ -207,8 +227,6 @@ if __name__ == "__main__":
     funder_name = "The Nature Conservancy"
     funder_id = mapping.get(('Funders', "FUNDER'S NAME", funder_name))
     if funder_id:
-        print(f"\nPropositions for {funder_name}:")
-        for key, value in mapping.items():
-            if key[:2] == ('Propositions', 'Funder') and value == funder_id:
-                prop_name = mapping.get(('Propositions', 'id', key[2]))
-                print(f"  - {prop_name} (ID: {key[2]})")
+        print(f"\nMatch Evaluations for {funder_name}:")
+        for eval_id in mapping.related(FUNDER_EVALUATIONS, funder_id):
+            print(f"  - {mapping.name_of(eval_id)} (ID: {eval_id})")
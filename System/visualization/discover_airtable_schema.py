@@ -1,6 +1,7 @@
 import os
-import requests
+from requests import HTTPError
 from dotenv import load_dotenv
+from airtable_client import get_api
 
 # Load environment variables from .env file
 load_dotenv()
@@ -8,21 +9,14 @@ load_dotenv()
 API_KEY = os.environ.get("AIRTABLE_API_KEY")
 BASE_ID = os.environ.get("AIRTABLE_BASE_ID")
 
-headers = {
-    "Authorization": f"Bearer {API_KEY}",
-    "Content-Type": "application/json"
-}
-
-# Airtable Metadata API endpoint
-url = f"https://api.airtable.com/v0/meta/bases/{BASE_ID}/tables"
-
-response = requests.get(url, headers=headers)
-if response.status_code == 200:
-    data = response.json()
-    for table in data.get('tables', []):
-        print(f"Table: {table['name']} (id: {table['id']})")
-        for field in table.get('fields', []):
-            print(f"  - Field: {field['name']} (type: {field['type']})")
-        print()
+# Airtable Metadata API (GET /v0/meta/bases/{BASE_ID}/tables), via the shared client
+try:
+    schema = get_api(API_KEY).base(BASE_ID).schema()
+except HTTPError as e:
+    print(f"Error: {e.response.status_code} - {e.response.text}")
 else:
-    print(f"Error: {response.status_code} - {response.text}")
+    for table in schema.tables:
+        print(f"Table: {table.name} (id: {table.id})")
+        for field in table.fields:
+            print(f"  - Field: {field.name} (type: {field.type})")
+        print()
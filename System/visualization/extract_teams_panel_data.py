@@ -1,8 +1,8 @@
 import os
 import json
 import sys
-from pyairtable import Api
 from dotenv import load_dotenv
+from airtable_client import get_table
 from airtable_id_name_utils import load_airtable_mapping, id_to_name
 
 # Load environment
@@ -17,18 +17,20 @@ AIRTABLE_API_KEY = os.getenv('AIRTABLE_API_KEY')
 AIRTABLE_BASE_ID = os.getenv('AIRTABLE_BASE_ID')
 TEAMS_TABLE_ID = 'tbloSod3H2GToBB14'  # Confirm this is correct for your base
 
+# The fields this script reads; Airtable sends only these
+TEAM_FIELDS = ['Team Name', 'Nickname', 'Propositions']
+
 if not AIRTABLE_API_KEY or not AIRTABLE_BASE_ID:
     print("ERROR: Missing Airtable credentials in .env")
     sys.exit(1)
 
-api = Api(AIRTABLE_API_KEY)
-teams_table = api.table(AIRTABLE_BASE_ID, TEAMS_TABLE_ID)
+teams_table = get_table(AIRTABLE_API_KEY, AIRTABLE_BASE_ID, TEAMS_TABLE_ID)
 
 # Load canonical mapping
 mapping = load_airtable_mapping()
 
-# Fetch all Teams
-records = teams_table.all()
+# Fetch all Teams (only the fields used below)
+records = teams_table.all(fields=TEAM_FIELDS)
 teams_data = []
 
 for rec in records:
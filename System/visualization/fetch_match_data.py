@@ -1,5 +1,5 @@
 """
-fetch_minimal_match_data.py
+fetch_match_data.py
 
 Extracts all Match Evaluation records from Airtable and outputs a minimal JSON for visualization pipeline development/testing.
 - Uses proven pyairtable-based access pattern from extract_strength_lines.py
@@ -11,16 +11,59 @@ Requirements:
 - pyairtable installed
 
 Usage:
-    python fetch_minimal_match_data.py
+    python fetch_match_data.py                         # full fetch (table.all())
+    python fetch_match_data.py --incremental           # pull only records changed since the last sync
+    python fetch_match_data.py --incremental --prune   # ...and drop records deleted in Airtable
+    python fetch_match_data.py --incremental --full    # rebuild the local store from scratch
+    python fetch_match_data.py --from-snapshot         # reuse records fetched by create_mapping_dict.py
+    python fetch_match_data.py --stream --format jsonl --output - | python transform_to_visualization_schema.py --stream --input -
+
+Incremental mode:
+- Keeps a local SQLite record store (match_data_store.sqlite, see match_store.py) keyed by record ID.
+- Each run asks Airtable only for records whose LAST_MODIFIED_TIME() is after the previous sync's
+  start time (minus a small overlap for clock skew), merges them into the store, and regenerates
+  match_data_sample.json from the store.
+- Airtable does not report deletions; use --prune (one lightweight ID-only pass) or --full to pick them up.
+Snapshot mode:
+- create_mapping_dict.py saves the raw records of every table it fetches to airtable_snapshot.json.
+  With --from-snapshot, a snapshot younger than SNAPSHOT_MAX_AGE that covers the Match Evaluations
+  table is used instead of refetching it; otherwise the table is fetched as usual.
+
+Streaming mode (--stream):
+- Records are converted and written one at a time as Airtable pages (or store rows) arrive,
+  instead of collecting the whole table first (see json_stream.py). The default JSON array
+  output is identical to the batch mode; --format jsonl writes JSON Lines, and --output -
+  writes to stdout (log lines go to stderr) so transform_to_visualization_schema.py --stream
+  can read it from a pipe.
+
+- Set AIRTABLE_ENDPOINT_URL to point at a local fake Airtable server (see benchmarks/) for benchmarking.
 
 Output:
     match_data_sample.json (in same directory)
 """
 import os
+import sys
 import json
-from pyairtable import Api
+import argparse
+import contextlib
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 from airtable_id_name_utils import load_airtable_mapping, id_to_name
+from airtable_client import get_table, iter_records
+from airtable_snapshot import load_snapshot, snapshot_records, modified_since_formula
+from match_store import MatchStore
+from json_stream import STREAM_FORMATS, JsonRecordWriter
+from pipeline_trace import span
+
+OUTPUT_PATH = os.path.join(os.path.dirname(__file__), 'match_data_sample.json')
+# Re-read records modified this long before the previous watermark to absorb clock skew.
+SYNC_OVERLAP = timedelta(seconds=60)
+# Snapshots older than this are considered stale and ignored by --from-snapshot.
+SNAPSHOT_MAX_AGE = timedelta(minutes=15)
+# The Match Evaluation fields record_to_match reads; every fetch requests only these. (The
+# fallback names it also accepts, e.g. 'Funder Name' or 'fit_score', are not fields of the
+# base, and Airtable rejects unknown field names with 422, so they are not requested.)
+MATCH_FIELDS = ['Funders', 'Propositions', 'Fit Score', 'Urgency Score', 'Evaluation Report']
 
 def get_field(fields, key, default=None):
     """Safely get a field from Airtable record fields dict."""
@@ -29,53 +72,196 @@ def get_field(fields, key, default=None):
         return val[0]
     return val
 
-def main():
+def get_match_table():
+    """
+    Builds the pyairtable Table for Match Evaluations from .env settings, on the shared
+    pooled session (see airtable_client.py).
+    Honors AIRTABLE_ENDPOINT_URL (e.g. a local fake Airtable server) when set.
+    """
     load_dotenv()
     AIRTABLE_API_KEY = os.getenv('AIRTABLE_API_KEY')
     AIRTABLE_BASE_ID = os.getenv('AIRTABLE_BASE_ID')
     MATCH_EVALUATIONS_TABLE_ID = os.getenv('MATCH_EVALUATIONS_TABLE_ID')
     if not (AIRTABLE_API_KEY and AIRTABLE_BASE_ID and MATCH_EVALUATIONS_TABLE_ID):
         raise RuntimeError("Missing Airtable credentials or table IDs in .env file.")
-    api = Api(AIRTABLE_API_KEY)
-    table = api.table(AIRTABLE_BASE_ID, MATCH_EVALUATIONS_TABLE_ID)
-    records = table.all()
-    mapping = load_airtable_mapping()
-    output = []
-    for rec in records:
-        fields = rec.get('fields', {})
-        record_id = rec.get('id', '')
-        # Get funder and proposition as IDs (first element if list)
-        funder_id = get_field(fields, 'Funders') or get_field(fields, 'Funder Name') or ''
-        proposition_id = get_field(fields, 'Propositions') or get_field(fields, 'Proposition Name') or ''
-        if isinstance(funder_id, list):
-            funder_id = funder_id[0] if funder_id else ''
-        if isinstance(proposition_id, list):
-            proposition_id = proposition_id[0] if proposition_id else ''
-        funder_name = id_to_name(funder_id, mapping, 'funder')
-        proposition_name = id_to_name(proposition_id, mapping, 'proposition')
-        if funder_name == funder_id:
-            print(f"[WARN] No mapping for funder_id: {funder_id}")
-        if proposition_name == proposition_id:
-            print(f"[WARN] No mapping for proposition_id: {proposition_id}")
-        fit_score = get_field(fields, 'Fit Score') or get_field(fields, 'fit_score')
-        urgency_score = get_field(fields, 'Urgency Score') or get_field(fields, 'urgency_score')
-        
-        text_notes = get_field(fields, 'Evaluation Report') or get_field(fields, 'Notes') or ''
-        output.append({
-            'record_id': record_id,
-            'funder_id': funder_id,
-            'funder_name': funder_name,
-            'proposition_id': proposition_id,
-            'proposition_name': proposition_name,
-            'fit_score': fit_score,
-            'urgency_score': urgency_score,
-            'text_notes': text_notes
-        })
-    output_path = os.path.join(os.path.dirname(__file__), 'match_data_sample.json')
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    return get_table(AIRTABLE_API_KEY, AIRTABLE_BASE_ID, MATCH_EVALUATIONS_TABLE_ID)
+
+def records_from_snapshot(table_id):
+    """
+    Returns the Match Evaluation records from a fresh airtable_snapshot.json, or None.
+    Args:
+        table_id (str): Match Evaluations table ID
+    Returns:
+        list|None: Raw Airtable records, or None if there is no fresh snapshot covering the table
+    """
+    snapshot = load_snapshot()
+    if not snapshot:
+        return None
+    age = datetime.now(timezone.utc) - datetime.fromisoformat(snapshot['fetched_at'])
+    if age > SNAPSHOT_MAX_AGE:
+        print(f"[INFO] Ignoring stale snapshot ({int(age.total_seconds())}s old)")
+        return None
+    return snapshot_records(snapshot, table_id, MATCH_FIELDS)
+
+def sync_store(table, store, full=False, prune=False):
+    """
+    Merges records changed since the store's watermark into the local store.
+    Args:
+        table: pyairtable Table for Match Evaluations
+        store (MatchStore): Local record store
+        full (bool): Discard the store and pull every record (cold sync)
+        prune (bool): Also remove stored records that no longer exist in Airtable
+    Returns:
+        dict: {'mode': 'cold'|'warm', 'changed': int, 'pruned': int, 'total': int}
+    """
+    if full:
+        store.clear()
+    started_at = datetime.now(timezone.utc)
+    watermark = store.get_watermark()
+    if watermark:
+        since = datetime.fromisoformat(watermark) - SYNC_OVERLAP
+        changed = table.all(formula=modified_since_formula(since.strftime('%Y-%m-%dT%H:%M:%S.000Z')),
+                            fields=MATCH_FIELDS)
+        mode = 'warm'
+    else:
+        changed = table.all(fields=MATCH_FIELDS)
+        mode = 'cold'
+    store.upsert(changed)
+    pruned = 0
+    if prune and mode == 'warm':
+        pruned = store.prune(rec['id'] for rec in table.all(fields=['Name']))
+    store.set_watermark(started_at.isoformat())
+    return {'mode': mode, 'changed': len(changed), 'pruned': pruned, 'total': store.count()}
+
+def record_to_match(rec, mapping):
+    """
+    Converts one Airtable Match Evaluation record into the minimal match_data_sample.json row.
+    Args:
+        rec (dict): Airtable record ({'id': ..., 'fields': {...}})
+        mapping (dict): Tuple-keyed Airtable mapping (see airtable_id_name_utils.py)
+    Returns:
+        dict: Minimal match record
+    """
+    fields = rec.get('fields', {})
+    record_id = rec.get('id', '')
+    # Get funder and proposition as IDs (first element if list)
+    funder_id = get_field(fields, 'Funders') or get_field(fields, 'Funder Name') or ''
+    proposition_id = get_field(fields, 'Propositions') or get_field(fields, 'Proposition Name') or ''
+    if isinstance(funder_id, list):
+        funder_id = funder_id[0] if funder_id else ''
+    if isinstance(proposition_id, list):
+        proposition_id = proposition_id[0] if proposition_id else ''
+    funder_name = id_to_name(funder_id, mapping, 'funder')
+    proposition_name = id_to_name(proposition_id, mapping, 'proposition')
+    if funder_name == funder_id:
+        print(f"[WARN] No mapping for funder_id: {funder_id}")
+    if proposition_name == proposition_id:
+        print(f"[WARN] No mapping for proposition_id: {proposition_id}")
+    fit_score = get_field(fields, 'Fit Score') or get_field(fields, 'fit_score')
+    urgency_score = get_field(fields, 'Urgency Score') or get_field(fields, 'urgency_score')
+
+    text_notes = get_field(fields, 'Evaluation Report') or get_field(fields, 'Notes') or ''
+    return {
+        'record_id': record_id,
+        'funder_id': funder_id,
+        'funder_name': funder_name,
+        'proposition_id': proposition_id,
+        'proposition_name': proposition_name,
+        'fit_score': fit_score,
+        'urgency_score': urgency_score,
+        'text_notes': text_notes
+    }
+
+def build_match_data(records, mapping):
+    """Converts raw Airtable records into the minimal match_data_sample.json rows."""
+    with span('build match data', 'transform', records=len(records)):
+        return [record_to_match(rec, mapping) for rec in records]
+
+def iter_match_data(records, mapping):
+    """Streaming counterpart of build_match_data: converts records lazily, one at a time."""
+    return (record_to_match(rec, mapping) for rec in records)
+
+def iter_table_records(table):
+    """
+    Yields a table's records page by page (100 per request) instead of collecting them all.
+    The next page is fetched while the current one is converted and written (see airtable_client.prefetch).
+    """
+    return iter_records(table, fields=MATCH_FIELDS)
+
+def write_match_data(output, output_path=OUTPUT_PATH):
+    """Writes the minimal match rows to match_data_sample.json."""
+    # json.dump streams the encoder's chunks to the file; json.dumps with indent would first
+    # join them all in memory (roughly doubling peak RSS at 100k records).
+    with span('serialize and write match data', 'write', records=len(output), path=os.path.basename(output_path)) as s:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2, ensure_ascii=False)
+        s.set(bytes=os.path.getsize(output_path))
     rel_output_path = os.path.relpath(output_path, os.getcwd())
     print(f"[INFO] Wrote {len(output)} records to {rel_output_path}")
 
+def main():
+    parser = argparse.ArgumentParser(description='Fetch Match Evaluation records from Airtable into match_data_sample.json.')
+    parser.add_argument('--incremental', action='store_true', help='Sync only records changed since the last run into the local store')
+    parser.add_argument('--full', action='store_true', help='With --incremental: rebuild the local store from scratch')
+    parser.add_argument('--prune', action='store_true', help='With --incremental: remove records deleted in Airtable')
+    parser.add_argument('--from-snapshot', action='store_true', help='Reuse records from a fresh airtable_snapshot.json if available')
+    parser.add_argument('--stream', action='store_true', help='Convert and write records as they arrive (memory independent of record count)')
+    parser.add_argument('--output', default=OUTPUT_PATH, help="With --stream: output file ('-' for stdout)")
+    parser.add_argument('--format', choices=STREAM_FORMATS, default='array',
+                        help='With --stream: JSON array (default, same as batch mode) or JSON Lines')
+    args = parser.parse_args()
+    if (args.full or args.prune) and not args.incremental:
+        parser.error('--full and --prune require --incremental')
+    if args.stream:
+        # Log lines (including per-record mapping warnings) go to stderr when the records go to stdout.
+        out = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr if args.output == '-' else out):
+            stream_main(args, out=out)
+        return
+
+    table = get_match_table()
+    records = records_from_snapshot(os.getenv('MATCH_EVALUATIONS_TABLE_ID')) if args.from_snapshot else None
+    if records is not None:
+        print(f"[INFO] Using {len(records)} records from airtable_snapshot.json")
+    elif args.incremental:
+        with MatchStore() as store:
+            with span('sync store', 'fetch') as s:
+                stats = sync_store(table, store, full=args.full, prune=args.prune)
+                s.set(records=stats['changed'], mode=stats['mode'])
+            print(f"[INFO] {stats['mode'].capitalize()} sync: {stats['changed']} changed, "
+                  f"{stats['pruned']} pruned, {stats['total']} records in store")
+            with span('read store', 'parse') as s:
+                records = list(store.iter_records())
+                s.set(records=len(records))
+    else:
+        with span('fetch match evaluations', 'fetch') as s:
+            records = table.all(fields=MATCH_FIELDS)
+            s.set(records=len(records))
+    output = build_match_data(records, load_airtable_mapping())
+    write_match_data(output)
+
+def stream_main(args, out):
+    """--stream: writes match rows to args.output as the records are read. `out` is the real stdout."""
+    table = get_match_table()
+    mapping = load_airtable_mapping()
+    output = out if args.output == '-' else args.output
+    with contextlib.ExitStack() as stack:
+        records = records_from_snapshot(os.getenv('MATCH_EVALUATIONS_TABLE_ID')) if args.from_snapshot else None
+        if records is not None:
+            print(f"[INFO] Using {len(records)} records from airtable_snapshot.json")
+        elif args.incremental:
+            store = stack.enter_context(MatchStore())
+            stats = sync_store(table, store, full=args.full, prune=args.prune)
+            print(f"[INFO] {stats['mode'].capitalize()} sync: {stats['changed']} changed, "
+                  f"{stats['pruned']} pruned, {stats['total']} records in store")
+            records = store.iter_records()
+        else:
+            records = iter_table_records(table)
+        # Fetching, converting and writing are interleaved record by record, so one span covers them.
+        with span('stream match data', 'write', format=args.format) as s, JsonRecordWriter(output, args.format) as writer:
+            writer.write_all(iter_match_data(records, mapping))
+            s.set(records=writer.count)
+    print(f"[INFO] Streamed {writer.count} records to {args.output}")
+
 if __name__ == '__main__':
     main()
@@ -12,9 +12,13 @@ Workflow:
 5.  If a `--team` is specified, it loads the team's `config.json` to determine
     which propositions and funders should be checked by default in the view.
 6.  Creates a metadata object with the generation date and team name.
-7.  Injects the data, view configuration, and metadata into the template.
+7.  Injects the data (as a compact columnar payload by default, see encode_columnar),
+    view configuration, and metadata into the template.
 8.  Writes the final, fully-formed HTML to the appropriate output directory
     (either the global `outputs/` or the team-specific `teams/<team_name>/outputs/`).
+    The template is compiled once into literal segments and named slots (compile_template),
+    and the page is streamed to the file piece by piece, so the embedded dataset is never
+    copied into intermediate versions of the document.
 
 Usage:
 - For a global report (all items checked by default):
@@ -22,15 +26,47 @@ Usage:
 
 - For a team-specific report (team items checked by default):
   python scripts/generate_visualization.py --team <team_name>
+
+- To embed the legacy array of row objects instead of the columnar payload:
+  python scripts/generate_visualization.py --payload rows
+
+- Evaluation notes are looked up by record index when a point is clicked, never copied per
+  point. --notes inline (the default) keeps them in the dataset. --notes compressed stores them
+  once, gzip-compressed, and decodes them on the first click; --notes sidecar moves that block
+  to a separate <output>.notes.js file. Both need a browser with DecompressionStream (Chrome 80,
+  Firefox 113, Safari 16.4 or later); in older browsers the popup says to regenerate with
+  --notes inline.
+
+- Large datasets are drawn with WebGL (Plotly scattergl) instead of SVG: automatically above
+  --webgl-threshold points (default 5000), or always/never with --renderer webgl/svg.
+
+- To render every team's view (each teams/<team>/config.json) in one run:
+  python scripts/generate_visualization.py --all-teams [--workers N]
+  The template, data, mapping and checkboxer are loaded once and the dataset is serialized
+  once (see prepare_render); each team then only adds its view configuration. Teams are
+  rendered in parallel by a process pool, and the time per team is reported.
+
+- For static hosting, --bundle writes the page minified (see html_bundle.py) with .gz and
+  .br siblings (.br needs the optional brotli package), and reports the byte size of each
+  section (template, data, notes, checkboxer, teams panel) before and after minification,
+  plus gzip, in the log and in <output>.bundle.json:
+  python scripts/generate_visualization.py --bundle [--team <team_name> | --all-teams]
 """
+import base64
+import gzip
 import json
 import os
+import re
 import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from create_mapping_dict import load_mapping_from_file, lookup_id
 from generate_teams_panel_html_from_json import generate_teams_panel_html_from_json
+from html_bundle import HtmlMinifier, compress_bytes, compress_file, minify_html, remove_compressed
+from pipeline_trace import span
 
 import subprocess
 from datetime import timezone
@@ -52,24 +88,52 @@ def get_file_mtime_iso(path):
     except Exception:
         return 'unknown'
 
-# --- Generate and log a reproducibility stamp ---
-stamp = {
-    'generation_date': datetime.now(timezone.utc).isoformat(),
-    'code_version': get_git_commit_hash(),
-    'mapping_version': None  # to be set after mapping_path is defined
-}
-
-# Will set mapping_version after mapping_path is known
+def make_stamp(mapping_version=None):
+    """
+    Builds the reproducibility stamp logged with every generated HTML.
+    Args:
+        mapping_version (str): ISO timestamp identifying the mapping used; defaults to the
+                               mtime of airtable_mapping.json
+    Returns:
+        dict: {'generation_date', 'code_version', 'mapping_version'}
+    """
+    return {
+        'generation_date': datetime.now(timezone.utc).isoformat(),
+        'code_version': get_git_commit_hash(),
+        'mapping_version': mapping_version or get_file_mtime_iso(mapping_path)
+    }
+
+PAYLOAD_FORMATS = ('columnar', 'rows')
+# Plot coordinates are jittered display positions; 4 decimals is far below a pixel.
+COORDINATE_DECIMALS = 4
+NOTES_MODES = ('compressed', 'sidecar', 'inline')
+NOTES_PLACEHOLDER = '<!-- NOTES_PLACEHOLDER -->'
+RENDERERS = ('auto', 'svg', 'webgl')
+# Above this many points, 'auto' switches the plot from SVG scatter to WebGL scattergl.
+WEBGL_THRESHOLD = 5000
 
 # --- Argument Parsing ---
 def parse_args():
     """Parses command-line arguments for the script."""
     parser = argparse.ArgumentParser(description='Generate an interactive opportunity visualization.')
     parser.add_argument('--team', type=str, help='The name of the team to generate a specific view for.')
+    parser.add_argument('--all-teams', action='store_true',
+                        help='Generate the view of every team with a config.json (shared inputs loaded once)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes used by --all-teams (default: CPU count; 1 renders in-process)')
+    parser.add_argument('--payload', choices=PAYLOAD_FORMATS, default='columnar',
+                        help='Embedded data format: columnar (compact, default) or rows (legacy array of objects)')
+    parser.add_argument('--notes', choices=NOTES_MODES, default='inline',
+                        help='Where evaluation notes live: inline in the dataset (default), compressed block '
+                             'in the page, or sidecar .notes.js file (both need DecompressionStream)')
+    parser.add_argument('--renderer', choices=RENDERERS, default='auto',
+                        help='Plot renderer: auto (WebGL above --webgl-threshold points, default), svg or webgl')
+    parser.add_argument('--webgl-threshold', type=int, default=WEBGL_THRESHOLD,
+                        help=f'Point count above which --renderer auto uses WebGL (default {WEBGL_THRESHOLD})')
+    parser.add_argument('--bundle', action='store_true',
+                        help='Write minified HTML with .gz/.br siblings and report per-section sizes')
     return parser.parse_args()
 
-args = parse_args()
-
 # --- Path Definitions ---
 # Define file paths relative to the script's location for robustness.
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -80,66 +144,81 @@ base_dir = script_dir
 template_path = os.path.join(base_dir, 'templates', 'visualization_template.html')
 data_path = os.path.join(base_dir, 'visualization_data.json')
 checkboxer_script_path = os.path.join(base_dir, 'checkboxer.js')
+mapping_path = os.path.join(base_dir, 'airtable_mapping.json')
+teams_panel_path = os.path.join(base_dir, 'teams_panel_data.json')
 outputs_dir = os.path.join(base_dir, 'outputs')
-os.makedirs(outputs_dir, exist_ok=True)
-
-# Output path
-if args.team:
-    team_dir = os.path.join(base_dir, 'teams', args.team)
-    team_outputs_dir = os.path.join(team_dir, 'outputs')
-    os.makedirs(team_outputs_dir, exist_ok=True)
-    output_path = os.path.join(team_outputs_dir, 'opportunity_visualization.html')
-    config_path = os.path.join(team_dir, 'config.json')
-else:
-    output_path = os.path.join(outputs_dir, 'opportunity_visualization.html')
-
-rel_template_path = os.path.relpath(template_path, os.getcwd())
-rel_data_path = os.path.relpath(data_path, os.getcwd())
-rel_checkboxer_path = os.path.relpath(checkboxer_script_path, os.getcwd())
-rel_output_path = os.path.relpath(output_path, os.getcwd())
-print(f"[INFO] Template path: {rel_template_path}")
-print(f"[INFO] Data path: {rel_data_path}")
-print(f"[INFO] Checkboxer path: {rel_checkboxer_path}")
-print(f"[INFO] Output HTML: {rel_output_path}")
+# Team view configurations: <teams_config_dir>/<team>/config.json
+teams_config_dir = os.path.abspath(os.path.join(script_dir, '..', 'teams'))
+
+def list_teams(config_dir=teams_config_dir):
+    """Returns the names of all teams with a config.json, sorted."""
+    if not os.path.isdir(config_dir):
+        return []
+    return sorted(name for name in os.listdir(config_dir)
+                  if os.path.isfile(os.path.join(config_dir, name, 'config.json')))
+
+def get_output_path(team=None):
+    """Returns the output HTML path (global `outputs/` or `teams/<team>/outputs/`), creating its directory."""
+    if team:
+        team_outputs_dir = os.path.join(base_dir, 'teams', team, 'outputs')
+        os.makedirs(team_outputs_dir, exist_ok=True)
+        return os.path.join(team_outputs_dir, 'opportunity_visualization.html')
+    os.makedirs(outputs_dir, exist_ok=True)
+    return os.path.join(outputs_dir, 'opportunity_visualization.html')
 
 # --- Data and Template Loading ---
-# Load the HTML template file into a string.
-try:
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template_string = f.read()
-except FileNotFoundError:
-    print(f"Error: Template file not found at {template_path}")
-    exit()
-
-
-# Load the main JSON data file.
-try:
-    with open(data_path, 'r', encoding='utf-8') as f:
-        json_data = json.load(f)
-except FileNotFoundError:
-    print(f"Error: Data file not found at {data_path}")
-    exit()
-except json.JSONDecodeError:
-    print(f"Error: Could not decode JSON from {data_path}")
-    exit()
+def load_template(path=template_path):
+    """Loads the HTML template file into a string."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        print(f"Error: Template file not found at {path}")
+        sys.exit(1)
+
+def load_data(path=data_path):
+    """Loads the main JSON data file (visualization_data.json)."""
+    try:
+        with span('load visualization data', 'parse', path=os.path.basename(path)) as s:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            s.set(records=len(data), bytes=os.path.getsize(path))
+            return data
+    except FileNotFoundError:
+        print(f"Error: Data file not found at {path}")
+        sys.exit(1)
+    except json.JSONDecodeError:
+        print(f"Error: Could not decode JSON from {path}")
+        sys.exit(1)
+
+def load_mapping(path=mapping_path):
+    """Loads the mapping from the canonical JSON file, or returns None on failure."""
+    try:
+        return load_mapping_from_file(path)
+    except Exception as e:
+        print(f"Error loading mapping from {path}: {e}")
+        return None
+
+def load_checkboxer(path=checkboxer_script_path):
+    """Loads the checkboxer script, or returns an empty string if it is missing."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        print(f"Warning: Checkboxer script not found at {path}")
+        return ""
 
 # --- Airtable Mapping Loading and Name-to-ID Dicts ---
-# Set mapping_version in the stamp
-stamp['mapping_version'] = get_file_mtime_iso(os.path.join(script_dir, 'airtable_mapping.json'))
-print(f"[STAMP] {json.dumps(stamp, indent=2)}")
-
-# Load the mapping from the canonical JSON file
-mapping_path = os.path.join(script_dir, 'airtable_mapping.json')
-try:
-    mapping = load_mapping_from_file(mapping_path)
-except Exception as e:
-    print(f"Error loading mapping from {mapping_path}: {e}")
-    mapping = None
-
-# Build {name: id} for propositions and funders
-proposition_name_to_id = {}
-funder_name_to_id = {}
-if mapping:
+def build_name_to_id(json_data, mapping):
+    """
+    Builds {name: id} dicts for the propositions and funders present in the data.
+    Returns:
+        tuple: (proposition_name_to_id, funder_name_to_id)
+    """
+    proposition_name_to_id = {}
+    funder_name_to_id = {}
+    if not mapping:
+        return proposition_name_to_id, funder_name_to_id
     # Get all unique proposition and funder names from data
     prop_names = sorted(list(set(item['proposition_name'] for item in json_data)))
     funder_names = sorted(list(set(item['funder_name'] for item in json_data)))
@@ -151,28 +230,101 @@ if mapping:
         rec_id = lookup_id(mapping, "Funders", "FUNDER'S NAME", name)
         if rec_id:
             funder_name_to_id[name] = rec_id
-    # --- Inject Teams Panel HTML ---
-    teams_panel_html = generate_teams_panel_html_from_json(os.path.join(script_dir, 'teams_panel_data.json'))
-    # Insert panel above the plotly-div
-    if '<!-- TEAMS_PANEL_PLACEHOLDER -->' in template_string:
-        template_string = template_string.replace('<!-- TEAMS_PANEL_PLACEHOLDER -->', teams_panel_html)
-    else:
-        # Insert above the plotly-div
-        template_string = template_string.replace('<div id="plotly-div"', teams_panel_html + '\n<div id="plotly-div"')
-else:
-    print("[WARN] No mapping loaded. Name-to-ID dicts will be empty.")
-
-# Prepare JSON strings for embedding (not yet used in template)
-proposition_name_to_id_json = json.dumps(proposition_name_to_id, indent=None)
-funder_name_to_id_json = json.dumps(funder_name_to_id, indent=None)
-# Next step: inject these into the template for use in checkbox generation.
+    return proposition_name_to_id, funder_name_to_id
+
+# --- Template Compilation ---
+# Slot markers in the template, by slot name. Each marker is replaced by its slot's value.
+TEAMS_PANEL_PLACEHOLDER = '<!-- TEAMS_PANEL_PLACEHOLDER -->'
+PLOTLY_DIV_MARKER = '<div id="plotly-div"'
+CHECKBOXER_PLACEHOLDER = '<script data-checkboxer>\n        // The checkboxer script will be injected here\n    </script>'
+TEMPLATE_SLOTS = {
+    '{METADATA_PLACEHOLDER}': 'metadata',
+    '{CONFIG_PLACEHOLDER}': 'config',
+    '{RENDER_PLACEHOLDER}': 'render_config',
+    '{DATA_PLACEHOLDER}': 'data',
+    '// {NAME_TO_ID_PLACEHOLDER}': 'name_to_id_script',
+    NOTES_PLACEHOLDER: 'notes_block',
+    TEAMS_PANEL_PLACEHOLDER: 'teams_panel',
+    CHECKBOXER_PLACEHOLDER: 'checkboxer_tag',
+}
+_SLOT_RE = re.compile('|'.join(re.escape(marker) for marker in TEMPLATE_SLOTS))
+# Slots reported as their own section in --bundle size reports; all other text counts as 'template'.
+BUNDLE_SECTIONS = ('template', 'data', 'notes', 'checkboxer', 'teams_panel')
+SECTION_OF_SLOT = {'data': 'data', 'notes_block': 'notes', 'checkboxer_tag': 'checkboxer', 'teams_panel': 'teams_panel'}
+_compiled_templates = {}
+
+def compile_template(template_string):
+    """
+    Splits the template once into literal text and named slots (see TEMPLATE_SLOTS).
+    Without a Teams panel placeholder, the panel slot goes directly above the plotly-div.
+    Results are cached per template.
+    Returns:
+        tuple: Segments, each ('text', literal) or ('slot', (name, marker))
+    """
+    if template_string in _compiled_templates:
+        return _compiled_templates[template_string]
+    segments = []
+    pos = 0
+    for m in _SLOT_RE.finditer(template_string):
+        segments.append(('text', template_string[pos:m.start()]))
+        segments.append(('slot', (TEMPLATE_SLOTS[m.group()], m.group())))
+        pos = m.end()
+    segments.append(('text', template_string[pos:]))
+    if TEAMS_PANEL_PLACEHOLDER not in template_string:
+        fallback = []
+        for kind, value in segments:
+            if kind == 'text' and PLOTLY_DIV_MARKER in value:
+                before, after = value.split(PLOTLY_DIV_MARKER, 1)
+                fallback += [('text', before), ('slot', ('teams_panel', '')), ('text', PLOTLY_DIV_MARKER + after)]
+            else:
+                fallback.append((kind, value))
+        segments = fallback
+    segments = tuple((kind, value) for kind, value in segments if not (kind == 'text' and value == ''))
+    _compiled_templates[template_string] = segments
+    return segments
+
+def iter_rendered_sections(segments, values):
+    """
+    Yields the page piece by piece as (section, piece): literals and slot values, in order,
+    without building the whole document. A slot whose value is None keeps its marker (e.g.
+    no Teams panel). The panel-above-plotly fallback slot adds the newline the old insertion did.
+    """
+    for kind, value in segments:
+        if kind == 'text':
+            yield 'template', value
+            continue
+        name, marker = value
+        section = SECTION_OF_SLOT.get(name, 'template')
+        filled = values.get(name)
+        if filled is None:
+            yield 'template', marker
+        elif name == 'teams_panel' and not marker:
+            yield section, filled + '\n'
+        else:
+            yield section, filled
+
+def iter_rendered(segments, values):
+    """Yields the page piece by piece (see iter_rendered_sections)."""
+    return (piece for _, piece in iter_rendered_sections(segments, values))
 
 # --- Team-Specific View Configuration ---
-# If a team is specified, create a view configuration to pre-select items.
-view_config = {}
-if args.team:
+def legend_names(json_data):
+    """Returns (all_propositions, all_funders): the sorted unique names in the data."""
+    return (sorted(set(item['proposition_name'] for item in json_data)),
+            sorted(set(item['funder_name'] for item in json_data)))
+
+def load_view_config(team, json_data=None, names=None):
+    """
+    If a team is specified, creates a view configuration to pre-select items.
+    Args:
+        names (tuple): Optional precomputed legend_names(json_data), so json_data is not rescanned
+    Returns:
+        dict: View configuration (empty for the global view)
+    """
+    if not team:
+        return {}
     # Look for the config file in the visualization_original/teams directory
-    team_config_path = os.path.abspath(os.path.join(script_dir, '..', 'teams', args.team, 'config.json'))
+    team_config_path = os.path.join(teams_config_dir, team, 'config.json')
     try:
         # Load the team's configuration file.
         with open(team_config_path, 'r', encoding='utf-8') as f:
@@ -183,11 +335,10 @@ if args.team:
         team_funders = team_config.get('funders', [])
 
         # Get all unique propositions and funders from the data for the legend
-        all_propositions = sorted(list(set(item['proposition_name'] for item in json_data)))
-        all_funders = sorted(list(set(item['funder_name'] for item in json_data)))
+        all_propositions, all_funders = names or legend_names(json_data)
 
         # Assemble the final view configuration object with proper initialization
-        view_config = {
+        return {
             'initial_propositions': team_propositions,
             'initial_funders': team_funders,  # Use the funders directly from config
             'all_propositions': all_propositions,
@@ -195,55 +346,427 @@ if args.team:
         }
 
     except FileNotFoundError:
-        print(f"Warning: Config file for team '{args.team}' not found at {team_config_path}. Generating a global view.")
+        print(f"Warning: Config file for team '{team}' not found at {team_config_path}. Generating a global view.")
     except json.JSONDecodeError:
         print(f"Warning: Could not decode JSON from {team_config_path}. Generating a global view.")
-
-# --- Metadata Preparation ---
-# Create a metadata object to inject into the template for dynamic titles.
-metadata = {
-    'team_name': args.team,
-    'generation_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-}
-
-# --- Load Checkboxer Script ---
-checkboxer_script_path = os.path.join(script_dir, 'checkboxer.js')
-try:
-    with open(checkboxer_script_path, 'r', encoding='utf-8') as f:
-        checkboxer_script = f.read()
-except FileNotFoundError:
-    print(f"Warning: Checkboxer script not found at {checkboxer_script_path}")
-    checkboxer_script = ""
+    return {}
+
+# --- Embedded Data Payload ---
+def _round_coordinate(value):
+    return round(value, COORDINATE_DECIMALS) if isinstance(value, float) else value
+
+def encode_columnar(json_data):
+    """
+    Encodes visualization records as columns instead of an array of row objects.
+    Funder and proposition names are dictionary-encoded (each name stored once, records hold
+    an integer index), in first-seen order so the template assigns the same colors/symbols
+    as it does for row data.
+    Args:
+        json_data (list): Visualization records (visualization_data.json rows)
+    Returns:
+        dict: {'format': 'columnar', 'funders': [...], 'propositions': [...],
+               'funder': [idx], 'proposition': [idx], 'x_urgency': [...], 'y_fit': [...],
+               'fit_score': [...], 'urgency_score': [...], 'record_id': [...], 'text_notes': [...]}
+    """
+    funder_index = {}
+    proposition_index = {}
+    columns = {
+        'format': 'columnar',
+        'funders': [],
+        'propositions': [],
+        'funder': [],
+        'proposition': [],
+        'x_urgency': [],
+        'y_fit': [],
+        'fit_score': [],
+        'urgency_score': [],
+        'record_id': [],
+        'text_notes': [],
+    }
+    for item in json_data:
+        funder = item.get('funder_name', '')
+        proposition = item.get('proposition_name', '')
+        if funder not in funder_index:
+            funder_index[funder] = len(columns['funders'])
+            columns['funders'].append(funder)
+        if proposition not in proposition_index:
+            proposition_index[proposition] = len(columns['propositions'])
+            columns['propositions'].append(proposition)
+        columns['funder'].append(funder_index[funder])
+        columns['proposition'].append(proposition_index[proposition])
+        columns['x_urgency'].append(_round_coordinate(item.get('x_urgency')))
+        columns['y_fit'].append(_round_coordinate(item.get('y_fit')))
+        columns['fit_score'].append(item.get('fit_score'))
+        columns['urgency_score'].append(item.get('urgency_score'))
+        columns['record_id'].append(item.get('record_id', ''))
+        columns['text_notes'].append(item.get('text_notes', ''))
+    return columns
+
+def encode_payload(json_data, payload='columnar', include_notes=True):
+    """
+    Serializes the records for embedding in the template, in the requested payload format.
+    With include_notes=False the text_notes are left out (they are shipped separately, see encode_notes).
+    """
+    if payload == 'columnar':
+        columns = encode_columnar(json_data)
+        if not include_notes:
+            del columns['text_notes']
+        return json.dumps(columns, separators=(',', ':'))
+    if payload == 'rows':
+        if not include_notes:
+            json_data = [{k: v for k, v in item.items() if k != 'text_notes'} for item in json_data]
+        return json.dumps(json_data, indent=None) # Compact representation
+    raise ValueError(f"Unknown payload format {payload!r}; expected one of {PAYLOAD_FORMATS}")
+
+# --- Evaluation Notes ---
+def encode_notes(json_data):
+    """
+    Compresses all records' text_notes (a JSON array, in record order) for lazy decoding in the page.
+    gzip's mtime is pinned so identical notes always produce identical output.
+    Returns:
+        str: base64 of the gzip-compressed JSON array
+    """
+    notes = json.dumps([item.get('text_notes', '') for item in json_data], ensure_ascii=False, separators=(',', ':'))
+    return base64.b64encode(gzip.compress(notes.encode('utf-8'), mtime=0)).decode('ascii')
+
+def get_notes_sidecar_path(output_path):
+    """Returns the sidecar notes script path for an output HTML path (e.g. opportunity_visualization.notes.js)."""
+    return os.path.splitext(output_path)[0] + '.notes.js'
+
+def render_notes_block(json_data, notes='inline', sidecar_src=None):
+    """
+    Builds the element the template reads notes from.
+    Args:
+        notes (str): 'compressed' (notes embedded, gzip+base64), 'sidecar' (element points at
+                     sidecar_src) or 'inline' (no element; notes stay in the dataset)
+    Returns:
+        str: HTML for NOTES_PLACEHOLDER
+    """
+    if notes == 'compressed':
+        return f'<script id="notes-data" type="application/octet-stream" data-mode="compressed">{encode_notes(json_data)}</script>'
+    if notes == 'sidecar':
+        return f'<script id="notes-data" type="application/octet-stream" data-mode="sidecar" data-src="{sidecar_src}"></script>'
+    if notes == 'inline':
+        return ''
+    raise ValueError(f"Unknown notes mode {notes!r}; expected one of {NOTES_MODES}")
+
+def notes_sidecar_script(json_data):
+    """The sidecar notes script, which hands the compressed notes to the page when loaded."""
+    return f'window.GSW_NOTES = "{encode_notes(json_data)}";\n'
+
+def write_notes_sidecar(json_data, sidecar_path):
+    """Writes the sidecar notes script (see notes_sidecar_script)."""
+    with open(sidecar_path, 'w', encoding='utf-8') as f:
+        f.write(notes_sidecar_script(json_data))
+    remove_compressed(sidecar_path)
+    print(f"[INFO] Notes sidecar: {os.path.relpath(sidecar_path, os.getcwd())}")
 
 # --- HTML Generation ---
-# Convert the Python data structures to JSON strings for embedding in the HTML.
-json_string_for_embedding = json.dumps(json_data, indent=None) # Compact representation
-config_string_for_embedding = json.dumps(view_config, indent=None)
-metadata_string_for_embedding = json.dumps(metadata)
-checkboxer_script_escaped = json.dumps(checkboxer_script)  # Escape for JS embedding
-
-# Replace the placeholders in the template with the prepared strings.
-final_html = template_string.replace('{METADATA_PLACEHOLDER}', metadata_string_for_embedding)
-# Prepare the metadata string for embedding
-metadata_string_for_embedding = json.dumps(stamp, indent=None)
-final_html = final_html.replace('{METADATA_PLACEHOLDER}', metadata_string_for_embedding)
-final_html = final_html.replace('{CONFIG_PLACEHOLDER}', config_string_for_embedding)
-final_html = final_html.replace('{DATA_PLACEHOLDER}', json_string_for_embedding)
-
-# Inject name-to-id mappings as JS variables (for template use)
-prop_id_js = f"<script>const propositionNameToId = {proposition_name_to_id_json}; const funderNameToId = {funder_name_to_id_json};</script>"
-final_html = final_html.replace('// {NAME_TO_ID_PLACEHOLDER}', prop_id_js)
-
-# Inject the checkboxer script content
-script_tag = f'<script data-checkboxer>{checkboxer_script}</script>'
-final_html = final_html.replace('<script data-checkboxer>\n        // The checkboxer script will be injected here\n    </script>', script_tag)
-
-# --- File Output ---
-# Write the final, fully-formed HTML string to the output file.
-try:
+def prepare_render(template_string, json_data, mapping, checkboxer_script='', payload='columnar',
+                   notes='inline', notes_sidecar_src=None, renderer='auto', webgl_threshold=WEBGL_THRESHOLD):
+    """
+    Does the team-independent part of rendering once: Teams panel, name-to-ID dicts, the
+    serialized dataset and notes, and the checkboxer tag. See render_html for the arguments.
+    Returns:
+        dict: Compiled template and prepared slot values for render_prepared (picklable, so it
+              can be shipped to workers)
+    """
+    proposition_name_to_id, funder_name_to_id = build_name_to_id(json_data, mapping)
+    teams_panel_html = None
+    if mapping:
+        # --- Teams Panel HTML ---
+        teams_panel_html = generate_teams_panel_html_from_json(teams_panel_path)
+    else:
+        print("[WARN] No mapping loaded. Name-to-ID dicts will be empty.")
+
+    # Prepare JSON strings for embedding
+    proposition_name_to_id_json = json.dumps(proposition_name_to_id, indent=None)
+    funder_name_to_id_json = json.dumps(funder_name_to_id, indent=None)
+
+    if renderer not in RENDERERS:
+        raise ValueError(f"Unknown renderer {renderer!r}; expected one of {RENDERERS}")
+    return {
+        'segments': compile_template(template_string),
+        'teams_panel': teams_panel_html,
+        # Convert the Python data structures to JSON strings for embedding in the HTML.
+        'data': encode_payload(json_data, payload, include_notes=(notes == 'inline')),
+        'notes_block': render_notes_block(json_data, notes, notes_sidecar_src),
+        'render_config': json.dumps({'renderer': renderer, 'webgl_threshold': webgl_threshold}),
+        # Inject name-to-id mappings as JS variables (for template use)
+        'name_to_id_script': f"<script>const propositionNameToId = {proposition_name_to_id_json}; const funderNameToId = {funder_name_to_id_json};</script>",
+        'checkboxer_tag': f'<script data-checkboxer>{checkboxer_script}</script>',
+        'legend_names': legend_names(json_data),
+    }
+
+def view_values(prepared, stamp, team=None):
+    """Adds the team's view configuration and the metadata to prepare_render() output."""
+    view_config = load_view_config(team, names=prepared['legend_names'])
+
+    # --- Metadata Preparation ---
+    # Metadata for dynamic titles, plus the reproducibility stamp (see make_stamp).
+    metadata = {
+        'team_name': team,
+        'generation_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'stamp': stamp,
+    }
+    return dict(prepared, metadata=json.dumps(metadata), config=json.dumps(view_config, indent=None))
+
+def iter_prepared(prepared, stamp, team=None):
+    """
+    Yields one view of prepare_render() output in pieces (see iter_rendered). Each slot is
+    filled exactly once.
+    """
+    return iter_rendered(prepared['segments'], view_values(prepared, stamp, team))
+
+def render_prepared(prepared, stamp, team=None):
+    """
+    Renders one view from prepare_render() output.
+    Returns:
+        str: The final, fully-formed HTML
+    """
+    return ''.join(iter_prepared(prepared, stamp, team))
+
+def render_html(template_string, json_data, mapping, stamp, team=None, checkboxer_script='', payload='columnar',
+                notes='inline', notes_sidecar_src=None, renderer='auto', webgl_threshold=WEBGL_THRESHOLD):
+    """
+    Injects the data, view configuration, metadata, mappings, Teams panel and checkboxer
+    script into the template.
+    Args:
+        payload (str): Embedded data format, 'columnar' (default) or 'rows'
+        notes (str): Notes storage, see render_notes_block
+        notes_sidecar_src (str): Sidecar script URL, relative to the HTML (notes='sidecar' only)
+        renderer (str): 'auto', 'svg' or 'webgl'; the page picks the trace type (see RENDERERS)
+        webgl_threshold (int): Point count above which 'auto' uses WebGL
+    Returns:
+        str: The final, fully-formed HTML
+    """
+    prepared = prepare_render(template_string, json_data, mapping, checkboxer_script, payload,
+                              notes, notes_sidecar_src, renderer, webgl_threshold)
+    return render_prepared(prepared, stamp, team)
+
+# --- Static Hosting Bundle ---
+def minify_prepared(prepared):
+    """
+    Returns a copy of prepare_render() output with the template text, Teams panel and checkboxer
+    minified (see html_bundle.py). The data and notes are already compact and are left as they are.
+    """
+    minifier = HtmlMinifier()
+    segments = tuple((kind, minifier.feed(value) if kind == 'text' else value)
+                     for kind, value in prepared['segments'])
+    teams_panel = prepared['teams_panel']
+    return dict(prepared, segments=segments,
+                teams_panel=minify_html(teams_panel) if teams_panel is not None else None,
+                checkboxer_tag=minify_html(prepared['checkboxer_tag']))
+
+def get_bundle_report_path(output_path):
+    """Returns the size report path for an output HTML path (e.g. opportunity_visualization.bundle.json)."""
+    return os.path.splitext(output_path)[0] + '.bundle.json'
+
+def _section_text(pieces):
+    sections = {name: [] for name in BUNDLE_SECTIONS}
+    for section, piece in pieces:
+        sections[section].append(piece)
+    return {name: ''.join(parts).encode('utf-8') for name, parts in sections.items()}
+
+def write_bundle(prepared, minified, stamp, output_path, team=None, sidecar_path=None):
+    """
+    Writes one view minified, with .gz/.br siblings, and its size report (<output>.bundle.json).
+    Args:
+        prepared (dict): prepare_render() output (measured for the 'raw' sizes)
+        minified (dict): minify_prepared(prepared) (rendered and written)
+        sidecar_path (str): Notes sidecar to precompress as well (notes='sidecar' only)
+    Returns:
+        dict: {'output', 'sections': {section: {'raw', 'minified', 'gzip'}},
+               'total': {'raw', 'minified', 'gz'[, 'br']}[, 'sidecar': {'raw', 'gz'[, 'br']}]}
+    """
+    values = view_values(prepared, stamp, team)
+    minified_values = dict(minified, metadata=values['metadata'], config=values['config'])
+    raw = _section_text(iter_rendered_sections(prepared['segments'], values))
+    pieces = list(iter_rendered_sections(minified['segments'], minified_values))
+    small = _section_text(pieces)
+    write_html((piece for _, piece in pieces), output_path)
+    report = {
+        'output': os.path.relpath(output_path, base_dir),
+        'sections': {name: {'raw': len(raw[name]), 'minified': len(small[name]),
+                            'gzip': len(compress_bytes(small[name])['gz'])}
+                     for name in BUNDLE_SECTIONS},
+        'total': {'raw': sum(len(b) for b in raw.values()), 'minified': sum(len(b) for b in small.values()),
+                  **compress_file(output_path)},
+    }
+    if sidecar_path:
+        report['sidecar'] = {'raw': os.path.getsize(sidecar_path), **compress_file(sidecar_path)}
+    with open(get_bundle_report_path(output_path), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def print_bundle_report(report):
+    """Logs a bundle size report (see write_bundle) as a table of bytes per section."""
+    print(f"[BUNDLE] {'section':<12}{'raw':>12}{'minified':>12}{'gzip':>12}")
+    for name, sizes in report['sections'].items():
+        print(f"[BUNDLE] {name:<12}{sizes['raw']:>12,}{sizes['minified']:>12,}{sizes['gzip']:>12,}")
+    total = report['total']
+    print(f"[BUNDLE] {'total':<12}{total['raw']:>12,}{total['minified']:>12,}{total['gz']:>12,}"
+          + (f"  (brotli {total['br']:,})" if 'br' in total else '  (brotli not installed; no .br written)'))
+    if 'sidecar' in report:
+        sidecar = report['sidecar']
+        print(f"[BUNDLE] notes sidecar: {sidecar['raw']:,} raw, {sidecar['gz']:,} gzip"
+              + (f", {sidecar['br']:,} brotli" if 'br' in sidecar else ''))
+
+def write_html(final_html, output_path):
+    """Writes the final HTML (a string, or an iterable of pieces streamed in order) to the output file."""
+    try:
+        # Pieces are rendered as they are written, so this span covers rendering too.
+        with span('write html', 'write', path=os.path.basename(output_path)) as s:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                if isinstance(final_html, str):
+                    f.write(final_html)
+                else:
+                    for piece in final_html:
+                        f.write(piece)
+            s.set(bytes=os.path.getsize(output_path))
+        rel_output_path = os.path.relpath(output_path, os.getcwd())
+        print(f"Successfully generated {rel_output_path}")
+    except IOError as e:
+        print(f"Error writing to output file {output_path}: {e}")
+
+def generate(json_data=None, mapping=None, team=None, mapping_version=None, payload='columnar', notes='inline',
+             renderer='auto', webgl_threshold=WEBGL_THRESHOLD, bundle=False):
+    """
+    Generates the visualization HTML. Inputs not passed in are read from their canonical files,
+    so the pipeline can hand over in-memory data (see FreshVisualization.py --in-process).
+    Args:
+        json_data (list): Visualization records (default: visualization_data.json)
+        mapping (dict): Tuple-keyed Airtable mapping (default: airtable_mapping.json)
+        team (str): Optional team name for a team-specific view
+        mapping_version (str): Optional mapping version for the reproducibility stamp
+        payload (str): Embedded data format, 'columnar' (default) or 'rows'
+        notes (str): Notes storage, 'inline' (default), 'compressed' or 'sidecar'
+        renderer (str): Plot renderer, 'auto' (default), 'svg' or 'webgl'
+        webgl_threshold (int): Point count above which 'auto' uses WebGL
+        bundle (bool): Write minified HTML with .gz/.br siblings and a size report (see write_bundle)
+    Returns:
+        str: Path of the written HTML file
+    """
+    output_path = get_output_path(team)
+    print(f"[INFO] Template path: {os.path.relpath(template_path, os.getcwd())}")
+    print(f"[INFO] Data path: {os.path.relpath(data_path, os.getcwd()) if json_data is None else '(in memory)'}")
+    print(f"[INFO] Checkboxer path: {os.path.relpath(checkboxer_script_path, os.getcwd())}")
+    print(f"[INFO] Output HTML: {os.path.relpath(output_path, os.getcwd())}")
+
+    template_string = load_template()
+    if json_data is None:
+        json_data = load_data()
+
+    # --- Generate and log a reproducibility stamp ---
+    stamp = make_stamp(mapping_version)
+    print(f"[STAMP] {json.dumps(stamp, indent=2)}")
+
+    if mapping is None:
+        mapping = load_mapping()
+    checkboxer_script = load_checkboxer()
+
+    sidecar_path = get_notes_sidecar_path(output_path)
+    with span('prepare render', 'serialize', records=len(json_data), payload=payload, notes=notes):
+        prepared = prepare_render(template_string, json_data, mapping, checkboxer_script, payload,
+                                  notes, os.path.basename(sidecar_path), renderer, webgl_threshold)
+    if notes == 'sidecar':
+        write_notes_sidecar(json_data, sidecar_path)
+    if bundle:
+        with span('write bundle', 'write', path=os.path.basename(output_path)) as s:
+            report = write_bundle(prepared, minify_prepared(prepared), stamp, output_path, team,
+                                  sidecar_path if notes == 'sidecar' else None)
+            s.set(bytes=report['total']['minified'])
+        print_bundle_report(report)
+    else:
+        write_html(iter_prepared(prepared, stamp, team), output_path)
+        remove_compressed(output_path)
+    return output_path
+
+# --- Batch Team Views ---
+_worker_state = {}
+
+def _init_team_worker(prepared, stamp, notes_sidecar, minified=None):
+    _worker_state.update(prepared=prepared, stamp=stamp, notes_sidecar=notes_sidecar, minified=minified)
+
+def _render_team(team):
+    """Renders and writes one team's view from the worker's prepared inputs; returns (team, path, seconds)."""
+    start = time.perf_counter()
+    output_path = get_output_path(team)
+    sidecar_path = None
+    if _worker_state['notes_sidecar'] is not None:
+        sidecar_path = get_notes_sidecar_path(output_path)
+        with open(sidecar_path, 'w', encoding='utf-8') as f:
+            f.write(_worker_state['notes_sidecar'])
+        remove_compressed(sidecar_path)
+    if _worker_state['minified'] is not None:
+        report = write_bundle(_worker_state['prepared'], _worker_state['minified'], _worker_state['stamp'],
+                              output_path, team, sidecar_path)
+        print(f"[BUNDLE] {team}: {report['total']['raw']:,} -> {report['total']['minified']:,} bytes "
+              f"({report['total']['gz']:,} gzip)")
+        return team, output_path, time.perf_counter() - start
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(final_html)
-    rel_output_path = os.path.relpath(output_path, os.getcwd())
-    print(f"Successfully generated {rel_output_path}")
-except IOError as e:
-    print(f"Error writing to output file {output_path}: {e}")
+        for piece in iter_prepared(_worker_state['prepared'], _worker_state['stamp'], team):
+            f.write(piece)
+    remove_compressed(output_path)
+    return team, output_path, time.perf_counter() - start
+
+def generate_all_teams(teams=None, json_data=None, mapping=None, mapping_version=None, payload='columnar',
+                       notes='inline', renderer='auto', webgl_threshold=WEBGL_THRESHOLD, workers=1, bundle=False):
+    """
+    Generates every team's view in one run. Shared inputs are loaded and serialized once
+    (prepare_render); the per-team renders then run across a process pool, each worker
+    receiving the prepared inputs once.
+    Args:
+        teams (list): Team names (default: list_teams())
+        workers (int): Pool size; 1 renders in this process
+        bundle (bool): Write each view as a minified, precompressed bundle (see write_bundle)
+        Other arguments as for generate().
+    Returns:
+        list: [(team, output_path, seconds), ...] in team order
+    """
+    teams = list_teams() if teams is None else teams
+    if not teams:
+        print(f"[WARN] No team configs found under {teams_config_dir}")
+        return []
+    start = time.perf_counter()
+    if json_data is None:
+        json_data = load_data()
+    if mapping is None:
+        mapping = load_mapping()
+    stamp = make_stamp(mapping_version)
+    print(f"[STAMP] {json.dumps(stamp, indent=2)}")
+    # Every team output is named opportunity_visualization.html, so the sidecar src is shared too.
+    sidecar_src = os.path.basename(get_notes_sidecar_path(get_output_path()))
+    with span('prepare render', 'serialize', records=len(json_data), payload=payload, notes=notes):
+        prepared = prepare_render(load_template(), json_data, mapping, load_checkboxer(), payload,
+                                  notes, sidecar_src, renderer, webgl_threshold)
+        notes_sidecar = notes_sidecar_script(json_data) if notes == 'sidecar' else None
+        minified = minify_prepared(prepared) if bundle else None
+    print(f"[INFO] Shared inputs prepared in {time.perf_counter() - start:.2f}s; rendering {len(teams)} teams")
+
+    workers = max(1, min(workers, len(teams)))
+    # Pool workers exit without flushing trace events, so the team renders share one span here.
+    with span('render teams', 'write', teams=len(teams), workers=workers):
+        if workers == 1:
+            _init_team_worker(prepared, stamp, notes_sidecar, minified)
+            results = [_render_team(team) for team in teams]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_team_worker,
+                                     initargs=(prepared, stamp, notes_sidecar, minified)) as pool:
+                results = list(pool.map(_render_team, teams))
+    for team, output_path, seconds in results:
+        print(f"[TEAM] {team}: {seconds:.2f}s -> {os.path.relpath(output_path, os.getcwd())}")
+    print(f"[INFO] Generated {len(results)} team views in {time.perf_counter() - start:.2f}s ({workers} worker(s))")
+    return results
+
+def main():
+    args = parse_args()
+    if args.all_teams:
+        generate_all_teams(payload=args.payload, notes=args.notes, renderer=args.renderer,
+                           webgl_threshold=args.webgl_threshold, workers=args.workers, bundle=args.bundle)
+        return
+    generate(team=args.team, payload=args.payload, notes=args.notes,
+             renderer=args.renderer, webgl_threshold=args.webgl_threshold, bundle=args.bundle)
+
+if __name__ == '__main__':
+    main()
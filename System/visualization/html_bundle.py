@@ -0,0 +1,110 @@
+"""
+html_bundle.py
+
+Minification and precompression of the generated visualization HTML for static hosting
+(generate_visualization.py --bundle).
+
+- HtmlMinifier removes what the browser never needs, conservatively and line by line:
+  indentation, trailing whitespace and blank lines everywhere; HTML comments outside
+  <script>/<style>; whole-line // comments, whole-line /* ... */ blocks and trailing
+  // comments after a statement inside <script>/<style>. Line breaks are kept (no
+  automatic-semicolon hazards), and nothing inside a line of code or markup is rewritten.
+  State (inside a script or not) carries across feed() calls, so a template split into
+  segments around its slots can be minified piece by piece.
+- compress_file writes .gz (level 9, mtime pinned so output is reproducible) and, when the
+  optional brotli package is installed, .br siblings next to a file.
+
+Requirements:
+- Python 3.x
+- Optional: brotli (pip install brotli) for .br output; without it only .gz is written
+
+Usage:
+    from html_bundle import minify_html, compress_file
+    html = minify_html(open('page.html').read())
+    sizes = compress_file('outputs/opportunity_visualization.html')   # {'gz': ..., 'br': ...}
+"""
+import gzip
+import os
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+_CODE_TAG_RE = re.compile(r'(<(?:script|style)\b[^>]*>|</(?:script|style)\s*>)', re.IGNORECASE)
+_HTML_COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+# Comments that occupy whole lines; a /* ... */ block must not contain another '*/'.
+_LINE_COMMENT_RE = re.compile(r'^[ \t]*//[^\n]*$', re.MULTILINE)
+_BLOCK_COMMENT_RE = re.compile(r'^[ \t]*/\*(?:(?!\*/).)*\*/[ \t]*$', re.MULTILINE | re.DOTALL)
+# '// ...' after the end of a statement; only when the rest of the line has no quote, so a
+# '//' inside a string (e.g. a URL) is never taken for a comment.
+_TRAILING_COMMENT_RE = re.compile(r'([;{}),])[ \t]+//[^\n\'"`]*$', re.MULTILINE)
+_LINE_BREAK_RE = re.compile(r'[ \t]*\n[ \t\n]*')
+
+
+def _minify_code(text):
+    text = _BLOCK_COMMENT_RE.sub('', text)
+    text = _LINE_COMMENT_RE.sub('', text)
+    return _TRAILING_COMMENT_RE.sub(r'\1', text)
+
+
+class HtmlMinifier:
+    """Incremental minifier; feed() the document in order, in any number of pieces."""
+
+    def __init__(self):
+        self.in_code = False
+
+    def feed(self, text):
+        out = []
+        for part in _CODE_TAG_RE.split(text):
+            if _CODE_TAG_RE.fullmatch(part):
+                self.in_code = not part.startswith('</')
+                out.append(part)
+            elif self.in_code:
+                out.append(_minify_code(part))
+            else:
+                out.append(_HTML_COMMENT_RE.sub('', part))
+        return _LINE_BREAK_RE.sub('\n', ''.join(out))
+
+
+def minify_html(text):
+    """Minifies a complete HTML document or fragment (see HtmlMinifier)."""
+    return HtmlMinifier().feed(text)
+
+
+def compress_bytes(data):
+    """
+    Returns {'gz': bytes, 'br': bytes} for `data`; 'br' only when brotli is installed.
+    """
+    compressed = {'gz': gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        compressed['br'] = brotli.compress(data, quality=BROTLI_QUALITY)
+    return compressed
+
+
+def remove_compressed(path):
+    """Removes <path>.gz/.br left by an earlier bundle, so a server never prefers a stale copy."""
+    for ext in ('gz', 'br'):
+        if os.path.exists(f'{path}.{ext}'):
+            os.remove(f'{path}.{ext}')
+
+
+def compress_file(path):
+    """
+    Writes <path>.gz (and <path>.br when brotli is installed) next to `path`.
+    Returns:
+        dict: {'gz': size in bytes, 'br': size in bytes}, only for the files written
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    remove_compressed(path)
+    sizes = {}
+    for ext, blob in compress_bytes(data).items():
+        with open(f'{path}.{ext}', 'wb') as f:
+            f.write(blob)
+        sizes[ext] = len(blob)
+    return sizes
@@ -0,0 +1,185 @@
+"""
+json_stream.py
+
+Record-at-a-time JSON reading and writing for the pipeline's large intermediate files
+(match_data_sample.json, visualization_data.json), used by the --stream modes of
+fetch_match_data.py and transform_to_visualization_schema.py.
+
+- iter_json_records reads either a JSON array or JSON Lines (detected from the first
+  character), decoding one record at a time from fixed-size chunks, so memory does not grow
+  with the file. JSON Lines records must be objects: a line starting with '[' would be taken
+  for an array file, so such input is rejected rather than read as one array.
+- JsonRecordWriter writes records as they arrive, either as JSON Lines or as an incrementally
+  written array. The array output is byte-identical to json.dump(records, f, indent=2,
+  ensure_ascii=False), so existing readers see no difference. A file is written to a temporary
+  file next to it and renamed into place only when the with-block completes, so a failed run
+  leaves the previous output untouched instead of a truncated file.
+- '-' as a path means stdin/stdout, so stages can be connected with a pipe.
+
+Requirements:
+- Python 3.x (standard library only)
+
+Usage:
+    from json_stream import iter_json_records, JsonRecordWriter
+    with JsonRecordWriter('visualization_data.json') as out:
+        for rec in iter_json_records('match_data_sample.json'):
+            out.write(transform(rec))
+"""
+import json
+import os
+import sys
+
+STREAM_FORMATS = ('array', 'jsonl')
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+# Built once: json.dumps would construct a new encoder for every record.
+_array_encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+_line_encoder = json.JSONEncoder(ensure_ascii=False)
+_WHITESPACE = ' \t\r\n'
+
+
+def _open(path, mode):
+    if path == '-':
+        return None
+    return open(path, mode, encoding='utf-8')
+
+
+def _iter_array(f, buf):
+    """Decodes the elements of a JSON array from `buf` plus the rest of file `f`."""
+    pos = buf.index('[') + 1
+    eof = False
+    while True:
+        # Skip whitespace and separators, refilling the buffer as needed.
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE + ',':
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            chunk = f.read(CHUNK_SIZE)
+            buf, pos, eof = chunk, 0, not chunk
+        if pos >= len(buf):
+            raise ValueError('Unterminated JSON array')
+        if buf[pos] == ']':
+            _expect_end(f, buf[pos + 1:])
+            return
+        while True:
+            try:
+                record, end = _decoder.raw_decode(buf, pos)
+                # A number cut off by the chunk boundary (e.g. '1e' of '1e-07') decodes as a shorter
+                # one, so only accept a value once the character after it is in the buffer.
+                if eof or (end < len(buf) and buf[end] in _WHITESPACE + ',]'):
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            chunk = f.read(CHUNK_SIZE)
+            buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+        yield record
+        pos = end
+
+
+def _expect_end(f, rest):
+    """Raises if anything but whitespace follows the closing ']' of an array file."""
+    while True:
+        if rest.strip(_WHITESPACE):
+            raise ValueError('Unexpected data after the JSON array; JSON Lines records must be objects')
+        rest = f.read(CHUNK_SIZE)
+        if not rest:
+            return
+
+
+def iter_json_records(path):
+    """
+    Yields the records of a JSON array file or a JSON Lines file (of objects), one at a time.
+    Args:
+        path (str): File path, or '-' for stdin
+    """
+    f = _open(path, 'r') or sys.stdin
+    try:
+        buf = ''
+        while not buf.strip():
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            buf += chunk
+        if buf.lstrip()[0] == '[':
+            yield from _iter_array(f, buf)
+            return
+        # JSON Lines: one record per non-blank line.
+        pending = buf
+        for line in f:
+            pending += line
+            *lines, pending = pending.split('\n')
+            for text in lines:
+                if text.strip():
+                    yield json.loads(text)
+        for text in pending.split('\n'):
+            if text.strip():
+                yield json.loads(text)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+class JsonRecordWriter:
+    """
+    Writes records one at a time as a JSON array (indent=2, as json.dump) or as JSON Lines.
+
+    Args:
+        path (str|file): Output path, '-' for stdout, or an open text file (left open). A path
+                         is only replaced once the with-block exits without an exception.
+        fmt (str): 'array' (default) or 'jsonl'
+    """
+
+    def __init__(self, path, fmt='array'):
+        if fmt not in STREAM_FORMATS:
+            raise ValueError(f"Unknown stream format {fmt!r}; expected one of {STREAM_FORMATS}")
+        self.path = path
+        self.fmt = fmt
+        self.count = 0
+        self._f = None
+        self._tmp = None
+
+    def __enter__(self):
+        if hasattr(self.path, 'write'):
+            self._f = self.path
+        elif self.path == '-':
+            self._f = sys.stdout
+        else:
+            self._tmp = f'{self.path}.{os.getpid()}.tmp'
+            self._f = _open(self._tmp, 'w')
+        return self
+
+    def write(self, record):
+        if self.fmt == 'jsonl':
+            self._f.write(_line_encoder.encode(record))
+            self._f.write('\n')
+        else:
+            self._f.write('[\n  ' if self.count == 0 else ',\n  ')
+            # Items of a top-level array sit one indent level deeper.
+            self._f.write(_array_encoder.encode(record).replace('\n', '\n  '))
+        self.count += 1
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def __exit__(self, exc_type, exc, tb):
+        # After a failure the array is left unterminated, so a reader downstream of stdout
+        # fails instead of taking the records written so far for the whole output.
+        try:
+            if exc_type is None and self.fmt == 'array':
+                self._f.write('[]' if self.count == 0 else '\n]')
+            if self._tmp is None:
+                self._f.flush()
+            else:
+                self._f.close()
+                if exc_type is None:
+                    os.replace(self._tmp, self.path)
+        finally:
+            if self._tmp is not None and os.path.exists(self._tmp):
+                self._f.close()
+                os.remove(self._tmp)
+        return False
@@ -0,0 +1,187 @@
+"""
+mapping_store.py
+
+Indexed store for the Airtable mapping (airtable_mapping.json), shared by create_mapping_dict.py,
+query_or_create_mapping_dict.py and airtable_id_name_utils.py.
+
+- Entries are (Table, FieldName, Value) -> record ID, as before; reverse entries keep their
+  established keys ('*'/'id'/record_id in create_mapping_dict, Table/'id'/record_id in
+  query_or_create_mapping_dict) and map to the record's name.
+- In memory the entries live in per-table, per-field dicts (the forward index), so lookups
+  are one dict probe per level, and a per-table reverse index (record ID -> {field: value}) is
+  built on first use.
+- MappingStore is a read-only Mapping over tuple keys, so existing code using
+  mapping.get((table, field, value)) or mapping.items() keeps working unchanged.
+- One-to-many relationship indexes (RELATIONSHIPS: Teams->Propositions, Funders->MatchEvaluations,
+  Propositions->MatchEvaluations) are built from the linked-record fields while the mapping is
+  generated (index_relations) and saved with it, so "all propositions of a team" is one lookup
+  instead of a scan of the whole mapping.
+- On disk the nested dicts are written as-is with a format marker:
+      {"format": "indexed-v1", "tables": {"Funders": {"FUNDER'S NAME": {"<name>": "rec..."}}, ...},
+       "relations": {"Teams->Propositions": {"<team id>": ["<proposition id>", ...]}, ...}}
+  Loading is a single json.load with no per-key parsing. The legacy flat "Table|Field|Value"
+  format is still read (split once with split('|', 2)), and rewritten in the new format on the
+  next save.
+
+Requirements:
+- Python 3.x (standard library only)
+
+Usage:
+    from mapping_store import MappingStore
+    store = MappingStore.load('airtable_mapping.json')
+    store.lookup_id('Funders', "FUNDER'S NAME", 'The Nature Conservancy')   # -> 'rec...'
+    store.name_of('rec...')                                                 # -> 'The Nature Conservancy'
+    store.related(TEAM_PROPOSITIONS, team_id)                               # -> ['rec...', ...]
+"""
+import json
+import os
+from collections.abc import Mapping
+from pipeline_trace import span
+
+MAPPING_FORMAT = 'indexed-v1'
+LEGACY_SEPARATOR = '|'
+
+TEAM_PROPOSITIONS = 'Teams->Propositions'
+FUNDER_EVALUATIONS = 'Funders->MatchEvaluations'
+PROPOSITION_EVALUATIONS = 'Propositions->MatchEvaluations'
+# (relation name, table holding the linked-record field, field, reverse). A forward relation maps
+# the holding record to its linked IDs; a reverse one maps each linked ID back to the holding records.
+RELATIONSHIPS = (
+    (TEAM_PROPOSITIONS, 'Teams', 'Propositions', False),
+    (FUNDER_EVALUATIONS, 'MatchEvaluations', 'Funders', True),
+    (PROPOSITION_EVALUATIONS, 'MatchEvaluations', 'Propositions', True),
+)
+
+
+def relation_fields(table):
+    """The linked-record fields of `table` that index_relations reads (to request them when fetching)."""
+    return [field for _, holder, field, _ in RELATIONSHIPS if holder == table]
+
+
+class MappingStore(Mapping):
+    """
+    Tuple-keyed (Table, FieldName, Value) -> record ID mapping backed by per-table indexes.
+
+    Args:
+        tables (dict): {table: {field: {value: record_id}}}; taken over without copying
+        relations (dict): {relation name: {record_id: [related record IDs]}}
+    """
+
+    def __init__(self, tables=None, relations=None):
+        self.tables = tables if tables is not None else {}
+        self.relations = relations if relations is not None else {}
+        self._reverse = {}
+
+    # --- Building ---
+    def add(self, table, field, value, record_id):
+        """Adds or replaces one entry."""
+        self.tables.setdefault(table, {}).setdefault(field, {})[value] = record_id
+        self._reverse.pop(table, None)
+
+    def index_relations(self, table, records):
+        """
+        Adds the RELATIONSHIPS held by `table`'s linked-record fields, from raw Airtable records
+        ({'id', 'fields'}). Call once per table while generating the mapping.
+        """
+        for name, holder, field, reverse in RELATIONSHIPS:
+            if holder != table:
+                continue
+            relation = self.relations.setdefault(name, {})
+            for record in records:
+                for linked_id in record.get('fields', {}).get(field) or []:
+                    source, target = (linked_id, record['id']) if reverse else (record['id'], linked_id)
+                    relation.setdefault(source, []).append(target)
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        """Builds a store from a tuple-keyed dict (or another MappingStore)."""
+        if isinstance(mapping, cls):
+            return mapping
+        store = cls(relations=getattr(mapping, 'relations', None))
+        for (table, field, value), record_id in mapping.items():
+            store.add(table, field, value, record_id)
+        return store
+
+    # --- Lookups ---
+    def lookup_id(self, table, field, value):
+        """Forward lookup: the record ID whose `field` in `table` equals `value`, or None."""
+        return self.tables.get(table, {}).get(field, {}).get(value)
+
+    def name_of(self, record_id, table='*'):
+        """Reverse lookup via the stored ('<table>', 'id', record_id) entries, or None."""
+        return self.lookup_id(table, 'id', record_id)
+
+    def entries(self, table, field):
+        """The forward index of one field: {value: record_id} (empty if absent). Do not modify."""
+        return self.tables.get(table, {}).get(field, {})
+
+    def has_relation(self, name):
+        return name in self.relations
+
+    def related(self, name, record_id):
+        """Record IDs related to `record_id` by relation `name` (see RELATIONSHIPS), or []."""
+        return self.relations.get(name, {}).get(record_id, [])
+
+    def fields_of(self, table, record_id):
+        """
+        Reverse index: every indexed {field: value} of `record_id` in `table`.
+        The index for a table is built on first use and dropped when the table changes.
+        """
+        index = self._reverse.get(table)
+        if index is None:
+            index = {}
+            for field, values in self.tables.get(table, {}).items():
+                if field == 'id':
+                    continue
+                for value, rid in values.items():
+                    index.setdefault(rid, {})[field] = value
+            self._reverse[table] = index
+        return index.get(record_id, {})
+
+    # --- Mapping protocol over (table, field, value) tuples ---
+    def __getitem__(self, key):
+        try:
+            table, field, value = key
+            return self.tables[table][field][value]
+        except (TypeError, ValueError):
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        for table, fields in self.tables.items():
+            for field, values in fields.items():
+                for value in values:
+                    yield (table, field, value)
+
+    def __len__(self):
+        return sum(len(values) for fields in self.tables.values() for values in fields.values())
+
+    # --- Persistence ---
+    def to_json(self):
+        return {'format': MAPPING_FORMAT, 'tables': self.tables, 'relations': self.relations}
+
+    def save(self, path):
+        """Writes the store in the indexed format (compact JSON)."""
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with span('write mapping', 'write', path=os.path.basename(path)) as s:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.to_json(), f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp, path)
+            s.set(entries=len(self), bytes=os.path.getsize(path))
+
+    @classmethod
+    def from_json(cls, data):
+        """Builds a store from parsed JSON in either the indexed or the legacy flat format."""
+        if data.get('format') == MAPPING_FORMAT:
+            return cls(data['tables'], data.get('relations'))
+        store = cls()
+        for key, record_id in data.items():
+            parts = key.split(LEGACY_SEPARATOR, 2)
+            if len(parts) == 3:
+                store.add(*parts, record_id)
+        return store
+
+    @classmethod
+    def load(cls, path):
+        with span('load mapping', 'parse', path=os.path.basename(path), bytes=os.path.getsize(path)):
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls.from_json(json.load(f))
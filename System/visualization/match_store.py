@@ -0,0 +1,120 @@
+"""
+match_store.py
+
+Local SQLite record store backing the incremental sync mode of fetch_match_data.py.
+
+- One row per Match Evaluation record, keyed by Airtable record ID, holding the raw
+  Airtable `fields` object (JSON).
+- A small `meta` table holds the sync watermark: the UTC time at which the last
+  successful sync started. The next incremental run asks Airtable only for records
+  modified after that watermark and merges them in.
+- Records are stored in Airtable's own {'id', 'fields'} shape, so downstream code
+  treats stored and freshly fetched records identically.
+
+Requirements:
+- Python 3.x (sqlite3 is part of the standard library)
+
+Usage:
+    from match_store import MatchStore
+    with MatchStore() as store:
+        since = store.get_watermark()
+        ...
+        store.upsert(changed_records)
+        store.set_watermark(synced_at)
+
+Output:
+    match_data_store.sqlite (in same directory, next to match_data_sample.json)
+"""
+import json
+import os
+import sqlite3
+
+STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'match_data_store.sqlite')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    record_id TEXT PRIMARY KEY,
+    fields    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class MatchStore:
+    """
+    SQLite-backed store of raw Match Evaluation records.
+
+    Args:
+        path (str): Location of the SQLite file (default: match_data_store.sqlite next to this script)
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def get_watermark(self):
+        """Returns the ISO-8601 start time of the last successful sync, or None for a cold store."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'watermark'").fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, watermark):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('watermark', ?)", (watermark,))
+
+    def clear(self):
+        """Drops all records and the watermark (used for --full resyncs)."""
+        with self.conn:
+            self.conn.execute("DELETE FROM records")
+            self.conn.execute("DELETE FROM meta")
+
+    def upsert(self, records):
+        """
+        Inserts or replaces records in a single transaction.
+        Args:
+            records (list): Airtable record dicts ({'id': ..., 'fields': {...}})
+        Returns:
+            int: Number of records written
+        """
+        rows = [(rec['id'], json.dumps(rec.get('fields', {}), ensure_ascii=False)) for rec in records]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO records (record_id, fields) VALUES (?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def prune(self, live_ids):
+        """
+        Removes records whose IDs are no longer present in Airtable.
+        Args:
+            live_ids (iterable): All record IDs currently in the Airtable table
+        Returns:
+            int: Number of records removed
+        """
+        live_ids = set(live_ids)
+        stale = [rid for (rid,) in self.conn.execute("SELECT record_id FROM records") if rid not in live_ids]
+        with self.conn:
+            self.conn.executemany("DELETE FROM records WHERE record_id = ?", [(rid,) for rid in stale])
+        return len(stale)
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def iter_records(self):
+        """Yields stored records in Airtable's {'id', 'fields'} shape, ordered by record ID."""
+        cursor = self.conn.execute("SELECT record_id, fields FROM records ORDER BY record_id")
+        for record_id, fields in cursor:
+            yield {'id': record_id, 'fields': json.loads(fields)}
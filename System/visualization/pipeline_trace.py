@@ -0,0 +1,183 @@
+"""
+pipeline_trace.py
+
+Structured timing spans for the pipeline stages, saved as a Chrome trace
+(load it in chrome://tracing, about:tracing or https://ui.perfetto.dev).
+
+- span(name, cat, **args) times a block and records it as a complete ('X') event with the
+  process and thread it ran on. Categories used by the stages: 'stage', 'fetch', 'http',
+  'parse', 'transform', 'serialize', 'write'. Record counts and byte sizes go in the args
+  ('records', 'bytes'), and can be added while the span is open (span.set(records=n)).
+- trace_session(session) adds a response hook to a requests session (the one inside a
+  pyairtable Api), recording one 'http' span per Airtable request with its status and size.
+- Timestamps are wall-clock microseconds, so spans from separate processes line up in one trace.
+- Tracing is off unless PIPELINE_TRACE names an events file (or enable() is called). Each
+  process appends its events to that file as JSON Lines when it exits, so FreshVisualization.py
+  can run the stages as subprocesses and merge everything with write_chrome_trace().
+  When tracing is off, span() only yields a placeholder.
+
+Requirements:
+- Python 3.x (standard library only)
+
+Usage:
+    from pipeline_trace import span
+    with span('load_data', 'parse', path=data_path) as s:
+        data = json.load(f)
+        s.set(records=len(data))
+
+    PIPELINE_TRACE=events.jsonl python transform_to_visualization_schema.py
+    python pipeline_trace.py events.jsonl pipeline_trace.json   # events file -> Chrome trace
+
+Output:
+    {'traceEvents': [{'name', 'cat', 'ph': 'X', 'ts', 'dur', 'pid', 'tid', 'args'}, ...],
+     'displayTimeUnit': 'ms'}
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+TRACE_ENV = 'PIPELINE_TRACE'
+
+_events = []
+_lock = threading.Lock()
+_path = None
+
+
+class Span:
+    """Handle yielded by span(); set() attaches args such as 'records' or 'bytes'."""
+    __slots__ = ('args',)
+
+    def __init__(self, args):
+        self.args = args
+
+    def set(self, **args):
+        self.args.update(args)
+
+
+def enable(path):
+    """Turns tracing on for this process and for child processes started after this call."""
+    global _path
+    if _path is None:
+        atexit.register(flush)
+    _path = os.path.abspath(path)
+    os.environ[TRACE_ENV] = _path
+
+
+def enabled():
+    return _path is not None
+
+
+def _record(event):
+    event.update(pid=os.getpid(), tid=threading.get_native_id())
+    with _lock:
+        _events.append(event)
+
+
+@contextmanager
+def span(name, cat='stage', **args):
+    """Times the enclosed block as a trace event named `name` in category `cat`."""
+    s = Span(args)
+    if _path is None:
+        yield s
+        return
+    ts = time.time_ns() // 1000
+    start = time.perf_counter()
+    try:
+        yield s
+    finally:
+        dur = int((time.perf_counter() - start) * 1e6)
+        _record({'name': name, 'cat': cat, 'ph': 'X', 'ts': ts, 'dur': dur, 'args': s.args})
+
+
+def _http_hook(response, *args, **kwargs):
+    # Called once the body has been read; `elapsed` runs from sending the request to the headers.
+    elapsed = int(response.elapsed.total_seconds() * 1e6)
+    url = urlsplit(response.url)
+    _record({
+        'name': f'{response.request.method} {url.path}', 'cat': 'http', 'ph': 'X',
+        'ts': time.time_ns() // 1000 - elapsed, 'dur': elapsed,
+        'args': {'status': response.status_code, 'bytes': len(response.content), 'query': url.query[:200]},
+    })
+
+
+def trace_session(session):
+    """Records every response of a requests session as an 'http' span (only while tracing is on)."""
+    if _path is not None and _http_hook not in session.hooks['response']:
+        session.hooks['response'].append(_http_hook)
+    return session
+
+
+def flush():
+    """Appends this process's events to the PIPELINE_TRACE file and clears them."""
+    with _lock:
+        events = list(_events)
+        _events.clear()
+    if _path is None or not events:
+        return
+    name = os.path.basename(sys.argv[0]) or 'python'
+    meta = {'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'args': {'name': name}}
+    with open(_path, 'a', encoding='utf-8') as f:
+        f.write(''.join(json.dumps(e) + '\n' for e in [meta] + events))
+
+
+def read_events(path):
+    """Reads an events file written by flush(); returns [] if there is none."""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_chrome_trace(events, out_path):
+    """Writes events (a list, or the path of an events file) as a Chrome trace JSON; returns the events."""
+    if isinstance(events, str):
+        events = read_events(events)
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    return events
+
+
+def summarize(events):
+    """
+    Per-process view of a trace: its spans in start order, plus HTTP request totals.
+    Returns:
+        list: [{'process', 'spans': [{'name', 'cat', 'seconds', 'args'}], 'requests', 'http_bytes', 'http_seconds'}]
+    """
+    names = {e['pid']: e['args']['name'] for e in events if e.get('ph') == 'M'}
+    processes = {}
+    for e in sorted((e for e in events if e.get('ph') == 'X'), key=lambda e: e['ts']):
+        p = processes.setdefault(e['pid'], {'process': names.get(e['pid'], str(e['pid'])), 'spans': [],
+                                            'requests': 0, 'http_bytes': 0, 'http_seconds': 0.0})
+        if e['cat'] == 'http':
+            p['requests'] += 1
+            p['http_bytes'] += e['args'].get('bytes', 0)
+            p['http_seconds'] += e['dur'] / 1e6
+        else:
+            p['spans'].append({'name': e['name'], 'cat': e['cat'], 'seconds': e['dur'] / 1e6, 'args': e['args']})
+    return list(processes.values())
+
+
+def print_summary(events, prefix='[TRACE]'):
+    for p in summarize(events):
+        http = (f", {p['requests']} HTTP requests, {p['http_bytes'] / 1e6:.2f} MB, {p['http_seconds']:.2f}s"
+                if p['requests'] else '')
+        print(f"{prefix} {p['process']}{http}")
+        for s in p['spans']:
+            details = ', '.join(f'{k}={v}' for k, v in s['args'].items() if k in ('records', 'bytes'))
+            print(f"{prefix}   {s['seconds']:8.3f}s  {s['cat']:<9} {s['name']}" + (f" ({details})" if details else ''))
+
+
+if os.getenv(TRACE_ENV):
+    enable(os.environ[TRACE_ENV])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Usage: python pipeline_trace.py <events.jsonl> <trace.json>")
+        sys.exit(2)
+    print_summary(write_chrome_trace(sys.argv[1], sys.argv[2]))
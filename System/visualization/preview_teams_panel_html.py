@@ -1,12 +1,20 @@
 from query_or_create_mapping_dict import load_mapping_from_file, lookup_id
+from mapping_store import TEAM_PROPOSITIONS
 
 mapping = load_mapping_from_file('airtable_mapping.json')
 
+# Team -> proposition IDs come from the relationship index saved with the mapping.
+# Older mapping files lack it; derive it once from the ('Teams', 'Propositions', prop_id) entries.
+if mapping.has_relation(TEAM_PROPOSITIONS):
+    team_propositions = mapping.relations[TEAM_PROPOSITIONS]
+else:
+    print("<!-- [WARN] Mapping has no Teams->Propositions index; regenerate it with query_or_create_mapping_dict.py -->")
+    team_propositions = {}
+    for prop_id, team_id in mapping.entries('Teams', 'Propositions').items():
+        team_propositions.setdefault(team_id, []).append(prop_id)
+
 # --- 1. Get all Team names and IDs ---
-team_names = set()
-for key in mapping:
-    if key[0] == 'Teams' and key[1] == 'Team Name':
-        team_names.add(key[2])
+team_names = set(mapping.entries('Teams', 'Team Name'))
 
 # --- 2. For each Team, get Nickname, ID, and Proposition IDs ---
 teams_data = []
@@ -14,8 +22,7 @@ for team_name in sorted(team_names):
     team_id = lookup_id(mapping, 'Teams', 'Team Name', team_name)
     nickname = mapping.get(('Teams', 'id', team_id), team_name)
     # Find all proposition IDs linked to this team
-    prop_ids = [k[2] for k, v in mapping.items()
-                if k[0] == 'Teams' and k[1] == 'Propositions' and v == team_id]
+    prop_ids = team_propositions.get(team_id, [])
     teams_data.append({
         'name': team_name,
         'id': team_id,
@@ -24,8 +31,7 @@ for team_name in sorted(team_names):
     })
 
 # --- 3. Get all Funder IDs ---
-funder_ids = [v for k, v in mapping.items()
-              if k[0] == 'Funders' and k[1] == "FUNDER'S NAME"]
+funder_ids = list(mapping.entries('Funders', "FUNDER'S NAME").values())
 
 def make_team_url(funder_ids, prop_ids):
     checked = ','.join(funder_ids + prop_ids)
@@ -2,7 +2,8 @@
 Query or create a comprehensive mapping dictionary of all Airtable records, including Teams.
 
 The dictionary uses tuples of (Table, FieldName, Value) as keys and the record ID as the value.
-This allows for efficient lookups in any direction.
+This allows for efficient lookups in any direction. The mapping is a MappingStore
+(see mapping_store.py), saved in the same indexed format as create_mapping_dict.py.
 
 Requirements:
 - A .env file in the same directory with these variables:
@@ -28,11 +29,11 @@ Example output:
     ID for team 'EcoRestorers': rec1234567890ABCDE
 """
 import os
-import json
-from pyairtable import Api
 from dotenv import load_dotenv
 from typing import Dict, Tuple, Any
 import pathlib
+from airtable_snapshot import fetch_snapshot
+from mapping_store import TEAM_PROPOSITIONS, MappingStore, relation_fields
 
 # The .env file must be in the same directory as this script
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -86,48 +87,48 @@ TABLES = {
     }
 }
 
-def create_mapping_dictionary() -> Dict[Tuple[str, str, str], str]:
+def create_mapping_dictionary() -> MappingStore:
     """
     Create a mapping dictionary for all records in specified tables.
     Returns:
-        Dict[Tuple[str, str, str], str]: A dictionary with (Table, FieldName, Value) as keys
-                                         and record IDs as values.
+        MappingStore: A mapping with (Table, FieldName, Value) as keys and record IDs as values.
     """
-    mapping = {}
-    api = Api(API_KEY)
+    mapping = MappingStore()
+    # Fetch every table once, concurrently (see airtable_snapshot.py), with only the indexed
+    # and linked-record fields
+    fields = {name: list(dict.fromkeys(config['fields_to_index'] + relation_fields(name)))
+              for name, config in TABLES.items()}
+    snapshot = fetch_snapshot(API_KEY, BASE_ID, {name: config['id'] for name, config in TABLES.items()}, fields=fields)
     for table_name, config in TABLES.items():
-        table_id = config['id']
-        name_field = config['name_field']
         fields_to_index = config['fields_to_index']
         print(f"Processing table: {table_name}")
-        table = api.table(BASE_ID, table_id)
-        try:
-            for record in table.all():
-                record_id = record['id']
-                fields = record.get('fields', {})
-                # Add mapping for each field we want to index
-                for field in fields_to_index:
-                    if field in fields:
-                        value = fields[field]
-                        # Handle both single values and arrays of values
-                        values = [value] if not isinstance(value, list) else value
-                        for v in values:
-                            if v:  # Only add non-empty values
-                                # Special handling for Teams->Propositions: map using proposition ID, not name
-                                if table_name == 'Teams' and field == 'Propositions':
-                                    # The value is a proposition record ID; use it directly
-                                    prop_id = str(v).strip()
-                                    key = (table_name, field, prop_id)
-                                    mapping[key] = record_id
-                                    # Also add a reverse mapping for the record ID
-                                    mapping[(table_name, 'id', record_id)] = v
-                                else:
-                                    key = (table_name, field, str(v).strip())
-                                    mapping[key] = record_id
-                                    # Also add a reverse mapping for the record ID
-                                    mapping[(table_name, 'id', record_id)] = v
-        except Exception as e:
-            print(f"Error processing table {table_name}: {e}")
+        if table_name not in snapshot['tables']:
+            print(f"Error processing table {table_name}: not in snapshot")
+            continue
+        # One-to-many indexes from linked-record fields (e.g. Teams -> Propositions)
+        mapping.index_relations(table_name, snapshot['tables'][table_name]['records'])
+        for record in snapshot['tables'][table_name]['records']:
+            record_id = record['id']
+            fields = record.get('fields', {})
+            # Add mapping for each field we want to index
+            for field in fields_to_index:
+                if field in fields:
+                    value = fields[field]
+                    # Handle both single values and arrays of values
+                    values = [value] if not isinstance(value, list) else value
+                    for v in values:
+                        if v:  # Only add non-empty values
+                            # Special handling for Teams->Propositions: map using proposition ID, not name
+                            if table_name == 'Teams' and field == 'Propositions':
+                                # The value is a proposition record ID; use it directly
+                                prop_id = str(v).strip()
+                                mapping.add(table_name, field, prop_id, record_id)
+                                # Also add a reverse mapping for the record ID
+                                mapping.add(table_name, 'id', record_id, v)
+                            else:
+                                mapping.add(table_name, field, str(v).strip(), record_id)
+                                # Also add a reverse mapping for the record ID
+                                mapping.add(table_name, 'id', record_id, v)
     return mapping
 
 def save_mapping_to_file(mapping: Dict[Tuple[str, str, str], str], filename: str = 'airtable_mapping.json'):
@@ -137,25 +138,18 @@ def save_mapping_to_file(mapping: Dict[Tuple[str, str, str], str], filename: str
         mapping: The mapping dictionary to save.
         filename: The name of the output JSON file.
     """
-    # Convert tuple keys to strings for JSON serialization
-    mapping_serializable = {"|".join(key): value for key, value in mapping.items()}
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(mapping_serializable, f, indent=2)
+    MappingStore.from_mapping(mapping).save(filename)
     print(f"Mapping saved to {filename}")
 
-def load_mapping_from_file(filename: str = 'airtable_mapping.json') -> Dict[Tuple[str, str, str], str]:
+def load_mapping_from_file(filename: str = 'airtable_mapping.json') -> MappingStore:
     """
-    Load a mapping dictionary from a JSON file.
+    Load a mapping dictionary from a JSON file (indexed or legacy "Table|Field|Value" format).
     Args:
         filename: The name of the input JSON file.
     Returns:
-        Dict[Tuple[str, str, str], str]: The loaded mapping dictionary.
+        MappingStore: The loaded mapping, keyed by (Table, FieldName, Value) tuples.
     """
-    with open(filename, 'r', encoding='utf-8') as f:
-        mapping_serializable = json.load(f)
-    # Convert string keys back to tuples
-    mapping = {tuple(key.split("|")): value for key, value in mapping_serializable.items()}
-    return mapping
+    return MappingStore.load(filename)
 
 def lookup_id(mapping: Dict[Tuple[str, str, str], str], table: str, field: str, value: str):
     """
@@ -196,6 +190,5 @@ if __name__ == "__main__":
         print(f"Nickname for team '{example_team}': {team_nickname}")
         # List propositions for this team (IDs)
         print(f"Propositions for team '{example_team}':")
-        for key, value in mapping.items():
-            if key[:2] == ('Teams', 'Propositions') and value == team_id:
-                print(f"  - Proposition ID: {key[2]}")
+        for prop_id in mapping.related(TEAM_PROPOSITIONS, team_id):
+            print(f"  - Proposition ID: {prop_id}")
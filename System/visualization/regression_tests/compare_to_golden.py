@@ -1,34 +1,393 @@
+"""
+compare_to_golden.py
+
+Structural, data-aware regression check of the generated visualization HTML against the
+Golden Master (see golden_master_process.md).
+
+Instead of a line diff of the whole page (where the dataset is one huge JSON line), both
+pages are parsed into named parts and each part is compared in the way that suits it:
+- template        the page with every generated part cut out: unified diff of the lines
+- metadata        the injected metadata object; volatile keys (generation date, stamp) ignored
+- config          the team view configuration: keys added, removed or changed
+- render_config   the renderer settings (absent in older pages)
+- name_to_id      the proposition/funder name -> record ID maps
+- data            the records, matched by record_id (columnar or legacy row payload, notes
+                  from the compressed block, a sidecar or inline): records added and removed,
+                  and per-record field changes. Jittered coordinates (x_urgency, y_fit) count
+                  as unchanged within --tolerance.
+- teams_panel     the Teams panel buttons (label and link)
+- checkboxer      the embedded checkboxer script: unified diff
+
+Results are printed and written to regression_tests/test_logs/ as a readable log and a JSON
+report. The exit status is 1 when any part differs, so the check can gate a change.
+
+Requirements:
+- Python 3.x (standard library only)
+
+Usage:
+    python regression_tests/compare_to_golden.py
+    python regression_tests/compare_to_golden.py --output teams/<team>/outputs/opportunity_visualization.html
+    python regression_tests/compare_to_golden.py --tolerance 0.8    # pages built with --jitter spiral
+    python regression_tests/compare_to_golden.py --line-diff        # legacy whole-file line diff
+
+Output:
+    regression_tests/test_logs/golden_compare_<timestamp>.log and .json
+"""
+import argparse
+import base64
 import difflib
+import gzip
+import json
+import os
+import re
 import sys
+import time
+from datetime import datetime
 from pathlib import Path
 
 GOLDEN = Path(__file__).parent.parent / 'golden_master' / 'opportunity_visualization_golden.html'
 OUTPUT = Path(__file__).parent.parent / 'outputs' / 'opportunity_visualization.html'
+LOG_DIR = Path(__file__).parent / 'test_logs'
 
-def read_lines(path):
+# Jittered coordinates move at most JITTER (0.15) either way, so two renders of the same
+# record differ by at most 0.3 (spiral jitter can reach 0.4 either way: use --tolerance 0.8).
+COORDINATE_TOLERANCE = 0.3
+COORDINATE_FIELDS = ('x_urgency', 'y_fit')
+VOLATILE_METADATA = ('generation_date', 'stamp')
+# Longest value shown in the readable log; the JSON report keeps values in full.
+LOG_VALUE_WIDTH = 80
+
+# JavaScript constants holding injected JSON, by part name.
+JSON_CONSTANTS = {
+    'metadata': 'const metadata = ',
+    'config': 'const viewConfig = ',
+    'render_config': 'const renderConfig = ',
+    'data': 'const rawData = ',
+    'proposition_name_to_id': 'const propositionNameToId = ',
+    'funder_name_to_id': 'const funderNameToId = ',
+}
+NOTES_RE = re.compile(r'<script id="notes-data"([^>]*)>([^<]*)</script>')
+TEAMS_PANEL_RE = re.compile(r'<div class="teams-panel".*?</div>', re.DOTALL)
+TEAM_BUTTON_RE = re.compile(r'<a href="([^"]*)"><button[^>]*>(.*?)</button></a>', re.DOTALL)
+CHECKBOXER_RE = re.compile(r'<script data-checkboxer>(.*?)</script>', re.DOTALL)
+SIDECAR_RE = re.compile(r'window\.GSW_NOTES = "([^"]*)"')
+PARTS = ('template', 'metadata', 'config', 'render_config', 'name_to_id', 'data', 'teams_panel', 'checkboxer')
+
+_decoder = json.JSONDecoder()
+
+
+def read_text(path):
     try:
         with open(path, 'r', encoding='utf-8') as f:
-            return f.readlines()
+            return f.read()
     except FileNotFoundError:
         print(f"File not found: {path}")
         sys.exit(1)
 
-def main():
-    golden_lines = read_lines(GOLDEN)
-    output_lines = read_lines(OUTPUT)
-    diff = difflib.unified_diff(
-        golden_lines, output_lines,
-        fromfile=str(GOLDEN),
-        tofile=str(OUTPUT),
+
+# --- Parsing ---
+def _decode_notes(encoded):
+    return json.loads(gzip.decompress(base64.b64decode(encoded)).decode('utf-8'))
+
+
+def _load_notes(attrs, body, html_path):
+    """Returns the notes array of a notes-data element (compressed or sidecar), or None."""
+    if 'data-mode="compressed"' in attrs:
+        return _decode_notes(body)
+    src = re.search(r'data-src="([^"]*)"', attrs)
+    if src:
+        sidecar = os.path.join(os.path.dirname(os.path.abspath(html_path)), src.group(1))
+        if os.path.exists(sidecar):
+            match = SIDECAR_RE.search(read_text(sidecar))
+            if match:
+                return _decode_notes(match.group(1))
+    return None
+
+
+def decode_columns(payload, notes=None):
+    """
+    Returns the embedded dataset as {field: [value per record]}, from either the columnar
+    payload or the legacy array of rows; text_notes come from `notes` when not in the payload.
+    Columns (rather than rows) let unchanged fields be compared with one list comparison.
+    """
+    if isinstance(payload, dict) and payload.get('format') == 'columnar':
+        funders, propositions = payload['funders'], payload['propositions']
+        columns = {field: values for field, values in payload.items()
+                   if field not in ('format', 'funders', 'propositions', 'funder', 'proposition')}
+        columns['funder_name'] = [funders[i] for i in payload['funder']]
+        columns['proposition_name'] = [propositions[i] for i in payload['proposition']]
+    else:
+        rows = payload or []
+        fields = {}
+        for row in rows:
+            fields.update(dict.fromkeys(row))
+        columns = {field: [row.get(field) for row in rows] for field in fields}
+    if notes is not None and 'text_notes' not in columns:
+        columns['text_notes'] = notes
+    return columns
+
+
+def record_count(columns):
+    return max((len(values) for values in columns.values()), default=0)
+
+
+def parse_page(html, html_path=''):
+    """
+    Splits a generated page into its named parts (see module docstring).
+    Returns:
+        dict: {part: value}; a part absent from the page is None. 'template' is the page text
+              with every other part replaced by a <<part>> marker.
+    """
+    parts = {}
+    spans = []
+    for name, prefix in JSON_CONSTANTS.items():
+        start = html.find(prefix)
+        if start < 0:
+            parts[name] = None
+            continue
+        value, end = _decoder.raw_decode(html, start + len(prefix))
+        parts[name] = value
+        spans.append((start + len(prefix), end, name))
+    notes = None
+    match = NOTES_RE.search(html)
+    if match:
+        notes = _load_notes(match.group(1), match.group(2), html_path)
+        spans.append((match.start(), match.end(), 'notes'))
+    parts['data'] = decode_columns(parts['data'], notes) if parts['data'] is not None else None
+    parts['name_to_id'] = {'propositions': parts.pop('proposition_name_to_id'),
+                           'funders': parts.pop('funder_name_to_id')}
+    if parts['name_to_id'] == {'propositions': None, 'funders': None}:
+        parts['name_to_id'] = None
+    match = TEAMS_PANEL_RE.search(html)
+    parts['teams_panel'] = [[label, href] for href, label in TEAM_BUTTON_RE.findall(match.group())] if match else None
+    if match:
+        spans.append((match.start(), match.end(), 'teams_panel'))
+    match = CHECKBOXER_RE.search(html)
+    parts['checkboxer'] = match.group(1) if match else None
+    if match:
+        spans.append((match.start(1), match.end(1), 'checkboxer'))
+    skeleton, pos = [], 0
+    for start, end, name in sorted(spans):
+        skeleton += [html[pos:start], f'<<{name}>>']
+        pos = end
+    skeleton.append(html[pos:])
+    parts['template'] = ''.join(skeleton)
+    return parts
+
+
+# --- Comparison ---
+def _text_diff(old, new, name):
+    return list(difflib.unified_diff(old.splitlines(), new.splitlines(), fromfile=f'golden/{name}',
+                                     tofile=f'output/{name}', lineterm='', n=1))
+
+
+def _dict_diff(old, new):
+    """Returns {key: [old, new]} for keys added (old None), removed (new None) or changed."""
+    return {key: [old.get(key), new.get(key)] for key in sorted(set(old) | set(new), key=str)
+            if old.get(key) != new.get(key)}
+
+
+def _record_keys(columns):
+    """
+    Returns one key per record: its record_id, or funder/proposition when the ID is missing;
+    repeated keys get a '#n' suffix.
+    """
+    n = record_count(columns)
+    ids = columns.get('record_id') or [None] * n
+    if all(ids) and len(set(ids)) == n:
+        return ids
+    funders = columns.get('funder_name') or [None] * n
+    propositions = columns.get('proposition_name') or [None] * n
+    keys, seen = [], set()
+    for rid, funder, proposition in zip(ids, funders, propositions):
+        base = rid or f'{funder} / {proposition}'
+        key, k = base, 1
+        while key in seen:
+            k += 1
+            key = f'{base}#{k}'
+        seen.add(key)
+        keys.append(key)
+    return keys
+
+
+def _coordinates_equal(a, b, tolerance):
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return abs(a - b) <= tolerance
+    return a == b
+
+
+def compare_records(old, new, tolerance=COORDINATE_TOLERANCE):
+    """
+    Matches two datasets (decode_columns() output) by record_id and reports the differences.
+    Each field is first compared as a whole column, so only changed fields are walked record by record.
+    Returns:
+        dict: {'added': [ids], 'removed': [ids], 'changed': {id: {field: [old, new]}},
+               'golden_count', 'output_count'}
+    """
+    old_keys, new_keys = _record_keys(old), _record_keys(new)
+    n_old, n_new = record_count(old), record_count(new)
+    if old_keys == new_keys:
+        common, old_rows, new_rows = old_keys, None, None
+    else:
+        new_index = {key: i for i, key in enumerate(new_keys)}
+        old_rows = [i for i, key in enumerate(old_keys) if key in new_index]
+        common = [old_keys[i] for i in old_rows]
+        new_rows = [new_index[key] for key in common]
+    changed = {}
+    for field in sorted(old.keys() | new.keys()):
+        a = old.get(field) or [None] * n_old
+        b = new.get(field) or [None] * n_new
+        if old_rows is not None:
+            a, b = [a[i] for i in old_rows], [b[i] for i in new_rows]
+        if a == b:
+            continue
+        if field in COORDINATE_FIELDS:
+            differs = [(key, x, y) for key, x, y in zip(common, a, b) if not _coordinates_equal(x, y, tolerance)]
+        else:
+            differs = [(key, x, y) for key, x, y in zip(common, a, b) if x != y]
+        for key, x, y in differs:
+            changed.setdefault(key, {})[field] = [x, y]
+    old_set, new_set = set(old_keys), set(new_keys)
+    return {
+        'golden_count': n_old,
+        'output_count': n_new,
+        'added': [key for key in new_keys if key not in old_set],
+        'removed': [key for key in old_keys if key not in new_set],
+        'changed': {key: changed[key] for key in common if key in changed},
+    }
+
+
+def compare_pages(golden, output, tolerance=COORDINATE_TOLERANCE):
+    """
+    Compares two parse_page() results part by part.
+    Returns:
+        dict: {part: {'status': 'same'|'changed'|'missing'|'added', 'details': ...}}
+    """
+    results = {}
+    for part in PARTS:
+        old, new = golden.get(part), output.get(part)
+        if old is None and new is None:
+            results[part] = {'status': 'same', 'details': None}
+            continue
+        if old is None or new is None:
+            results[part] = {'status': 'added' if old is None else 'missing', 'details': None}
+            continue
+        if part in ('template', 'checkboxer'):
+            details = _text_diff(old, new, part)
+        elif part == 'metadata':
+            details = _dict_diff({k: v for k, v in old.items() if k not in VOLATILE_METADATA},
+                                 {k: v for k, v in new.items() if k not in VOLATILE_METADATA})
+        elif part == 'name_to_id':
+            details = {side: _dict_diff(old[side] or {}, new[side] or {}) for side in ('propositions', 'funders')}
+            details = {side: diff for side, diff in details.items() if diff}
+        elif part == 'data':
+            details = compare_records(old, new, tolerance)
+            changed = details['added'] or details['removed'] or details['changed']
+            results[part] = {'status': 'changed' if changed else 'same', 'details': details}
+            continue
+        elif part == 'teams_panel':
+            details = {'removed': [b for b in old if b not in new], 'added': [b for b in new if b not in old]}
+            if not (details['removed'] or details['added']) and old != new:
+                details['reordered'] = True
+            details = {k: v for k, v in details.items() if v}
+        else:
+            details = _dict_diff(old, new)
+        results[part] = {'status': 'changed' if details else 'same', 'details': details or None}
+    return results
+
+
+# --- Reporting ---
+def _short(value):
+    text = json.dumps(value, ensure_ascii=False) if not isinstance(value, str) else repr(value)
+    return text if len(text) <= LOG_VALUE_WIDTH else text[:LOG_VALUE_WIDTH - 3] + '...'
+
+
+def format_report(results, golden_path, output_path):
+    """Returns the readable report as a list of lines."""
+    lines = [f"Golden: {golden_path}", f"Output: {output_path}", '']
+    for part, result in results.items():
+        lines.append(f"[{result['status'].upper():<7}] {part}")
+    for part, result in results.items():
+        details = result['details']
+        if result['status'] != 'changed' or not details:
+            continue
+        lines += ['', f"--- {part} ---"]
+        if part in ('template', 'checkboxer'):
+            lines += details
+        elif part == 'data':
+            lines.append(f"records: {details['golden_count']} golden, {details['output_count']} output; "
+                         f"{len(details['added'])} added, {len(details['removed'])} removed, "
+                         f"{len(details['changed'])} changed")
+            lines += [f"+ {key}" for key in details['added']]
+            lines += [f"- {key}" for key in details['removed']]
+            for key, fields in details['changed'].items():
+                lines.append(f"~ {key}")
+                lines += [f"    {field}: {_short(a)} -> {_short(b)}" for field, (a, b) in fields.items()]
+        elif part == 'name_to_id':
+            for side, diff in details.items():
+                lines += [f"{side}: {_short(name)}: {_short(a)} -> {_short(b)}" for name, (a, b) in diff.items()]
+        elif part == 'teams_panel':
+            lines += [f"{change}: {_short(value)}" for change, value in details.items()]
+        else:
+            lines += [f"{key}: {_short(a)} -> {_short(b)}" for key, (a, b) in details.items()]
+    return lines
+
+
+def write_logs(results, lines, golden_path, output_path, log_dir=LOG_DIR):
+    """Writes golden_compare_<timestamp>.log and .json to the log directory; returns the log path."""
+    os.makedirs(log_dir, exist_ok=True)
+    stem = os.path.join(log_dir, f"golden_compare_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    with open(stem + '.log', 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    with open(stem + '.json', 'w', encoding='utf-8') as f:
+        json.dump({'golden': str(golden_path), 'output': str(output_path), 'parts': results},
+                  f, indent=2, ensure_ascii=False)
+    return stem + '.log'
+
+
+def line_diff(golden_path, output_path):
+    """The legacy check: unified diff of the two files' lines."""
+    diff_list = list(difflib.unified_diff(
+        read_text(golden_path).splitlines(keepends=True), read_text(output_path).splitlines(keepends=True),
+        fromfile=str(golden_path),
+        tofile=str(output_path),
         lineterm=''  # No extra newlines
-    )
-    diff_list = list(diff)
+    ))
     if diff_list:
         print("Differences detected between Golden Master and current output:")
         for line in diff_list:
             print(line)
     else:
         print("No differences detected. Output matches Golden Master.")
+    return bool(diff_list)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare a generated visualization to the Golden Master, part by part.')
+    parser.add_argument('--golden', default=str(GOLDEN), help='Golden Master HTML')
+    parser.add_argument('--output', default=str(OUTPUT), help='Generated HTML to check')
+    parser.add_argument('--tolerance', type=float, default=COORDINATE_TOLERANCE,
+                        help=f'Largest coordinate change treated as jitter (default {COORDINATE_TOLERANCE})')
+    parser.add_argument('--log-dir', default=str(LOG_DIR), help='Where the .log/.json results are written')
+    parser.add_argument('--line-diff', action='store_true', help='Legacy whole-file line diff (no logs)')
+    args = parser.parse_args()
+
+    if args.line_diff:
+        sys.exit(1 if line_diff(args.golden, args.output) else 0)
+    start = time.perf_counter()
+    golden = parse_page(read_text(args.golden), args.golden)
+    output = parse_page(read_text(args.output), args.output)
+    results = compare_pages(golden, output, args.tolerance)
+    elapsed = time.perf_counter() - start
+    lines = format_report(results, args.golden, args.output)
+    for line in lines:
+        print(line)
+    log_path = write_logs(results, lines, args.golden, args.output, args.log_dir)
+    differs = any(r['status'] != 'same' for r in results.values())
+    print(f"\n[INFO] Compared in {elapsed * 1000:.0f} ms; "
+          f"{'differences found' if differs else 'output matches Golden Master'}. Log: {log_path}")
+    sys.exit(1 if differs else 0)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,165 @@
+"""
+stage_cache.py
+
+Content-addressed cache of pipeline stage outputs, used by FreshVisualization.py.
+
+- A stage's cache key is the SHA-256 of its inputs (file contents and/or in-memory bytes,
+  including the stage's own script) prefixed with the stage name.
+- Outputs are stored under .pipeline_cache/<key>/ and restored (copied back, or read in place)
+  when a later run presents identical inputs, so the stage is skipped.
+- The cache is bounded by size: after each store, least-recently-used entries are evicted
+  until the total is under `max_bytes`. Hits refresh an entry's recency.
+- A small state.json remembers when Airtable was last fetched and which cache entry holds
+  the resulting artifacts, so a run can skip the Airtable stages when nothing changed.
+
+Requirements:
+- Python 3.x (standard library only)
+
+Usage:
+    cache = StageCache()
+    key = cache.key('transform', ['match_data_sample.json', 'transform_to_visualization_schema.py'])
+    if not cache.restore(key, {'visualization_data.json': out_path}):
+        ...run the stage...
+        cache.put(key, {'visualization_data.json': out_path})
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.pipeline_cache')
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+STATE_FILE = 'state.json'
+
+
+def hash_inputs(inputs):
+    """
+    Hashes a sequence of inputs in order. A file and bytes with the same content hash alike,
+    so in-memory data and its on-disk serialization share cache entries.
+    Args:
+        inputs (iterable): File paths (str) and/or raw bytes
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    h = hashlib.sha256()
+    for item in inputs:
+        if isinstance(item, (bytes, bytearray)):
+            h.update(b'%d:' % len(item))
+            h.update(item)
+            continue
+        if not os.path.exists(item):
+            h.update(b'missing:')
+            continue
+        h.update(b'%d:' % os.path.getsize(item))
+        with open(item, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+class StageCache:
+    """
+    Size-bounded, content-addressed store of stage outputs.
+
+    Args:
+        cache_dir (str): Cache location (default: .pipeline_cache next to this script)
+        max_bytes (int): Size bound enforced by LRU eviction
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, stage, inputs):
+        """Returns the cache key for `stage` given its inputs (paths and/or bytes)."""
+        return f'{stage}-{hash_inputs(inputs)}'
+
+    def _entry(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key):
+        """
+        Looks up an entry, refreshing its recency.
+        Returns:
+            dict|None: {output_name: path inside the cache}, or None on a miss
+        """
+        entry = self._entry(key)
+        if not os.path.isdir(entry):
+            return None
+        os.utime(entry)
+        return {name: os.path.join(entry, name) for name in os.listdir(entry)}
+
+    def restore(self, key, outputs):
+        """
+        Copies a cached entry's files to their destinations.
+        Args:
+            key (str): Cache key
+            outputs (dict): {output_name: destination path}
+        Returns:
+            bool: True on a hit (all outputs restored), False on a miss
+        """
+        cached = self.get(key)
+        if cached is None or any(name not in cached for name in outputs):
+            return False
+        for name, dest in outputs.items():
+            os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+            shutil.copyfile(cached[name], dest)
+        return True
+
+    def put(self, key, outputs):
+        """
+        Stores stage outputs under `key`, then evicts down to the size bound.
+        Args:
+            key (str): Cache key
+            outputs (dict): {output_name: source file path or bytes}
+        """
+        staging = tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-')
+        for name, src in outputs.items():
+            dest = os.path.join(staging, name)
+            if isinstance(src, (bytes, bytearray)):
+                with open(dest, 'wb') as f:
+                    f.write(src)
+            else:
+                shutil.copyfile(src, dest)
+        entry = self._entry(key)
+        if os.path.isdir(entry):
+            shutil.rmtree(entry)
+        os.replace(staging, entry)
+        self.evict()
+
+    def evict(self):
+        """Removes least-recently-used entries until the cache fits in `max_bytes`. Returns the number removed."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not os.path.isdir(path) or name.startswith('.tmp-'):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            entries.append((os.path.getmtime(path), size, path))
+            total += size
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def load_state(self):
+        path = os.path.join(self.cache_dir, STATE_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_state(self, state):
+        path = os.path.join(self.cache_dir, STATE_FILE)
+        tmp = f'{path}.{os.getpid()}.{int(time.time() * 1000)}'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, path)
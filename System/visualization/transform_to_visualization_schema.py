@@ -3,78 +3,294 @@ transform_to_visualization_schema.py
 
 Transforms raw Airtable-derived match data (from match_data_sample.json) into the canonical visualization schema expected by legacy tools.
 - Computes y_fit and x_urgency using the standardized jitter formula documented in BOOTSTRAP.md
+- Jitter is seeded by default: each record's offset is derived from a hash of its record_id,
+  so a record keeps its position across regenerations and the output is reproducible.
+  The whole batch is computed in one vectorized NumPy pass.
+- Optional spiral layout (--jitter spiral): records sharing a fit/urgency cell are packed
+  on a sunflower spiral around the cell center instead of jittered independently, so dense
+  cells do not overplot. Also deterministic, and O(n log n) (one sort).
 - Preserves all original fields for traceability
 - Outputs visualization_data.json in the same directory
+- Streaming mode (--stream): records are read, transformed in fixed-size chunks and written
+  as they go (see json_stream.py), so peak memory does not depend on the record count. Input
+  may be a JSON array or JSON Lines, and '-' reads stdin / writes stdout, so the stage can
+  sit in a pipe after fetch_match_data.py --stream. Seeded jitter is per record and gives the
+  same coordinates as the batch mode; the spiral layout needs every record of a cell at once,
+  so --jitter spiral still loads the whole input.
 
 Requirements:
 - Python 3.x
-- match_data_sample.json (produced by fetch_minimal_match_data.py)
+- numpy
+- match_data_sample.json (produced by fetch_match_data.py)
 
 Usage:
-    python transform_to_visualization_schema.py
+    python transform_to_visualization_schema.py                  # seeded jitter (stable positions)
+    python transform_to_visualization_schema.py --seed 7         # a different, still stable, layout
+    python transform_to_visualization_schema.py --jitter spiral  # pack dense cells without overlap
+    python transform_to_visualization_schema.py --jitter random  # legacy behavior: new positions every run
+    python fetch_match_data.py --stream --format jsonl --output - | \
+        python transform_to_visualization_schema.py --stream --input -
 
 Output:
     visualization_data.json (in same directory)
 """
+import argparse
+import itertools
 import json
-import random
 import os
+import sys
+import numpy as np
+from json_stream import STREAM_FORMATS, JsonRecordWriter, iter_json_records
+from pipeline_trace import span
 
-def compute_coordinates(fit_score, urgency_score):
+INFILE = os.path.join(os.path.dirname(__file__), 'match_data_sample.json')
+OUTFILE = os.path.join(os.path.dirname(__file__), 'visualization_data.json')
+
+JITTER = 0.15
+JITTER_MODES = ('seeded', 'spiral', 'random')
+
+# Spiral layout: points sit about SPIRAL_SPACING apart, and a cell's spiral never grows
+# past SPIRAL_MAX_RADIUS so neighbouring cells (1.0 apart) stay visually separate.
+SPIRAL_SPACING = 0.04
+SPIRAL_MAX_RADIUS = 0.4
+GOLDEN_ANGLE = np.pi * (3.0 - np.sqrt(5.0))
+# Records per vectorized chunk in streaming mode.
+STREAM_CHUNK = 10000
+
+_FNV_OFFSET = np.uint64(0xcbf29ce484222325)
+_FNV_PRIME = np.uint64(0x100000001b3)
+
+def _splitmix64(h):
+    """SplitMix64 finalizer over a uint64 array (wrapping arithmetic), spreading every input bit."""
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xbf58476d1ce4e5b9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94d049bb133111eb)
+    return h ^ (h >> np.uint64(31))
+
+def hash_record_ids(record_ids, seed=0):
     """
-    Computes y_fit and x_urgency using the standardized jitter formula.
+    Hashes record IDs to uint64 in one vectorized pass (FNV-1a over the UTF-8 bytes, then SplitMix64).
     Args:
-        fit_score (float|int|str): The fit score value
-        urgency_score (float|int|str): The urgency score value
+        record_ids (list): Record ID strings
+        seed (int): Mixed into the hash, so different seeds give different (still stable) layouts
     Returns:
-        tuple: (y_fit, x_urgency) as floats, or (None, None) if input invalid
-    Side effects:
-        None
-    Dependencies:
-        random.uniform
+        numpy.ndarray: uint64 hash per record ID
     """
+    encoded = np.array([str(rid).encode('utf-8') for rid in record_ids], dtype=bytes)
+    if encoded.size == 0:
+        return np.zeros(0, dtype=np.uint64)
+    width = encoded.dtype.itemsize
+    # (n, width) byte matrix, zero-padded on the right; one FNV round per column.
+    byte_matrix = encoded.view(np.uint8).reshape(len(encoded), width)
+    seed_mix = _splitmix64(np.array([seed & 0xFFFFFFFFFFFFFFFF], dtype=np.uint64))
+    h = np.full(len(encoded), _FNV_OFFSET, dtype=np.uint64) ^ seed_mix
+    lengths = np.char.str_len(encoded)
+    for i, column in enumerate(byte_matrix.T):
+        # Skip the padding, so an ID hashes the same whatever the longest ID in the batch is.
+        h = np.where(i < lengths, (h ^ column.astype(np.uint64)) * _FNV_PRIME, h)
+    return _splitmix64(h ^ lengths.astype(np.uint64))
+
+def _unit_interval(h):
+    """Maps uint64 hashes to floats in [0, 1) using their top 53 bits."""
+    return (h >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+def spiral_offsets(fit, urgency, h):
+    """
+    Packs records that share a (rounded fit, rounded urgency) cell on a sunflower spiral.
+    Args:
+        fit (numpy.ndarray): Fit scores (NaN where invalid)
+        urgency (numpy.ndarray): Urgency scores (NaN where invalid)
+        h (numpy.ndarray): uint64 record hashes; fix each record's place within its cell
+    Returns:
+        tuple: (dy, dx) offset arrays from the raw scores
+    """
+    n = len(fit)
+    if n == 0:
+        return np.zeros(0), np.zeros(0)
+    # Invalid scores get a sentinel cell; their coordinate stays NaN anyway.
+    fit_cell = np.where(np.isnan(fit), -1.0, np.rint(fit))
+    urgency_cell = np.where(np.isnan(urgency), -1.0, np.rint(urgency))
+    order = np.lexsort((h, urgency_cell, fit_cell))
+    sorted_fit = fit_cell[order]
+    sorted_urgency = urgency_cell[order]
+    new_cell = np.empty(n, dtype=bool)
+    new_cell[0] = True
+    new_cell[1:] = (sorted_fit[1:] != sorted_fit[:-1]) | (sorted_urgency[1:] != sorted_urgency[:-1])
+    starts = np.flatnonzero(new_cell)
+    counts = np.diff(np.append(starts, n))
+    cell_of = np.cumsum(new_cell) - 1
+    rank = np.arange(n) - starts[cell_of]
+    size = counts[cell_of]
+    radius = np.minimum(SPIRAL_MAX_RADIUS, SPIRAL_SPACING * np.sqrt(size))
+    r = radius * np.sqrt((rank + 0.5) / size)
+    theta = rank * GOLDEN_ANGLE
+    dy = np.empty(n)
+    dx = np.empty(n)
+    dy[order] = r * np.sin(theta)
+    dx[order] = r * np.cos(theta)
+    # Spirals are centered on the cell, so a non-integer score is drawn at its cell center plus offset.
+    return dy + (fit_cell - fit), dx + (urgency_cell - urgency)
+
+def _to_float(value):
     try:
-        y_fit = float(fit_score) + random.uniform(-0.15, 0.15)
-    except (TypeError, ValueError):
-        y_fit = None
-    try:
-        x_urgency = float(urgency_score) + random.uniform(-0.15, 0.15)
+        return float(value)
     except (TypeError, ValueError):
-        x_urgency = None
+        return np.nan
+
+def compute_coordinates_batch(fit_scores, urgency_scores, record_ids, jitter='seeded', seed=0, first_index=0, rng=None):
+    """
+    Computes y_fit and x_urgency (score plus jitter) for a whole batch in one vectorized pass.
+    Args:
+        fit_scores (list): Fit score per record (float|int|str|None)
+        urgency_scores (list): Urgency score per record
+        record_ids (list): Record ID per record; keys the seeded jitter
+        jitter (str): 'seeded' (offsets derived from record_id, stable across runs),
+                      'spiral' (records sharing a cell packed on a spiral, see spiral_offsets)
+                      or 'random' (fresh offsets every run, the legacy behavior)
+        seed (int): Seed for either mode
+        first_index (int): Position of the first record in the whole input (when the batch is
+                           one chunk of a stream); keys records without an ID
+        rng (numpy.random.Generator): Generator for 'random', shared across chunks of a stream
+    Returns:
+        tuple: (y_fit, x_urgency) float64 arrays; NaN where the score was invalid
+    """
+    fit = np.array([_to_float(v) for v in fit_scores], dtype=np.float64)
+    urgency = np.array([_to_float(v) for v in urgency_scores], dtype=np.float64)
+    if jitter in ('seeded', 'spiral'):
+        # Records without an ID fall back to their position, which is stable for an unchanged input.
+        keys = [rid or f'#{i}' for i, rid in enumerate(record_ids, first_index)]
+        h = hash_record_ids(keys, seed)
+    if jitter == 'spiral':
+        dy, dx = spiral_offsets(fit, urgency, h)
+        return fit + dy, urgency + dx
+    if jitter == 'seeded':
+        u_fit = _unit_interval(h)
+        u_urgency = _unit_interval(_splitmix64(h ^ np.uint64(0x9e3779b97f4a7c15)))
+    elif jitter == 'random':
+        rng = rng or np.random.default_rng(None if seed == 0 else seed)
+        u_fit = rng.random(len(fit))
+        u_urgency = rng.random(len(fit))
+    else:
+        raise ValueError(f"Unknown jitter mode {jitter!r}; expected one of {JITTER_MODES}")
+    y_fit = fit + (2.0 * u_fit - 1.0) * JITTER
+    x_urgency = urgency + (2.0 * u_urgency - 1.0) * JITTER
     return y_fit, x_urgency
 
-def main():
-    infile = os.path.join(os.path.dirname(__file__), 'match_data_sample.json')
-    outfile = os.path.join(os.path.dirname(__file__), 'visualization_data.json')
-    rel_infile = os.path.relpath(infile, os.getcwd())
-    rel_outfile = os.path.relpath(outfile, os.getcwd())
-    print(f"[INFO] Reading input from {rel_infile}")
-    print(f"[INFO] Writing output to {rel_outfile}")
-    if not os.path.exists(infile):
-        raise FileNotFoundError(f"Input file {infile} not found.")
-    with open(infile, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+def _floats_or_none(values):
+    return [None if v != v else v for v in values.tolist()]
+
+def transform_records(data, jitter='seeded', seed=0, first_index=0, rng=None):
+    """
+    Converts minimal match records into canonical visualization records.
+    Args:
+        data (list): Records from match_data_sample.json
+        jitter (str): Jitter mode, see compute_coordinates_batch
+        seed (int): Jitter seed
+        first_index, rng: See compute_coordinates_batch (streaming chunks only)
+    Returns:
+        list: Visualization records (visualization_data.json rows)
+    """
+    y_fit, x_urgency = compute_coordinates_batch(
+        [rec.get('fit_score') for rec in data],
+        [rec.get('urgency_score') for rec in data],
+        [rec.get('record_id', '') for rec in data],
+        jitter=jitter,
+        seed=seed,
+        first_index=first_index,
+        rng=rng,
+    )
     output = []
-    for rec in data:
-        fit_score = rec.get('fit_score')
-        urgency_score = rec.get('urgency_score')
-        
-        y_fit, x_urgency = compute_coordinates(fit_score, urgency_score)
+    for rec, y, x in zip(data, _floats_or_none(y_fit), _floats_or_none(x_urgency)):
         # Compose canonical visualization record
         output.append({
             'funder_name': rec.get('funder_name', ''),
             'proposition_name': rec.get('proposition_name', ''),
-            'fit_score': fit_score,
-            'urgency_score': urgency_score,
+            'fit_score': rec.get('fit_score'),
+            'urgency_score': rec.get('urgency_score'),
             'text_notes': rec.get('text_notes', ''),
             'record_id': rec.get('record_id', ''),
-            'y_fit': y_fit,
-            'x_urgency': x_urgency
+            'y_fit': y,
+            'x_urgency': x
         })
-    with open(outfile, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    return output
+
+def iter_transform_records(records, jitter='seeded', seed=0, chunk_size=STREAM_CHUNK):
+    """
+    Streaming counterpart of transform_records: transforms an iterable of records in chunks of
+    `chunk_size` and yields visualization records, holding at most one chunk in memory.
+    The spiral layout needs all records at once, so with jitter='spiral' the input is collected first.
+    """
+    if jitter == 'spiral':
+        yield from transform_records(list(records), jitter=jitter, seed=seed)
+        return
+    rng = np.random.default_rng(None if seed == 0 else seed) if jitter == 'random' else None
+    records = iter(records)
+    first_index = 0
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+        yield from transform_records(chunk, jitter=jitter, seed=seed, first_index=first_index, rng=rng)
+        first_index += len(chunk)
+
+def write_visualization_data(output, outfile=OUTFILE):
+    """Writes visualization records to visualization_data.json."""
+    # Streamed by json.dump; see write_match_data in fetch_match_data.py.
+    with span('serialize and write visualization data', 'write', records=len(output), path=os.path.basename(outfile)) as s:
+        with open(outfile, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2, ensure_ascii=False)
+        s.set(bytes=os.path.getsize(outfile))
     rel_outfile = os.path.relpath(outfile, os.getcwd())
     print(f"[INFO] Wrote {len(output)} records to {rel_outfile}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Transform match data into the visualization schema.')
+    parser.add_argument('--jitter', choices=JITTER_MODES, default='seeded',
+                        help='seeded: stable per-record offsets keyed on record_id (default); '
+                             'spiral: records sharing a fit/urgency cell packed on a spiral without overlap; '
+                             'random: new offsets every run')
+    parser.add_argument('--seed', type=int, default=0, help='Jitter seed (default 0)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Read, transform and write records incrementally (memory independent of record count)')
+    parser.add_argument('--input', default=INFILE, help="Input file (JSON array or JSON Lines; '-' for stdin)")
+    parser.add_argument('--output', default=OUTFILE, help="Output file ('-' for stdout)")
+    parser.add_argument('--format', choices=STREAM_FORMATS, default='array',
+                        help='With --stream: output as a JSON array (default, same as batch mode) or JSON Lines')
+    return parser.parse_args()
+
+def run_stream(infile, outfile, fmt='array', jitter='seeded', seed=0):
+    """Streams infile -> visualization records -> outfile; returns the record count."""
+    # Reading, transforming and writing are interleaved chunk by chunk, so one span covers them.
+    with span('stream transform', 'transform', format=fmt) as s, JsonRecordWriter(outfile, fmt) as writer:
+        writer.write_all(iter_transform_records(iter_json_records(infile), jitter=jitter, seed=seed))
+        s.set(records=writer.count)
+    return writer.count
+
+def main():
+    args = parse_args()
+    infile = args.input
+    outfile = args.output
+    if args.stream:
+        # Keep stdout clean for the records when writing to a pipe.
+        log = sys.stderr if outfile == '-' else sys.stdout
+        print(f"[INFO] Streaming {infile} -> {outfile} ({args.format})", file=log)
+        count = run_stream(infile, outfile, args.format, jitter=args.jitter, seed=args.seed)
+        print(f"[INFO] Wrote {count} records to {outfile}", file=log)
+        return
+    rel_infile = os.path.relpath(infile, os.getcwd())
+    rel_outfile = os.path.relpath(outfile, os.getcwd())
+    print(f"[INFO] Reading input from {rel_infile}")
+    print(f"[INFO] Writing output to {rel_outfile}")
+    if not os.path.exists(infile):
+        raise FileNotFoundError(f"Input file {infile} not found.")
+    with span('load match data', 'parse', path=os.path.basename(infile)) as s:
+        with open(infile, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        s.set(records=len(data), bytes=os.path.getsize(infile))
+    with span('transform records', 'transform', records=len(data)):
+        output = transform_records(data, jitter=args.jitter, seed=args.seed)
+    write_visualization_data(output, outfile)
+
 if __name__ == '__main__':
     main()